@@ -0,0 +1,6 @@
+"""
+Módulos de apoio ao dashboard `streamlit_app.py`.
+
+A lógica de preparação dos dados fica aqui para que o script do Streamlit
+se concentre nos filtros e nos gráficos.
+"""
@@ -0,0 +1,335 @@
+"""
+Conteúdo de cada aba do dashboard.
+
+Cada função recebe as tabelas derivadas da aba (ver
+`painel.derivados.DERIVADOS_POR_ABA`) e desenha seus gráficos. Só a aba
+selecionada é construída a cada execução.
+
+As abas Concluintes e Vagas têm filtros próprios e são fragmentos
+(`st.fragment`): seus widgets reexecutam apenas a própria aba. Os filtros
+gerais (UF e IES) ficam na barra lateral e reexecutam a página inteira.
+"""
+
+import streamlit as st
+
+from painel import config, graficos
+from painel.cascata import etapa_contagem, etapa_faixa, etapa_refinar
+from painel.exportacao import FORMATOS, arquivo_temporario, comando_exportacao, exportar
+from painel.mapa import carregar_centroides, carregar_malha, figura_mapa
+from painel.instrumentacao import medir_fragmento
+from painel.medicao import etapa
+from painel.modelos import ModelosGraficos
+
+NOMES_ABAS = ["Docentes", "Formados", "Redes", "Concluintes", "Vagas"]
+
+# aba exibida só com mais de um ano particionado (ver `painel.particoes`)
+ABA_TENDENCIAS = "Tendências"
+
+
+@st.cache_resource
+def get_mapa(valores):
+    return figura_mapa(dict(valores), carregar_malha(), carregar_centroides())
+
+
+@st.cache_resource
+def get_modelos():
+    return ModelosGraficos()
+
+
+def _altair(funcao, dados, **kwargs):
+    """
+    Envia o gráfico `funcao(dados)`, medindo as duas etapas. Com
+    `PAINEL_MODELOS_GRAFICOS`, o spec vem do modelo do gráfico e só os dados
+    são trocados (ver `painel.modelos`).
+    """
+
+    if not config.MODELOS_GRAFICOS:
+        with etapa('graficos', funcao.__name__):
+            grafico = funcao(dados)
+        with etapa('serializacao', funcao.__name__):
+            st.altair_chart(grafico, **kwargs)
+        return
+
+    with etapa('graficos', funcao.__name__):
+        spec = get_modelos().spec(funcao, dados)
+    with etapa('serializacao', funcao.__name__):
+        st.vega_lite_chart(spec=spec, **kwargs)
+
+
+def _milhares(numero):
+    return f'{numero:,}'.replace(',', '.')
+
+
+def _exportacao(chave, tabela, fonte, total, estado_filtros):
+    """
+    Botões que baixam as linhas filtradas em CSV ou Parquet.
+
+    `fonte()` devolve (índice, linhas, atributos das IES ou None) e só é
+    chamada no clique, em outra thread: os blocos são gravados em um arquivo
+    temporário, entregue aberto ao Streamlit, que o lê uma vez e guarda os
+    bytes até o download (ver `painel.exportacao`). Por isso, com mais de
+    `PAINEL_EXPORTAR_MAX_LINHAS` linhas (`total`), o app mostra o comando
+    que exporta `tabela` em disco no lugar dos botões.
+    """
+
+    def gerar(formato):
+        indice, linhas, atributos = fonte()
+        return arquivo_temporario(exportar(indice, linhas, formato, atributos))
+
+    with st.expander("Exportar dados filtrados"):
+        if total > config.EXPORTAR_MAX_LINHAS:
+            st.caption(
+                f"A seleção tem {_milhares(total)} linhas, acima do limite de "
+                f"{_milhares(config.EXPORTAR_MAX_LINHAS)} para baixar pelo app. Pela linha de "
+                "comando, o arquivo é gravado em blocos (só com os filtros de UF e IES):"
+            )
+            st.code(comando_exportacao(
+                tabela, estado_filtros['ufs'], estado_filtros['ies'], st.session_state.get('ano')
+            ), language='bash')
+            return
+
+        for coluna, (formato, (extensao, mime)) in zip(st.columns(len(FORMATOS)), FORMATOS.items()):
+            with coluna:
+                st.download_button(
+                    f"Baixar {formato}",
+                    data=lambda formato=formato: gerar(formato),
+                    file_name=f'{chave}.{extensao}',
+                    mime=mime,
+                    on_click='ignore',
+                    key=f'exportar_{chave}_{extensao}'
+                )
+
+
+def construir_aba_docentes(derivados, docentes=None, estado_filtros=None):
+    """
+    Gráficos dos docentes. `docentes` é (fonte, total de linhas) da
+    exportação do cubo de docentes filtrado (ver `_exportacao`), ou None.
+    """
+
+    col_esquerda, col_direita = st.columns([1, 2], gap="large")
+    with col_esquerda:
+        _altair(graficos.grafico_sexo, derivados['frequencia_df_sexo'], use_container_width=True)
+        st.markdown("---")
+        _altair(graficos.grafico_escolaridade, derivados['frequencia_df_escol'], use_container_width=True)
+
+    with col_direita:
+        _altair(graficos.grafico_faixa_etaria, derivados['frequencia_df_faixa_etaria'], use_container_width=True)
+
+    _altair(graficos.grafico_cor_raca, derivados['frequencia_df_cor_raca'], use_container_width=True)
+
+    if docentes is not None:
+        _exportacao('docentes', 'df_docentes', *docentes, estado_filtros)
+
+
+def construir_aba_formados(derivados):
+    _altair(graficos.grafico_escol_cor, derivados['df_agg'], use_container_width=True)
+    _altair(graficos.grafico_escol_uf, derivados['df_escol_uf'], use_container_width=True)
+
+
+def construir_aba_redes(derivados, valores_mapa):
+    col1, col2, col3 = st.columns(3, gap="large")
+
+    with col1:
+        _altair(graficos.grafico_acesso_internet, derivados['frequencia_df_acesso_internet'], use_container_width=True)
+        _altair(graficos.grafico_tprede, derivados['frequencia_df_tprede'], use_container_width=True)
+
+    with col2:
+        with etapa('graficos', 'mapa'):
+            mapa = get_mapa(valores_mapa)
+        with etapa('serializacao', 'mapa'):
+            st.plotly_chart(mapa, use_container_width=True)
+        _altair(graficos.grafico_acesso_rede, derivados['df_acesso_rede'])
+
+    with col3:
+        _altair(graficos.grafico_repositorio, derivados['frequencia_df_repositorio'], use_container_width=True)
+
+
+def _valor_lembrado(chave, padrao):
+    """Valor escolhido no widget `chave` antes de ele sair da tela (ex: troca de aba)."""
+    return st.session_state.get(f'_lembrar_{chave}', padrao)
+
+
+def _lembrar(chave):
+    st.session_state[f'_lembrar_{chave}'] = st.session_state[chave]
+
+
+def _slider_contagem(chave, rotulo, contagem, mensagem_unica):
+    """
+    Slider da faixa de contagem por curso.
+
+    Retorna:
+    - Faixa selecionada, ou None quando não há o que filtrar.
+    """
+
+    if contagem.vazio:
+        return None
+
+    minimo, maximo = contagem.minimo, contagem.maximo
+    if minimo >= maximo:
+        st.info(mensagem_unica.format(minimo))
+        return None
+
+    inicio, fim = _valor_lembrado(chave, (minimo, maximo))
+    return st.slider(
+        rotulo,
+        min_value=minimo,
+        max_value=maximo,
+        value=(min(max(inicio, minimo), maximo), max(min(fim, maximo), minimo)),
+        key=chave,
+        on_change=_lembrar,
+        args=(chave,)
+    )
+
+
+def _multiselect_lembrado(chave, rotulo, opcoes, placeholder):
+    escolhidos = [valor for valor in _valor_lembrado(chave, []) if valor in opcoes]
+    return st.multiselect(
+        rotulo,
+        options=opcoes,
+        default=escolhidos,
+        placeholder=placeholder,
+        key=chave,
+        on_change=_lembrar,
+        args=(chave,)
+    )
+
+
+@st.fragment
+@medir_fragmento('Concluintes')
+def construir_aba_concluintes(cascata, estado_filtros, obter_derivados, cruzamento=None):
+    """
+    Filtros e gráficos dos concluintes.
+
+    É um fragmento: mexer no slider ou na cor/raça reexecuta só esta aba,
+    sem recalcular docentes, redes ou mapa.
+
+    Os filtros formam uma cascata (`painel.cascata`): contagem por curso,
+    faixa do slider e cor/raça. Mexer na cor/raça reaproveita a faixa já
+    aplicada, e só a última etapa é refeita.
+
+    Parâmetros:
+    - cascata: `Cascata` do cubo de concluintes já na etapa dos filtros
+      gerais, com (`IndiceInvertido`, linhas filtradas por UF/IES).
+    - estado_filtros: Estado dos filtros gerais (UF, IES).
+    - obter_derivados: Função (aba, estado, filtrados) -> tabelas derivadas.
+    - cruzamento: `Cruzamento` do cubo já filtrado por UF/IES (ver
+      `painel.cruzamentos`), ou None.
+    """
+
+    indice, linhas_gerais = cascata.valor
+    col_faixa, col_raca = st.columns(2, gap="large")
+    cascata = cascata.seguir('contagem', etapa_contagem)
+    contagem = cascata.valor
+
+    with col_faixa:
+        st.subheader("Filtro por Número de Concluintes")
+        cursos_qtd_selecionada = _slider_contagem(
+            'faixa_concluintes',
+            "Filtre cursos pelo nº de concluintes:",
+            contagem,
+            "Todos os cursos na seleção têm {} concluintes."
+        )
+    cascata = cascata.seguir(
+        'faixa',
+        lambda contagem: etapa_faixa(indice, linhas_gerais, contagem, cursos_qtd_selecionada, 'RAÇA'),
+        faixa=cursos_qtd_selecionada
+    )
+    linhas, totais_cursos, racas = cascata.valor
+
+    with col_raca:
+        cor_raca_conc = _multiselect_lembrado(
+            'racas_concluintes',
+            "Cor e Raça",
+            racas,
+            "Escolha múltiplas Cores e Raças"
+        )
+    cascata = cascata.seguir(
+        'racas', lambda faixa: etapa_refinar(indice, faixa[0], 'RAÇA', cor_raca_conc), racas=cor_raca_conc
+    )
+    linhas = cascata.valor
+
+    estado = {
+        **estado_filtros,
+        'faixa_concluintes': cursos_qtd_selecionada,
+        'racas_concluintes': cor_raca_conc,
+    }
+    filtrados = {'df_concluintes': indice.tabela(linhas)}
+    if not cor_raca_conc:
+        # sem filtro de cor/raça, os totais por curso são os do slider
+        filtrados['df_concluintes_por_curso'] = totais_cursos
+    if cruzamento is not None:
+        filtrados['df_concluintes_cruzamento'] = cruzamento.filtrar({
+            'CURSO': totais_cursos.index.tolist() if cursos_qtd_selecionada is not None else None,
+            'RAÇA': cor_raca_conc or None,
+        })
+    derivados = obter_derivados('Concluintes', estado, filtrados)
+
+    _altair(graficos.grafico_concluintes_cor_raca, derivados['frequencia_df_raca_conc'])
+    _altair(graficos.grafico_concluintes_raca_uf, derivados['df_raca_uf'], use_container_width=True)
+    _altair(graficos.grafico_concluintes, derivados['frequencia_df_concluintes'], use_container_width=True)
+
+    _exportacao('concluintes', 'df_concluintes', lambda: (indice, linhas, None), indice.contar(linhas), estado_filtros)
+
+
+@st.fragment
+@medir_fragmento('Vagas')
+def construir_aba_vagas(cascata, estado_filtros, obter_derivados):
+    """
+    Filtros e gráficos das vagas. Fragmento, como `construir_aba_concluintes`:
+    o slider de frequência e os turnos reexecutam só esta aba, e mudar os
+    turnos só refaz a última etapa da cascata.
+    """
+
+    indice, linhas_gerais = cascata.valor
+    col_faixa, col_turnos = st.columns(2, gap="large")
+    cascata = cascata.seguir('contagem', etapa_contagem)
+    contagem = cascata.valor
+
+    with col_faixa:
+        st.subheader("Filtro por Frequência de Vagas")
+        freq_selecionada = _slider_contagem(
+            'faixa_vagas',
+            "Filtrar cursos pela frequência de turnos/ofertas:",
+            contagem,
+            "Todos os cursos na seleção têm a mesma frequência de oferta."
+        )
+    cascata = cascata.seguir(
+        'faixa',
+        lambda contagem: etapa_faixa(indice, linhas_gerais, contagem, freq_selecionada, 'TURNO'),
+        faixa=freq_selecionada
+    )
+    linhas, totais_cursos, turnos = cascata.valor
+
+    with col_turnos:
+        turnos_opt = _multiselect_lembrado(
+            'turnos',
+            "Turnos",
+            turnos,
+            "Escolha múltiplos turnos"
+        )
+    cascata = cascata.seguir(
+        'turnos', lambda faixa: etapa_refinar(indice, faixa[0], 'TURNO', turnos_opt), turnos=turnos_opt
+    )
+    linhas = cascata.valor
+
+    estado = {
+        **estado_filtros,
+        'faixa_vagas': freq_selecionada,
+        'turnos': turnos_opt,
+    }
+    filtrados = {'df_turnos': indice.tabela(linhas)}
+    if not turnos_opt:
+        filtrados['df_turnos_por_curso'] = totais_cursos
+    derivados = obter_derivados('Vagas', estado, filtrados)
+
+    _altair(graficos.grafico_turnos, derivados['frequencia_df_turnos'], use_container_width=True)
+    _altair(graficos.grafico_turnos_cursos, derivados['frequencia_df_turno_cursos'], use_container_width=True)
+
+    _exportacao('vagas', 'df_turnos', lambda: (indice, linhas, None), indice.contar(linhas), estado_filtros)
+
+
+def construir_aba_tendencias(df_tendencias):
+    if df_tendencias.empty:
+        st.info("Nenhum ano tem dados para os filtros escolhidos.")
+        return
+    _altair(graficos.grafico_tendencias, df_tendencias)
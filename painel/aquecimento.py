@@ -0,0 +1,356 @@
+"""
+Aquecimento dos caches do dashboard.
+
+Sem aquecimento, o primeiro usuário depois de um deploy (ou de limpar os
+caches) paga a leitura das tabelas, a agregação de cada aba, a montagem dos
+gráficos e o mapa. Como a RIDE tem só três UFs, as combinações do filtro de
+UF são poucas (7, mais a visão sem filtro). Para essas combinações e para as
+IES com mais docentes, com os valores iniciais dos filtros de cada aba, o
+aquecimento:
+
+- lê as tabelas (e os cruzamentos) no registro de tabelas;
+- monta a figura do mapa;
+- calcula as tabelas derivadas de todas as abas, no cache compartilhado;
+- percorre as cascatas de filtros dos fragmentos Concluintes e Vagas
+  (`painel.cascata`), no cache das etapas;
+- monta o spec Vega-Lite de cada gráfico (`painel.modelos`), uma vez por
+  gráfico e tipo de tabela.
+
+O app inicia o aquecimento em segundo plano na primeira execução do processo
+(`PAINEL_AQUECER`). Os caches ficam na memória do processo do servidor, então
+só esse aquecimento serve aos usuários. A linha de comando não aquece o app:
+é um relatório, que roda o mesmo aquecimento em um processo à parte (e o
+descarta ao sair) para medir o tempo e a memória que ele ocupa e dimensionar
+o cache (`PAINEL_CACHE_MAX_ENTRADAS`, `PAINEL_CACHE_MAX_MB`):
+
+    $ python -m painel.aquecimento
+    $ python -m painel.aquecimento --ies 20
+    $ python -m painel.aquecimento --ano 2020
+"""
+
+import argparse
+import itertools
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+
+import pandas as pd
+
+from painel import config
+from painel.cache import CacheLRU, chave_estado
+from painel.cascata import Cascata, etapa_contagem, etapa_faixa, etapa_refinar, faixa_inicial, origem_cubo
+from painel.cubos import COLUNA_QTD
+from painel.derivados import (
+    DERIVADOS_POR_ABA,
+    TABELAS_FILTROS,
+    TABELAS_GRAFICOS,
+    calcular_derivados,
+    estado_da_aba,
+)
+from painel.filtros import IndiceInvertido
+from painel.graficos import GRAFICOS_POR_ABA
+from painel.medicao import pico_memoria_mb
+from painel.particoes import anos_disponiveis
+from painel.registro import RegistroDados
+from painel.tabelas import NOMES_TABELAS, cruzamentos, filtrar, pedidos, valores_mapa, versoes_tabelas
+
+if TYPE_CHECKING:
+    from painel.modelos import ModelosGraficos
+    from painel.motor_sql import MotorDuckDB
+
+# abas com filtros próprios, como em `painel.abas`:
+# (cubo, chave do slider, chave do multiselect, coluna do multiselect, etapa do multiselect)
+FILTROS_DAS_ABAS = {
+    'Concluintes': ('df_concluintes', 'faixa_concluintes', 'racas_concluintes', 'RAÇA', 'racas'),
+    'Vagas': ('df_turnos', 'faixa_vagas', 'turnos', 'TURNO', 'turnos'),
+}
+
+# etapas de cada cascata: filtros gerais, contagem por curso, faixa e multiselect
+ETAPAS_POR_CASCATA = 4
+
+# com mais UFs (ex: dados nacionais), as combinações crescem como 2^n
+MAX_UFS_COMBINADAS = 4
+
+
+def ies_com_mais_docentes(indices: dict[str, IndiceInvertido], quantidade: int) -> list[str]:
+    """Nomes das `quantidade` IES com mais docentes."""
+    if quantidade <= 0:
+        return []
+    docentes = indices['df_docentes'].df.groupby('ID_IES', observed=True)[COLUNA_QTD].sum()
+    por_ies = indices['df_dim_ies'].df.merge(docentes.reset_index(), on='ID_IES')
+    por_ies = por_ies.groupby('NO_IES', observed=True)[COLUNA_QTD].sum()
+    return [str(nome) for nome in por_ies.nlargest(quantidade).index]
+
+
+def filtros_para_aquecer(
+    indices: dict[str, IndiceInvertido],
+    quantidade_ies: int,
+    motor: 'MotorDuckDB | None' = None
+) -> list[dict]:
+    """
+    Estados dos filtros gerais a aquecer, do mais ao menos provável.
+
+    Retorna:
+    - A visão sem filtro, cada combinação não vazia de UFs (ou cada UF
+      sozinha, com mais de `MAX_UFS_COMBINADAS` UFs) e cada uma das
+      `quantidade_ies` IES com mais docentes, no formato {'ufs', 'ies'}.
+    """
+
+    ufs = sorted(str(uf) for uf in indices['df_dim_ies'].df['UF'].unique())
+    tamanhos = range(1, len(ufs) + 1) if len(ufs) <= MAX_UFS_COMBINADAS else [1]
+    combinacoes = [
+        list(combinacao)
+        for tamanho in tamanhos
+        for combinacao in itertools.combinations(ufs, tamanho)
+    ]
+    if motor is None:
+        mais_docentes = ies_com_mais_docentes(indices, quantidade_ies)
+    else:
+        mais_docentes = motor.ies_com_mais_docentes(quantidade_ies)
+    return (
+        [{'ufs': [], 'ies': []}]
+        + [{'ufs': combinacao, 'ies': []} for combinacao in combinacoes]
+        + [{'ufs': [], 'ies': [nome]} for nome in mais_docentes]
+    )
+
+
+def _cascata_inicial(
+    etapas: CacheLRU,
+    aba: str,
+    versoes: dict,
+    estado_filtros: dict,
+    geral: Callable[[], tuple[IndiceInvertido, Any]]
+) -> tuple[dict, pd.DataFrame]:
+    """
+    Percorre, guardando em `etapas`, a cascata do fragmento da aba `aba` com
+    os filtros da aba no valor inicial (ver `painel.abas.construir_aba_concluintes`).
+
+    Parâmetros:
+    - geral: Função que devolve o índice e as linhas do cubo filtrado por
+      UF/IES, como `tabela_do_fragmento` do app.
+
+    Retorna:
+    - Estado com que a aba chama `obter_derivados` ao abrir e o cubo filtrado
+      pelos filtros gerais.
+    """
+
+    nome, chave_faixa, chave_escolhidos, coluna, etapa_escolhidos = FILTROS_DAS_ABAS[aba]
+    cascata = Cascata(etapas, origem_cubo(nome, versoes)).seguir(
+        'geral', lambda _: geral(), ufs=estado_filtros['ufs'], ies=estado_filtros['ies']
+    )
+    indice, linhas = cascata.valor
+    cascata = cascata.seguir('contagem', etapa_contagem)
+    faixa = faixa_inicial(cascata.valor)
+    cascata = cascata.seguir(
+        'faixa', lambda contagem: etapa_faixa(indice, linhas, contagem, faixa, coluna), faixa=faixa
+    )
+    cascata.seguir(
+        etapa_escolhidos, lambda resultado: etapa_refinar(indice, resultado[0], coluna, []),
+        **{etapa_escolhidos: []}
+    )
+
+    # com a faixa inteira e nada escolhido no multiselect, o fragmento não filtra o cubo
+    estado = {**estado_filtros, chave_faixa: faixa, chave_escolhidos: []}
+    return estado, indice.tabela(linhas)
+
+
+def aquecer(
+    registro: RegistroDados,
+    cache: CacheLRU,
+    raiz: Path,
+    quantidade_ies: int = 10,
+    mapa: Callable[[tuple], Any] | None = None,
+    progresso: Callable[[int, int, str], None] | None = None,
+    motor: 'MotorDuckDB | None' = None,
+    ano: int | None = None,
+    parar: threading.Event | None = None,
+    etapas: CacheLRU | None = None,
+    modelos: 'ModelosGraficos | None' = None
+) -> dict:
+    """
+    Calcula e guarda no cache as tabelas derivadas das visões mais comuns,
+    com as cascatas dos fragmentos e os modelos dos gráficos de cada aba.
+
+    Parâmetros:
+    - registro: Registro de tabelas do processo (também é aquecido).
+    - cache: Cache das tabelas derivadas usado pelo app.
+    - raiz: Raiz que contém `data/`.
+    - quantidade_ies: Quantas IES, das com mais docentes, aquecer.
+    - mapa: Função que monta (e guarda) a figura do mapa, ex: `painel.abas.get_mapa`.
+    - progresso: Chamada a cada entrada com (feitas, total, descrição).
+    - motor: Motor SQL (`PAINEL_MOTOR=duckdb`); sem ele, usa o pandas.
+    - ano: Ano das partições (`painel.particoes`); None = as tabelas de `data/`.
+    - parar: Quando ligado, o aquecimento termina depois da entrada em curso.
+    - etapas: Cache das etapas das cascatas dos fragmentos usado pelo app.
+    - modelos: Modelos dos gráficos usados pelo app (`PAINEL_MODELOS_GRAFICOS`).
+
+    Retorna:
+    - Entradas aquecidas, entradas que não couberam no cache, cascatas
+      guardadas, modelos de gráfico montados, tempo (s), memória do cache e
+      do registro (bytes) e pico de memória (MB).
+    """
+
+    inicio = time.perf_counter()
+    versoes = versoes_tabelas(raiz, ano)
+    # com o motor SQL, só as tabelas pequenas usadas fora das agregações são carregadas
+    nomes = NOMES_TABELAS if motor is None else TABELAS_FILTROS + [*itertools.chain(*TABELAS_GRAFICOS.values())]
+    indices = registro.carregar(pedidos(nomes, versoes, ano))
+    cruzamentos_tabelas = cruzamentos(registro, indices, versoes, ano)
+    if mapa is not None:
+        mapa(valores_mapa(indices['df_tabela_mapa']))
+
+    estados = [
+        (estado_filtros, aba)
+        for estado_filtros in filtros_para_aquecer(indices, quantidade_ies, motor)
+        for aba in DERIVADOS_POR_ABA
+    ]
+    # entradas além da capacidade do cache descartariam as primeiras
+    aquecidos, excedentes = estados[:cache.max_entradas], estados[cache.max_entradas:]
+    # o mesmo vale para as cascatas no cache das etapas; as que não cabem (ou
+    # sem `etapas`) são percorridas à parte, só para a faixa inicial do slider
+    max_cascatas = etapas.max_entradas // ETAPAS_POR_CASCATA if etapas is not None else 0
+
+    ultimo_filtro = None
+    feitas = 0
+    cascatas = 0
+    for estado_filtros, aba in aquecidos:
+        if parar is not None and parar.is_set():
+            break
+        feitas += 1
+        ufs, ies = estado_filtros['ufs'], estado_filtros['ies']
+        if estado_filtros is not ultimo_filtro:
+            linhas, filtrados = filtrar(indices, ufs, ies, cruzamentos_tabelas)
+            ultimo_filtro = estado_filtros
+
+        estado, tabelas = estado_filtros, filtrados
+        if aba in FILTROS_DAS_ABAS:
+            nome = FILTROS_DAS_ABAS[aba][0]
+            if motor is None:
+                geral = lambda: (indices[nome], linhas[nome])
+            else:
+                geral = lambda: (IndiceInvertido(motor.tabela(nome, ufs, ies)), None)
+            if cascatas < max_cascatas:
+                destino = etapas
+                cascatas += 1
+            else:
+                destino = CacheLRU(ETAPAS_POR_CASCATA)
+            estado, cubo = _cascata_inicial(destino, aba, versoes, estado_filtros, geral)
+            tabelas = {nome: cubo}
+            if f'{nome}_cruzamento' in filtrados:
+                tabelas[f'{nome}_cruzamento'] = filtrados[f'{nome}_cruzamento']
+
+        if motor is None:
+            calcular = lambda: calcular_derivados(tabelas, aba)
+        else:
+            calcular = lambda: motor.derivados(aba, ufs, ies, tabelas)
+        derivados = cache.obter(chave_estado(estado_da_aba(aba, estado, versoes)), calcular)
+        if modelos is not None:
+            # cada gráfico é montado uma vez por tipo de tabela; as chamadas seguintes só copiam o spec
+            for funcao, tabela in GRAFICOS_POR_ABA[aba]:
+                modelos.spec(funcao, derivados[tabela])
+
+        if progresso is not None:
+            descricao = ', '.join(estado_filtros['ufs'] + estado_filtros['ies']) or 'sem filtro'
+            progresso(feitas, len(aquecidos), f'{aba} ({descricao})')
+
+    return {
+        'entradas': feitas,
+        'excedentes': len(excedentes),
+        'cascatas': cascatas,
+        'modelos': len(modelos) if modelos is not None else 0,
+        'segundos': time.perf_counter() - inicio,
+        'cache_bytes': cache.estatisticas()['bytes'],
+        'registro_bytes': registro.estatisticas()['bytes'],
+        'memoria_pico_mb': pico_memoria_mb(),
+    }
+
+
+class Aquecimento:
+    """Aquecimento em segundo plano, com o progresso lido pelo painel de instrumentação."""
+
+    def __init__(self, *args, **kwargs):
+        self.feitas = 0
+        self.total = 0
+        self.resumo: dict | None = None
+        self.erro: str | None = None
+        self._parar = threading.Event()
+        self._thread = threading.Thread(
+            target=self._executar, args=args, kwargs={**kwargs, 'parar': self._parar},
+            name='aquecimento', daemon=True
+        )
+        self._thread.start()
+
+    def _progresso(self, feitas: int, total: int, descricao: str) -> None:
+        self.feitas, self.total = feitas, total
+
+    def _executar(self, *args, **kwargs) -> None:
+        try:
+            self.resumo = aquecer(*args, progresso=self._progresso, **kwargs)
+        except Exception as erro:
+            # o app continua funcionando com o cache frio
+            self.erro = repr(erro)
+
+    def parar(self) -> None:
+        """Interrompe o aquecimento e espera a entrada em curso (antes de fechar o motor SQL)."""
+        self._parar.set()
+        self._thread.join()
+
+    def situacao(self) -> dict:
+        return {
+            'concluido': self.resumo is not None,
+            'feitas': self.feitas,
+            'total': self.total,
+            'erro': self.erro,
+            **(self.resumo or {}),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Mede o tempo e a memória do aquecimento dos caches (não aquece o servidor em execução)."
+    )
+    parser.add_argument('--ies', type=int, default=config.AQUECER_IES, help="IES com mais docentes a aquecer")
+    parser.add_argument('--ano', type=int, help="ano das partições em data/anos/ (padrão: o mais recente, se houver)")
+    args = parser.parse_args()
+
+    anos = anos_disponiveis(config.RAIZ_DADOS)
+    ano = args.ano if args.ano is not None else (anos[-1] if anos else None)
+
+    def progresso(feitas: int, total: int, descricao: str) -> None:
+        print(f'[{feitas}/{total}] {descricao}', flush=True)
+
+    motor = None
+    if config.MOTOR == 'duckdb':
+        from painel.motor_sql import MotorDuckDB
+        motor = MotorDuckDB(config.RAIZ_DADOS, ano)
+
+    from painel.modelos import ModelosGraficos
+
+    # os mesmos caches do app (ver `streamlit_app.py`), só neste processo
+    registro = RegistroDados(config.RAIZ_DADOS)
+    cache = CacheLRU(config.CACHE_MAX_ENTRADAS, config.CACHE_MAX_MB * 1024 * 1024)
+    etapas = CacheLRU(config.CACHE_MAX_ENTRADAS, config.CACHE_MAX_MB * 1024 * 1024)
+    modelos = ModelosGraficos() if config.MODELOS_GRAFICOS else None
+    resumo = aquecer(
+        registro, cache, config.RAIZ_DADOS, args.ies, progresso=progresso, motor=motor, ano=ano,
+        etapas=etapas, modelos=modelos
+    )
+    if motor is not None:
+        motor.fechar()
+
+    pico = resumo['memoria_pico_mb']
+    print(
+        f"{resumo['entradas']} entradas, {resumo['cascatas']} cascatas e {resumo['modelos']} modelos de "
+        f"gráfico em {resumo['segundos']:.1f}s; "
+        f"cache {resumo['cache_bytes'] / 2**20:.1f} MB, tabelas {resumo['registro_bytes'] / 2**20:.1f} MB"
+        + (f", pico {pico:.0f} MB" if pico is not None else "")
+    )
+    if resumo['excedentes']:
+        print(f"{resumo['excedentes']} entradas não couberam no cache (PAINEL_CACHE_MAX_ENTRADAS)")
+    if cache.estatisticas()['descartes']:
+        print(f"{cache.estatisticas()['descartes']} entradas descartadas por memória (PAINEL_CACHE_MAX_MB)")
+
+
+if __name__ == '__main__':
+    main()
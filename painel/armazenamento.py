@@ -0,0 +1,114 @@
+"""
+Leitura das tabelas de `data/` com esquema explícito e formato colunar.
+
+Todas as colunas de texto das tabelas são categorias (UF, NO_IES, CURSO,
+RAÇA, ...), então são lidas como `category`: cada valor é guardado uma única
+vez e os filtros (`isin`) e contagens trabalham sobre códigos inteiros.
+
+Se existir uma versão Parquet da tabela em `data/parquet/`, ela é lida no
+lugar do CSV. Para converter os CSVs:
+
+    $ python -m painel.armazenamento
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+PASTA_DADOS = Path('data')
+PASTA_PARQUET = PASTA_DADOS / 'parquet'
+
+COLUNAS_CATEGORICAS = [
+    'UF',
+    'NO_IES',
+    'CURSO',
+    'RAÇA',
+    'TURNO',
+    'SEXO',
+    'ESCOLARIDADE',
+    'FAIXA_ETARIA',
+    'COR_RACA',
+    'TP_REDE',
+    'IN_SERVICO_INTERNET',
+    'IN_REPOSITORIO_INSTITUCIONAL',
+    'estado',
+]
+
+COLUNAS_NUMERICAS = {
+    'ID_IES': 'int64',
+    'QTD': 'int64',
+    'valor': 'int64',
+    'lat': 'float64',
+    'lon': 'float64',
+}
+
+
+def esquema(colunas: list[str]) -> dict[str, str]:
+    """Tipos das colunas conhecidas entre `colunas`."""
+    tipos = {coluna: 'category' for coluna in COLUNAS_CATEGORICAS}
+    tipos.update(COLUNAS_NUMERICAS)
+    return {coluna: tipos[coluna] for coluna in colunas if coluna in tipos}
+
+
+def caminho_colunar(caminho: Path | str) -> Path:
+    """
+    Caminho da versão Parquet de um CSV de `data/`.
+
+    Ex: `data/tabela_uf.csv` -> `data/parquet/tabela_uf.parquet` e
+    `data/cubos/concluintes.csv` -> `data/parquet/cubos/concluintes.parquet`.
+    """
+
+    relativo = Path(caminho).relative_to(PASTA_DADOS)
+    return PASTA_PARQUET / relativo.with_suffix('.parquet')
+
+
+def ler_csv(caminho: Path) -> pd.DataFrame:
+    """Lê um CSV aplicando o esquema às colunas conhecidas."""
+    colunas = pd.read_csv(caminho, nrows=0).columns
+    return pd.read_csv(caminho, dtype=esquema(list(colunas)))
+
+
+def ler_tabela(caminho: Path | str, raiz: Path = RAIZ) -> pd.DataFrame:
+    """
+    Lê uma tabela de `data/`, preferindo a versão Parquet quando ela existe.
+
+    Parâmetros:
+    - caminho: Caminho do CSV, relativo à raiz do projeto.
+    - raiz: Raiz do projeto.
+
+    Retorna:
+    - DataFrame com as colunas de texto como `category`.
+    """
+
+    colunar = raiz / caminho_colunar(caminho)
+    if colunar.exists():
+        return pd.read_parquet(colunar, memory_map=True)
+    return ler_csv(raiz / caminho)
+
+
+def converter(raiz: Path = RAIZ) -> list[tuple[Path, Path]]:
+    """
+    Converte todos os CSVs de `data/` (incluindo os cubos) para Parquet.
+
+    Retorna:
+    - Lista de pares (CSV, Parquet) convertidos, relativos à raiz.
+    """
+
+    convertidos = []
+    for csv in sorted((raiz / PASTA_DADOS).rglob('*.csv')):
+        relativo = csv.relative_to(raiz)
+        destino = caminho_colunar(relativo)
+        (raiz / destino).parent.mkdir(parents=True, exist_ok=True)
+        ler_csv(csv).to_parquet(raiz / destino, index=False)
+        convertidos.append((relativo, destino))
+    return convertidos
+
+
+def main() -> None:
+    for csv, parquet in converter():
+        print(f'{csv} -> {parquet}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+"""
+Benchmark de uma execução completa do dashboard com dados sintéticos.
+
+Gera cópias das tabelas de `data/` com os mesmos esquemas em escalas
+crescentes e executa o `streamlit_app.py` sem navegador (AppTest) em cada
+uma, passando por cenários de filtro e por todas as abas. Para cada execução
+registra o tempo das etapas medidas pelo app (`painel.medicao`: carga,
+filtros, agregacao, graficos, serializacao) e o pico de memória do processo.
+
+    $ python -m painel.benchmark --escalas 1x 10x --saida benchmark.json
+
+Cada escala roda em um processo separado, com `PAINEL_RAIZ_DADOS` apontando
+para a pasta dos dados sintéticos e sem aquecimento nem pré-carga. O resultado é um JSON com uma linha por
+(escala, cenário, aba, execução), acompanhado do commit e das versões das
+bibliotecas, para comparar execuções entre commits.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from painel.armazenamento import converter, ler_tabela
+from painel.cubos import gerar_cubos
+from painel.medicao import pico_memoria_mb
+
+RAIZ = Path(__file__).resolve().parent.parent
+APP = RAIZ / 'streamlit_app.py'
+
+UFS_BRASIL = [
+    'AC', 'AL', 'AM', 'AP', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MG', 'MS', 'MT', 'PA',
+    'PB', 'PE', 'PI', 'PR', 'RJ', 'RN', 'RO', 'RR', 'RS', 'SC', 'SE', 'SP', 'TO',
+]
+
+# escala -> (cópias de cada IES, espalhar as cópias pelas 27 UFs)
+# 'censo' tem ~2.600 IES em todo o país, a ordem de grandeza do Censo da
+# Educação Superior.
+ESCALAS = {
+    '1x': (1, False),
+    '10x': (10, False),
+    '100x': (100, False),
+    'censo': (32, True),
+}
+
+# tabelas lidas pelo app (direta ou indiretamente, pelos cubos)
+TABELAS = [
+    'data/dim_ies.csv',
+    'data/fato_docentes.csv',
+    'data/tabela_doc_faixa_etaria.csv',
+    'data/tabela_tp_rede.csv',
+    'data/tabela_acesso_internet.csv',
+    'data/tabela_repositorio_inst.csv',
+    'data/tabela_uf.csv',
+    'data/tabela_mapa.csv',
+    'data/qtd_total_concluintes.csv',
+    'data/qtd_total_vaga.csv',
+]
+
+CENARIOS = ['sem_filtro', 'uma_uf', 'varias_ies', 'faixas']
+ABAS_FAIXAS = ['Concluintes', 'Vagas']
+
+
+def _replicar(df: pd.DataFrame, copias: int, nacional: bool, maior_id: int) -> pd.DataFrame:
+    """
+    Empilha `copias` cópias de `df` como se fossem IES diferentes.
+
+    A cópia 0 é a tabela original. Nas demais, NO_IES recebe o número da
+    cópia, ID_IES é deslocado e, se `nacional`, a UF é trocada de forma que
+    a mesma IES fique na mesma UF em todas as tabelas.
+    """
+
+    partes = []
+    for copia in range(copias):
+        parte = df.copy()
+        if copia:
+            if 'NO_IES' in parte:
+                parte['NO_IES'] = parte['NO_IES'].astype(str) + f' ({copia})'
+            if 'ID_IES' in parte:
+                parte['ID_IES'] = parte['ID_IES'] + copia * maior_id
+            if nacional and 'UF' in parte:
+                parte['UF'] = parte['UF'].astype(str).map(
+                    lambda uf: UFS_BRASIL[(UFS_BRASIL.index(uf) + copia) % len(UFS_BRASIL)]
+                )
+        partes.append(parte.astype({coluna: str for coluna in parte.columns if parte[coluna].dtype == 'category'}))
+    return pd.concat(partes, ignore_index=True)
+
+
+def _vagas_sinteticas(concluintes: pd.DataFrame, semente: int = 0) -> pd.DataFrame:
+    """Ofertas (IES, curso, turno) quando `qtd_total_vaga.csv` não existe."""
+    rng = np.random.default_rng(semente)
+    cursos = concluintes[['NO_IES', 'UF', 'CURSO']].astype(str).drop_duplicates()
+    turnos = np.array(['INTEGRAL', 'MATUTINO', 'NOTURNO', 'VESPERTINO'])
+    vagas = cursos.loc[cursos.index.repeat(rng.integers(1, 4, len(cursos)))].copy()
+    vagas['TURNO'] = turnos[rng.integers(0, len(turnos), len(vagas))]
+    return vagas.reset_index(drop=True)
+
+
+def gerar_dados(destino: Path, escala: str, parquet: bool = False, raiz: Path = RAIZ) -> dict[str, int]:
+    """
+    Escreve em `destino/data/` as tabelas do app na escala pedida e gera os cubos.
+
+    Retorna:
+    - Número de linhas de cada tabela gerada.
+    """
+
+    copias, nacional = ESCALAS[escala]
+    maior_id = int(ler_tabela('data/dim_ies.csv', raiz)['ID_IES'].max())
+    (destino / 'data').mkdir(parents=True, exist_ok=True)
+
+    linhas = {}
+    for tabela in TABELAS:
+        if (raiz / tabela).exists():
+            df = ler_tabela(tabela, raiz)
+        elif tabela == 'data/qtd_total_vaga.csv':
+            df = _vagas_sinteticas(ler_tabela('data/qtd_total_concluintes.csv', raiz))
+        else:
+            raise FileNotFoundError(f'{tabela} não encontrado em {raiz}')
+
+        if tabela != 'data/tabela_mapa.csv':
+            df = _replicar(df, copias, nacional, maior_id)
+        df.to_csv(destino / tabela, index=False)
+        linhas[tabela] = len(df)
+
+    gerar_cubos(destino)
+    if parquet:
+        converter(destino)
+    return linhas
+
+
+def _executar(at, rotulo: dict) -> dict:
+    inicio = time.perf_counter()
+    at.run()
+    parede = time.perf_counter() - inicio
+    if at.exception:
+        raise RuntimeError(f'{rotulo}: {at.exception[0].value}')
+    medicao = at.session_state['_medicao']
+    return {
+        **rotulo,
+        **{f'etapa_{nome}': segundos for nome, segundos in medicao['etapas'].items()},
+        'script': medicao['total'],
+        'parede': parede,
+        'memoria_pico_mb': pico_memoria_mb(),
+    }
+
+
+def _aplicar_cenario(at, cenario: str) -> None:
+    ufs, ies = at.sidebar.multiselect[0], at.sidebar.multiselect[1]
+    if cenario == 'uma_uf':
+        ufs.set_value([ufs.options[0]])
+    elif cenario == 'varias_ies':
+        ies.set_value(ies.options[:5])
+
+
+def _aplicar_faixa(at) -> None:
+    """Seleciona a metade inferior do slider de contagem por curso."""
+    if not at.slider:
+        return
+    slider = at.slider[0]
+    minimo, maximo = slider.min, slider.max
+    slider.set_value((minimo, max(minimo + 1, (minimo + maximo) // 2)))
+
+
+def medir_escala(repeticoes: int) -> list[dict]:
+    """
+    Executa os cenários no app em um único processo (dados de `PAINEL_RAIZ_DADOS`).
+
+    A primeira execução de cada (cenário, aba) é 'fria' (tabelas derivadas
+    ainda fora do cache); as repetições seguintes são 'quente'.
+    """
+
+    from streamlit.testing.v1 import AppTest
+    from painel.abas import NOMES_ABAS
+
+    registros = []
+
+    at = AppTest.from_file(str(APP), default_timeout=600)
+    registros.append(_executar(at, {'cenario': 'inicial', 'aba': NOMES_ABAS[0], 'execucao': 'carga'}))
+
+    for cenario in CENARIOS:
+        at = AppTest.from_file(str(APP), default_timeout=600)
+        at.run()
+        _aplicar_cenario(at, cenario)
+        abas = ABAS_FAIXAS if cenario == 'faixas' else NOMES_ABAS
+        for aba in abas:
+            at.radio(key='aba').set_value(aba)
+            if cenario == 'faixas':
+                at.run()
+                _aplicar_faixa(at)
+            for repeticao in range(repeticoes):
+                registros.append(_executar(at, {
+                    'cenario': cenario,
+                    'aba': aba,
+                    'execucao': 'fria' if repeticao == 0 else 'quente',
+                }))
+    return registros
+
+
+def _metadados() -> dict:
+    import streamlit
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'commit': commit,
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'streamlit': streamlit.__version__,
+        'plataforma': platform.platform(),
+    }
+
+
+def rodar(escalas: list[str], repeticoes: int, parquet: bool, pasta: Path | None) -> dict:
+    """Gera os dados e mede cada escala em um subprocesso."""
+    resultado = {'metadados': _metadados(), 'tabelas': {}, 'execucoes': []}
+
+    for escala in escalas:
+        destino = Path(pasta) / escala if pasta else Path(tempfile.mkdtemp(prefix=f'painel-{escala}-'))
+        try:
+            inicio = time.perf_counter()
+            resultado['tabelas'][escala] = gerar_dados(destino, escala, parquet)
+            print(f'{escala}: dados gerados em {time.perf_counter() - inicio:.1f}s', file=sys.stderr)
+
+            medicoes = destino / 'medicoes.json'
+            processo = subprocess.run(
+                [sys.executable, '-m', 'painel.benchmark', '--repeticoes', str(repeticoes), '--medir', str(medicoes)],
+                cwd=RAIZ,
+                # sem tarefas em segundo plano, que misturariam a execução fria com a quente
+                env={
+                    **os.environ, 'PAINEL_RAIZ_DADOS': str(destino), 'PAINEL_AQUECER': '0', 'PAINEL_PRECARREGAR': '0',
+                    'PAINEL_MEDIR': '1',
+                },
+                capture_output=True,
+                text=True,
+            )
+            if processo.returncode:
+                raise RuntimeError(f'{escala}: falha na medição\n{processo.stderr[-2000:]}')
+            for registro in json.loads(medicoes.read_text(encoding='utf-8')):
+                resultado['execucoes'].append({'escala': escala, **registro})
+        finally:
+            if not pasta:
+                shutil.rmtree(destino, ignore_errors=True)
+
+    return resultado
+
+
+def resumir(resultado: dict) -> pd.DataFrame:
+    """Mediana dos tempos (ms) por escala, cenário e tipo de execução."""
+    df = pd.DataFrame(resultado['execucoes'])
+    tempos = [coluna for coluna in df.columns if coluna.startswith('etapa_')] + ['script']
+    resumo = df.groupby(['escala', 'cenario', 'execucao'], sort=False)[tempos].median() * 1000
+    resumo['memoria_pico_mb'] = df.groupby(['escala', 'cenario', 'execucao'], sort=False)['memoria_pico_mb'].max()
+    return resumo.round(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mede uma execução completa do dashboard com dados sintéticos.")
+    parser.add_argument('--escalas', nargs='+', choices=list(ESCALAS), default=['1x', '10x'])
+    parser.add_argument('--repeticoes', type=int, default=3, help="execuções de cada (cenário, aba)")
+    parser.add_argument('--parquet', action='store_true', help="converte os dados sintéticos para Parquet")
+    parser.add_argument('--pasta', help="mantém os dados sintéticos nesta pasta em vez de uma pasta temporária")
+    parser.add_argument('--saida', default='benchmark.json', help="arquivo JSON com o resultado")
+    parser.add_argument('--medir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        with open(args.medir, 'w', encoding='utf-8') as arquivo:
+            json.dump(medir_escala(args.repeticoes), arquivo)
+        return
+
+    resultado = rodar(args.escalas, args.repeticoes, args.parquet, args.pasta)
+    with open(args.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(resumir(resultado))
+    print(f'Resultado escrito em {args.saida}')
+
+
+if __name__ == '__main__':
+    main()
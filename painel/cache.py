@@ -0,0 +1,126 @@
+"""
+Cache LRU das tabelas derivadas, indexado pelo estado dos filtros.
+
+O estado dos filtros (UFs, IES, faixas dos sliders, raças, turnos) é
+normalizado e transformado em um hash, de forma que a mesma combinação de
+filtros, em qualquer sessão, reaproveita as tabelas já calculadas. O cache
+é limitado em número de entradas e em memória e conta acertos e falhas.
+"""
+
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+import pandas as pd
+
+
+def normalizar_estado(estado: dict) -> dict:
+    """Ordena listas e converte tuplas, para que estados iguais gerem a mesma chave."""
+    normalizado = {}
+    for nome, valor in sorted(estado.items()):
+        if isinstance(valor, (list, set, frozenset)):
+            valor = sorted(valor, key=str)
+        elif isinstance(valor, tuple):
+            # tuplas são faixas (mín, máx): a ordem importa
+            valor = list(valor)
+        normalizado[nome] = valor
+    return normalizado
+
+
+def chave_estado(estado: dict) -> str:
+    """Hash canônico de um estado de filtros."""
+    texto = json.dumps(normalizar_estado(estado), ensure_ascii=False, default=str)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+def tamanho_em_bytes(valor: Any) -> int:
+    """Memória aproximada de um valor em cache (DataFrames, Series, arrays e coleções)."""
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(index=True, deep=True).sum())
+    if isinstance(valor, pd.Series):
+        return int(valor.memory_usage(index=True, deep=True))
+    if isinstance(valor, dict):
+        return sum(tamanho_em_bytes(item) for item in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return sum(tamanho_em_bytes(item) for item in valor)
+    if hasattr(valor, 'nbytes'):
+        # arrays numpy e objetos que informam a própria memória (ex: `IndiceContagem`)
+        return int(valor.nbytes)
+    return sys.getsizeof(valor)
+
+
+class CacheLRU:
+    """
+    Cache com descarte do item usado há mais tempo.
+
+    Parâmetros:
+    - max_entradas: Número máximo de entradas.
+    - max_bytes: Memória máxima somada das entradas (None = sem limite).
+    """
+
+    def __init__(self, max_entradas: int = 128, max_bytes: int | None = None):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+        self._itens: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._trava = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+    def __contains__(self, chave: str) -> bool:
+        return chave in self._itens
+
+    def obter(self, chave: str, calcular: Callable[[], Any]) -> Any:
+        """
+        Devolve o valor de `chave`, calculando-o com `calcular()` se necessário.
+        """
+
+        with self._trava:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return self._itens[chave][0]
+            self.falhas += 1
+
+        valor = calcular()
+        tamanho = tamanho_em_bytes(valor)
+
+        with self._trava:
+            if chave in self._itens:
+                self._bytes -= self._itens.pop(chave)[1]
+            self._itens[chave] = (valor, tamanho)
+            self._bytes += tamanho
+            self._descartar()
+
+        return valor
+
+    def _descartar(self) -> None:
+        while len(self._itens) > 1 and (
+            len(self._itens) > self.max_entradas
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, (_, tamanho) = self._itens.popitem(last=False)
+            self._bytes -= tamanho
+            self.descartes += 1
+
+    def limpar(self) -> None:
+        with self._trava:
+            self._itens.clear()
+            self._bytes = 0
+
+    def estatisticas(self) -> dict[str, int]:
+        """Acertos, falhas, descartes, entradas e memória ocupada (bytes)."""
+        return {
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'descartes': self.descartes,
+            'entradas': len(self._itens),
+            'bytes': self._bytes,
+        }
@@ -0,0 +1,132 @@
+"""
+Cascata dos filtros de uma aba, com o resultado de cada etapa em cache.
+
+Os filtros são aplicados sempre na mesma ordem. Nos concluintes, por
+exemplo: UF e IES, a contagem por curso, a faixa do slider e, por fim, a
+cor/raça. Cada etapa de uma `Cascata` parte do resultado da anterior e é
+guardada em um `CacheLRU` compartilhado pelas sessões, pela chave da etapa
+anterior mais os seus próprios parâmetros. Assim, o resultado de cada etapa
+fica identificado pelo prefixo de filtros que o produziu. Mudar só o último
+filtro (ex: os turnos das vagas) reaproveita as etapas anteriores e aplica
+apenas a última.
+
+A chave de uma etapa usa a marca do resultado da etapa anterior, gerada
+quando esse resultado foi calculado. Se a etapa anterior sair do cache e for
+recalculada, as etapas seguintes também são: as linhas guardadas sempre se
+referem à mesma tabela (com o motor SQL, cada consulta devolve uma tabela
+nova).
+
+As etapas dos fragmentos Concluintes e Vagas (`etapa_contagem`,
+`etapa_faixa` e `etapa_refinar`) ficam aqui, e não em `painel.abas`, para
+que o aquecimento (`painel.aquecimento`) monte as mesmas cascatas com os
+valores iniciais dos filtros.
+"""
+
+import copy
+import uuid
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from painel import config
+from painel.cache import CacheLRU, chave_estado
+from painel.filtros import IndiceContagem, IndiceInvertido
+from painel.medicao import contar_cache, contar_linhas, etapa
+
+
+class Cascata:
+    """
+    Resultado de uma sequência de etapas de filtro.
+
+    Parâmetros:
+    - cache: Cache das etapas.
+    - origem: Identifica os dados de entrada (ex: {'tabela': ..., 'versao': ...}).
+
+    Uma `Cascata` não muda: `seguir` devolve uma nova, então o mesmo objeto
+    pode ser reaproveitado pelos fragmentos a cada reexecução.
+    """
+
+    def __init__(self, cache: CacheLRU, origem: dict):
+        self.cache = cache
+        self.valor: Any = None
+        self.marca = chave_estado(origem)
+
+    def seguir(self, etapa: str, aplicar: Callable[[Any], Any], **parametros) -> 'Cascata':
+        """
+        Aplica a etapa `etapa` ao resultado atual, ou a reaproveita do cache.
+
+        Parâmetros:
+        - etapa: Nome da etapa.
+        - aplicar: Função (resultado da etapa anterior) -> resultado da etapa.
+        - parametros: Filtros da etapa (ex: turnos=[...]), que entram na chave.
+
+        Retorna:
+        - Cascata com o resultado da etapa em `valor`.
+        """
+
+        chave = chave_estado({'_anterior': self.marca, '_etapa': etapa, **parametros})
+        calculado = []
+
+        def calcular():
+            calculado.append(True)
+            return aplicar(self.valor), uuid.uuid4().hex
+
+        valor, marca = self.cache.obter(chave, calcular)
+        contar_cache('etapas', falha=bool(calculado))
+        seguinte = copy.copy(self)
+        seguinte.valor, seguinte.marca = valor, marca
+        return seguinte
+
+
+def origem_cubo(nome: str, versoes: dict) -> dict:
+    """Origem da cascata do cubo `nome` de uma aba com fragmento."""
+    return {'tabela': nome, 'versao': versoes.get(nome), 'motor': config.MOTOR}
+
+
+def etapa_contagem(geral: tuple[IndiceInvertido, np.ndarray | None]) -> IndiceContagem:
+    """Etapa da cascata: `IndiceContagem` por curso da seleção dos filtros gerais."""
+    indice, linhas = geral
+    with etapa('filtros', 'contagem por curso'):
+        return IndiceContagem(indice, linhas)
+
+
+def faixa_inicial(contagem: IndiceContagem) -> tuple[int, int] | None:
+    """Valor inicial do slider de contagem por curso (a faixa inteira), ou None sem o que filtrar."""
+    if contagem.vazio or contagem.minimo >= contagem.maximo:
+        return None
+    return contagem.minimo, contagem.maximo
+
+
+def etapa_faixa(
+    indice: IndiceInvertido,
+    linhas: np.ndarray | None,
+    contagem: IndiceContagem,
+    faixa: tuple[int, int] | None,
+    coluna: str
+) -> tuple[np.ndarray | None, pd.Series, list]:
+    """
+    Etapa da cascata: linhas e totais por curso dos cursos na `faixa` do
+    slider (None = todos), e os valores de `coluna` que restam, para o
+    multiselect da etapa seguinte.
+    """
+
+    totais_cursos = contagem.contagens
+    if faixa is not None:
+        with etapa('filtros'):
+            entrada = indice.contar(linhas)
+            linhas = contagem.linhas(*faixa)
+            totais_cursos = contagem.totais(*faixa)
+            contar_linhas('CURSO', entrada, indice.contar(linhas))
+    return linhas, totais_cursos, sorted(indice.tabela(linhas)[coluna].unique())
+
+
+def etapa_refinar(indice: IndiceInvertido, linhas: np.ndarray | None, coluna: str, valores: list) -> np.ndarray | None:
+    """Etapa da cascata: linhas com `coluna` em `valores` (vazio = todas)."""
+    if not valores:
+        return linhas
+    with etapa('filtros'):
+        entrada = indice.contar(linhas)
+        linhas = indice.refinar(linhas, coluna, valores)
+        contar_linhas(coluna, entrada, indice.contar(linhas))
+    return linhas
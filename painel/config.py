@@ -0,0 +1,56 @@
+"""
+Configurações do dashboard lidas de variáveis de ambiente.
+
+| Variável                      | Padrão   | Uso                                            |
+|-------------------------------|----------|------------------------------------------------|
+| PAINEL_CACHE_MAX_ENTRADAS     | 128      | Estados de filtro guardados no cache LRU       |
+| PAINEL_CACHE_MAX_MB           | 256      | Memória máxima das tabelas em cache (MB)       |
+| PAINEL_RAIZ_DADOS             | raiz     | Pasta que contém o `data/` lido pelo app       |
+| PAINEL_ADMIN_TOKEN            | —        | Token do painel de instrumentação (`?admin=`)  |
+| PAINEL_HISTORICO_EXECUCOES    | 20       | Execuções exibidas no painel de instrumentação |
+| PAINEL_TRACE_ARQUIVO          | —        | Arquivo JSON lines com a medição das execuções |
+| PAINEL_MEDIR                  | 0        | Mede as execuções mesmo sem painel nem trace   |
+| PAINEL_PRECARREGAR            | 1        | Lê em segundo plano as tabelas das outras abas |
+| PAINEL_AQUECER                | 1        | Aquece os caches na primeira execução          |
+| PAINEL_AQUECER_IES            | 10       | IES com mais docentes incluídas no aquecimento |
+| PAINEL_MOTOR                  | pandas   | Motor das consultas: `pandas` ou `duckdb`      |
+| PAINEL_MODELOS_GRAFICOS       | 1        | Reaproveita o spec montado de cada gráfico     |
+| PAINEL_EXPORTAR_MAX_LINHAS    | 200000   | Linhas máximas de uma exportação pelo app      |
+| PAINEL_REGISTRO_MAX_RECORTES  | 8        | Recortes de UFs das partições no registro      |
+| PAINEL_CRUZAMENTO_MAX_CELULAS | 20000000 | Células máximas do array de um cruzamento      |
+"""
+
+import os
+from pathlib import Path
+
+
+def _inteiro(nome: str, padrao: int) -> int:
+    valor = os.environ.get(nome)
+    if not valor:
+        return padrao
+    try:
+        return int(valor)
+    except ValueError:
+        raise ValueError(f"{nome} deve ser um número inteiro, recebido {valor!r}.") from None
+
+
+CACHE_MAX_ENTRADAS = _inteiro('PAINEL_CACHE_MAX_ENTRADAS', 128)
+CACHE_MAX_MB = _inteiro('PAINEL_CACHE_MAX_MB', 256)
+RAIZ_DADOS = Path(os.environ.get('PAINEL_RAIZ_DADOS') or Path(__file__).resolve().parent.parent)
+ADMIN_TOKEN = os.environ.get('PAINEL_ADMIN_TOKEN') or None
+HISTORICO_EXECUCOES = _inteiro('PAINEL_HISTORICO_EXECUCOES', 20)
+TRACE_ARQUIVO = os.environ.get('PAINEL_TRACE_ARQUIVO') or None
+MEDIR = _inteiro('PAINEL_MEDIR', 0) != 0
+PRECARREGAR = _inteiro('PAINEL_PRECARREGAR', 1) != 0
+AQUECER = _inteiro('PAINEL_AQUECER', 1) != 0
+AQUECER_IES = _inteiro('PAINEL_AQUECER_IES', 10)
+MODELOS_GRAFICOS = _inteiro('PAINEL_MODELOS_GRAFICOS', 1) != 0
+EXPORTAR_MAX_LINHAS = _inteiro('PAINEL_EXPORTAR_MAX_LINHAS', 200_000)
+REGISTRO_MAX_RECORTES = _inteiro('PAINEL_REGISTRO_MAX_RECORTES', 8)
+# 20 milhões de células int64 = 160 MB
+CRUZAMENTO_MAX_CELULAS = _inteiro('PAINEL_CRUZAMENTO_MAX_CELULAS', 20_000_000)
+
+MOTORES = ['pandas', 'duckdb']
+MOTOR = os.environ.get('PAINEL_MOTOR') or 'pandas'
+if MOTOR not in MOTORES:
+    raise ValueError(f"PAINEL_MOTOR deve ser um de {MOTORES}, recebido {MOTOR!r}.")
@@ -0,0 +1,271 @@
+"""
+Reconstrução incremental das tabelas derivadas de `data/`.
+
+Várias tabelas de `data/` são derivadas das mesmas fontes: as tabelas por
+IES (`tabela_uf`, `tabela_tp_rede`, ...) são projeções de `data/ies.csv`,
+`tabela_mapa` é uma contagem por UF, o heatmap é um cruzamento, e os cubos e
+a tabela fato de docentes vêm das tabelas linha a linha. `REGRAS` descreve
+esse grafo: cada saída, as entradas de que depende e a função que a gera.
+
+O manifesto `data/manifesto.json` guarda o hash (SHA-256) do conteúdo de
+cada entrada e saída. Uma saída só é regerada quando o hash de alguma
+entrada mudou, ou quando ela não existe ou foi alterada à mão. O app usa os
+hashes do manifesto como versão de cada tabela em cache (ver
+`versoes_dados`), então só as tabelas que mudaram são relidas.
+
+O manifesto de `data/` é versionado e só descreve arquivos versionados. Os
+cubos (`data/cubos/`) ficam fora do git, e as suas regras e hashes (inclusive
+os das origens que só eles usam) vão para um manifesto local,
+`data/cubos/manifesto.json`, que o app lê junto com o de `data/`. Assim,
+gerar os cubos não altera o manifesto versionado.
+
+    $ python -m painel.construcao            # regera o que mudou
+    $ python -m painel.construcao --forcar   # regera tudo
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from painel.armazenamento import ler_csv
+from painel.cubos import CUBOS, PASTA_CUBOS, caminho_cubo, construir_cubo
+from painel.docentes import (
+    ARQUIVO_DIM_IES,
+    ARQUIVO_FATO_DOCENTES,
+    ORIGEM_DOCENTES,
+    ORIGEM_IES,
+    ORIGEM_SEXO,
+    construir_dim_ies,
+    construir_fato_docentes,
+)
+from painel.mapa import ARQUIVO_CENTROIDES
+
+RAIZ = Path(__file__).resolve().parent.parent
+ARQUIVO_MANIFESTO = Path('data/manifesto.json')
+# manifesto das saídas fora do git (ver .gitignore)
+ARQUIVO_MANIFESTO_LOCAL = PASTA_CUBOS / 'manifesto.json'
+FONTE_IES = Path('data/ies.csv')
+
+COLUNAS_HEATMAP = ['PUBLICA - SIM', 'PUBLICA - NÃO', 'PRIVADA - SIM', 'PRIVADA - NÃO']
+
+
+def hash_arquivo(caminho: Path) -> str:
+    """SHA-256 do conteúdo de um arquivo, lido em blocos."""
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(1 << 20), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _ler(raiz: Path, caminho: Path | str) -> pd.DataFrame:
+    return ler_csv(raiz / caminho)
+
+
+def _projecao(colunas: list[str]) -> Callable[[Path], pd.DataFrame]:
+    def projetar(raiz: Path) -> pd.DataFrame:
+        return _ler(raiz, FONTE_IES)[colunas]
+    return projetar
+
+
+def construir_mapa(raiz: Path) -> pd.DataFrame:
+    """Número de IES por UF, com o centroide de cada UF."""
+    ies = _ler(raiz, FONTE_IES)
+    mapa = ies['UF'].astype(str).value_counts(sort=False).sort_index().rename_axis('estado').reset_index(name='valor')
+    centroides = pd.read_csv(raiz / ARQUIVO_CENTROIDES).rename(columns={'sigla': 'estado'})
+    return mapa.merge(centroides, on='estado', how='left')
+
+
+def construir_heatmap(raiz: Path) -> pd.DataFrame:
+    """IES por UF e por (tipo de rede, acesso à internet), uma coluna por combinação."""
+    ies = _ler(raiz, FONTE_IES).astype(str)
+    cruzamento = pd.crosstab(ies['UF'], ies['TP_REDE'] + ' - ' + ies['IN_SERVICO_INTERNET'])
+    return cruzamento.reindex(columns=COLUNAS_HEATMAP, fill_value=0).rename_axis(columns=None).reset_index()
+
+
+def _dim_ies(raiz: Path) -> pd.DataFrame:
+    return construir_dim_ies(_ler(raiz, ORIGEM_IES))
+
+
+def _fato_docentes(raiz: Path) -> pd.DataFrame:
+    return construir_fato_docentes(
+        _ler(raiz, ORIGEM_DOCENTES),
+        _ler(raiz, ORIGEM_SEXO),
+        _ler(raiz, ARQUIVO_DIM_IES)
+    )
+
+
+def _cubo(origem: str, dimensoes: list[str]) -> Callable[[Path], pd.DataFrame]:
+    def construir(raiz: Path) -> pd.DataFrame:
+        return construir_cubo(_ler(raiz, origem), dimensoes)
+    return construir
+
+
+# saída -> (entradas, função que gera a saída a partir da raiz), em ordem
+# topológica: as entradas de uma regra são fontes ou saídas de regras anteriores.
+REGRAS: dict[str, tuple[list[str], Callable[[Path], pd.DataFrame]]] = {
+    str(ORIGEM_IES): ([str(FONTE_IES)], _projecao(['NO_IES', 'IN_SERVICO_INTERNET', 'UF'])),
+    'data/tabela_acesso_internet.csv': ([str(FONTE_IES)], _projecao(['NO_IES', 'IN_SERVICO_INTERNET', 'UF'])),
+    'data/tabela_tp_rede.csv': ([str(FONTE_IES)], _projecao(['NO_IES', 'TP_REDE', 'UF'])),
+    'data/tabela_repositorio_inst.csv': ([str(FONTE_IES)], _projecao(['NO_IES', 'IN_REPOSITORIO_INSTITUCIONAL', 'UF'])),
+    'data/tabela_uf.csv': ([str(FONTE_IES)], _projecao(['NO_IES', 'UF'])),
+    'data/tabela_mapa.csv': ([str(FONTE_IES), str(ARQUIVO_CENTROIDES)], construir_mapa),
+    'data/tabela_heatmap_escol_internet.csv': ([str(FONTE_IES)], construir_heatmap),
+    str(ARQUIVO_DIM_IES): ([str(ORIGEM_IES)], _dim_ies),
+    str(ARQUIVO_FATO_DOCENTES): (
+        [str(ORIGEM_DOCENTES), str(ORIGEM_SEXO), str(ARQUIVO_DIM_IES)],
+        _fato_docentes
+    ),
+    **{
+        str(caminho_cubo(nome)): ([origem], _cubo(origem, dimensoes))
+        for nome, (origem, dimensoes) in CUBOS.items()
+    },
+}
+
+SAIDAS_IES = [
+    saida for saida, (entradas, _) in REGRAS.items() if entradas[0] == str(FONTE_IES)
+] + [str(ARQUIVO_DIM_IES)]
+
+
+def _local(saida: str) -> bool:
+    """A saída fica fora do git e a sua regra, no manifesto local."""
+    return Path(saida).is_relative_to(PASTA_CUBOS)
+
+
+def ler_manifesto(raiz: Path = RAIZ, local: bool = False) -> dict:
+    caminho = raiz / (ARQUIVO_MANIFESTO_LOCAL if local else ARQUIVO_MANIFESTO)
+    if not caminho.exists():
+        return {'arquivos': {}, 'regras': {}}
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def _escrever_manifesto(manifesto: dict, raiz: Path, local: bool = False) -> None:
+    caminho = raiz / (ARQUIVO_MANIFESTO_LOCAL if local else ARQUIVO_MANIFESTO)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    temporario = caminho.with_suffix('.tmp')
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False, indent=2, sort_keys=True)
+        arquivo.write('\n')
+    # troca atômica: o app nunca lê um manifesto pela metade
+    os.replace(temporario, caminho)
+
+
+def _escrever(tabela: pd.DataFrame, destino: Path, saida: str) -> None:
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    # `tabela_mapa.csv` tem a coluna de índice, como o arquivo original
+    tabela.to_csv(destino, index=saida == 'data/tabela_mapa.csv')
+
+
+def construir(raiz: Path = RAIZ, saidas: list[str] | None = None, forcar: bool = False) -> dict[str, str]:
+    """
+    Regera as saídas de `REGRAS` cujas entradas mudaram e atualiza os manifestos.
+
+    Parâmetros:
+    - raiz: Raiz que contém `data/`.
+    - saidas: Restringe a construção a estas saídas (padrão: todas).
+    - forcar: Regera mesmo o que não mudou.
+
+    Retorna:
+    - Situação de cada saída: 'regerada', 'atual' ou 'sem entradas' (alguma
+      entrada não existe; a saída existente, se houver, é mantida).
+    """
+
+    # manifesto versionado (False) e local (True), cada um com os arquivos das suas regras
+    manifestos = {local: ler_manifesto(raiz, local) for local in (False, True)}
+    usados = {local: {saida for saida in REGRAS if _local(saida) == local} for local in (False, True)}
+    hashes = {}
+
+    def hash_atual(caminho: str) -> str | None:
+        if caminho not in hashes:
+            arquivo = raiz / caminho
+            hashes[caminho] = hash_arquivo(arquivo) if arquivo.exists() else None
+        return hashes[caminho]
+
+    situacao = {}
+    for saida, (entradas, gerar) in REGRAS.items():
+        if saidas is not None and saida not in saidas:
+            continue
+
+        manifesto = manifestos[_local(saida)]
+        usados[_local(saida)].update(entradas)
+        hashes_entradas = {entrada: hash_atual(entrada) for entrada in entradas}
+        if None in hashes_entradas.values():
+            situacao[saida] = 'sem entradas'
+            continue
+
+        anterior = manifesto['regras'].get(saida, {})
+        atual = (
+            not forcar
+            and anterior.get('entradas') == hashes_entradas
+            and anterior.get('saida') == hash_atual(saida)
+        )
+        if not atual:
+            _escrever(gerar(raiz), raiz / saida, saida)
+            hashes.pop(saida, None)
+        situacao[saida] = 'atual' if atual else 'regerada'
+        manifesto['regras'][saida] = {'entradas': hashes_entradas, 'saida': hash_atual(saida)}
+
+    for local, manifesto in manifestos.items():
+        # versão de todos os arquivos conhecidos, inclusive os sem regra (ex: cubos do ETL)
+        conhecidos = set(manifesto['arquivos']) | usados[local]
+        if not local:
+            # os arquivos locais de manifestos anteriores saem do versionado
+            conhecidos = {caminho for caminho in conhecidos if not _local(caminho)}
+        manifesto['arquivos'] = {
+            caminho: hash_atual(caminho) for caminho in sorted(conhecidos) if hash_atual(caminho) is not None
+        }
+        if local and not manifesto['arquivos'] and not (raiz / ARQUIVO_MANIFESTO_LOCAL).exists():
+            continue
+        _escrever_manifesto(manifesto, raiz, local)
+    return situacao
+
+
+@lru_cache(maxsize=8)
+def _versoes(caminho: Path, modificado: int) -> dict[str, str]:
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)['arquivos']
+
+
+def versoes_dados(raiz: Path = RAIZ) -> dict[str, str]:
+    """
+    Hash de cada arquivo de `data/` segundo os manifestos, o de `data/` e o
+    local dos cubos ({} se não houver nenhum).
+
+    Cada manifesto só é relido quando muda (pela data de modificação).
+    """
+
+    versoes = {}
+    for caminho in (raiz / ARQUIVO_MANIFESTO, raiz / ARQUIVO_MANIFESTO_LOCAL):
+        try:
+            modificado = caminho.stat().st_mtime_ns
+        except FileNotFoundError:
+            continue
+        versoes.update(_versoes(caminho, modificado))
+    return versoes
+
+
+def versao_cubo(nome: str, versoes: dict[str, str]) -> str | None:
+    """Versão do cubo `nome`: a do arquivo do cubo ou, se não houver, a da origem."""
+    return versoes.get(str(caminho_cubo(nome))) or versoes.get(CUBOS[nome][0])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Regera as tabelas derivadas de data/ cujas entradas mudaram.")
+    parser.add_argument('saidas', nargs='*', help="saídas a construir (padrão: todas)")
+    parser.add_argument('--forcar', action='store_true', help="regera mesmo o que não mudou")
+    args = parser.parse_args()
+
+    situacao = construir(saidas=args.saidas or None, forcar=args.forcar)
+    for saida, estado in situacao.items():
+        print(f'{saida}: {estado}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+"""
+Cruzamentos (contagens em várias dimensões) dos cubos, em arrays densos.
+
+Um `Cruzamento` guarda as contagens de um cubo em um array numpy com um eixo
+por dimensão, indexado pelo código de cada categoria. Por exemplo, para os
+docentes os eixos são IES × ESCOLARIDADE × COR_RACA × SEXO. O array é montado
+uma vez por versão do cubo (`RegistroDados.cruzamento`). Depois disso:
+
+- filtrar é escolher posições de um eixo (`np.take`);
+- marginalizar é somar os eixos que não aparecem no resultado.
+
+O custo de cada corte depende do tamanho do array, e não do número de linhas
+do cubo. Um gráfico novo que cruze essas dimensões (ex: ESCOLARIDADE × UF,
+RAÇA × UF) sai quase de graça a cada execução.
+
+O primeiro eixo é a IES. Os filtros gerais (UF, NO_IES) e os cortes por UF
+usam os atributos de cada IES (ex: a UF de cada ID_IES, vinda de `dim_ies`).
+
+O array tem uma célula por combinação de IES e categorias, inclusive as que
+não aparecem no cubo: com os dados nacionais (~2.600 IES e centenas de
+cursos), o de concluintes passa de centenas de MB. Acima de
+`PAINEL_CRUZAMENTO_MAX_CELULAS` células (`celulas`), o cruzamento não é
+montado e as tabelas derivadas voltam ao groupby do cubo filtrado.
+"""
+
+import numpy as np
+import pandas as pd
+
+from painel.cubos import COLUNA_QTD
+
+
+def _categorias(coluna: pd.Series) -> pd.Index:
+    """Categorias de um eixo: as do dtype categórico ou os valores ordenados."""
+    if isinstance(coluna.dtype, pd.CategoricalDtype):
+        return coluna.cat.categories
+    return pd.Index(np.sort(coluna.dropna().unique()))
+
+
+def celulas(cubo: pd.DataFrame, entidade: list[str], dimensoes: list[str]) -> int:
+    """Células do array de `Cruzamento(cubo, entidade, dimensoes)`, sem montá-lo."""
+    total = cubo.groupby(entidade, observed=True, sort=False, dropna=False).ngroups
+    for dimensao in dimensoes:
+        # mais a posição dos valores ausentes
+        total *= len(_categorias(cubo[dimensao])) + 1
+    return total
+
+
+class Cruzamento:
+    """
+    Contagens de um cubo em todas as combinações de IES e dimensões.
+
+    Parâmetros:
+    - cubo: Cubo de contagem (com a coluna QTD, ver `painel.cubos`).
+    - entidade: Colunas do cubo que identificam a IES (ex: ['ID_IES'] ou
+      ['UF', 'NO_IES']).
+    - dimensoes: Demais eixos (ex: ['ESCOLARIDADE', 'COR_RACA', 'SEXO']).
+    - atributos: Tabela com as colunas de `entidade` e outras colunas da IES
+      (ex: `dim_ies`, que dá a UF e o NO_IES de cada ID_IES).
+
+    Valores ausentes de uma dimensão ficam em uma posição extra do eixo: não
+    aparecem nos cortes por aquela dimensão, mas entram nos totais das demais.
+    """
+
+    def __init__(
+        self,
+        cubo: pd.DataFrame,
+        entidade: list[str],
+        dimensoes: list[str],
+        atributos: pd.DataFrame | None = None
+    ):
+        codigos_ies = cubo.groupby(entidade, observed=True, sort=False, dropna=False).ngroup().to_numpy()
+        _, primeiras = np.unique(codigos_ies, return_index=True)
+        entidades = cubo[entidade].iloc[primeiras].reset_index(drop=True)
+        if atributos is not None:
+            atributos = atributos.drop_duplicates(entidade)
+            entidades = entidades.merge(atributos, on=entidade, how='left')
+
+        self.dimensoes = list(dimensoes)
+        self.entidades = entidades
+        self.categorias = {}
+        codigos = [codigos_ies]
+        for dimensao in self.dimensoes:
+            coluna = cubo[dimensao]
+            categorias = _categorias(coluna)
+            self.categorias[dimensao] = categorias
+            codigo = categorias.get_indexer(coluna)
+            codigos.append(np.where(codigo < 0, len(categorias), codigo))
+
+        # a última posição de cada dimensão guarda os valores ausentes
+        forma = (len(entidades), *(len(categorias) + 1 for categorias in self.categorias.values()))
+        posicoes = np.ravel_multi_index(codigos, forma)
+        somas = np.bincount(posicoes, weights=cubo[COLUNA_QTD].to_numpy(), minlength=int(np.prod(forma)))
+        self.contagens = somas.astype(np.int64).reshape(forma)
+
+        # marginais já somadas, compartilhadas pelos cruzamentos filtrados
+        self._marginais: dict[tuple[str, ...], np.ndarray] = {}
+        self._base = self
+        self._ies: np.ndarray | None = None
+        self._posicoes: dict[str, np.ndarray] = {}
+
+    @property
+    def nbytes(self) -> int:
+        return int(
+            self.contagens.nbytes
+            + sum(marginal.nbytes for marginal in self._marginais.values())
+            + self.entidades.memory_usage(index=True, deep=True).sum()
+        )
+
+    def _marginal(self, dimensoes: tuple[str, ...]) -> np.ndarray:
+        """Array IES × `dimensoes`, somado nas demais dimensões (calculado uma vez)."""
+        marginal = self._marginais.get(dimensoes)
+        if marginal is None:
+            mantidos = [0] + [self.dimensoes.index(dimensao) + 1 for dimensao in dimensoes]
+            somados = tuple(eixo for eixo in range(self.contagens.ndim) if eixo not in mantidos)
+            marginal = self.contagens.sum(axis=somados) if somados else self.contagens
+            self._marginais[dimensoes] = marginal
+        return marginal
+
+    def filtrar(self, selecoes: dict) -> 'Cruzamento':
+        """
+        Cruzamento restrito às seleções. Só guarda as posições escolhidas de
+        cada eixo; as somas são feitas em `contar`.
+
+        Parâmetros:
+        - selecoes: {coluna: valores aceitos}, com colunas da IES (ex: 'UF',
+          'NO_IES') ou dimensões (ex: 'RAÇA'). None não filtra; uma lista
+          vazia não seleciona nada.
+        """
+
+        base = self._base
+        ies, posicoes = self._ies, dict(self._posicoes)
+        for coluna, valores in selecoes.items():
+            if valores is None:
+                continue
+            if coluna in base.categorias:
+                atuais = posicoes.get(coluna, np.arange(len(base.categorias[coluna])))
+                posicoes[coluna] = atuais[base.categorias[coluna][atuais].isin(valores)]
+            elif coluna in base.entidades.columns:
+                atuais = np.arange(len(base.entidades)) if ies is None else ies
+                ies = atuais[base.entidades[coluna].iloc[atuais].isin(valores)]
+
+        filtrado = object.__new__(Cruzamento)
+        filtrado.__dict__.update(base.__dict__)
+        filtrado._ies, filtrado._posicoes = ies, posicoes
+        return filtrado
+
+    def contar(self, por: list[str], nome_qtd: str = COLUNA_QTD) -> pd.DataFrame:
+        """
+        Contagens por combinação das colunas `por`, somando os demais eixos.
+
+        Parâmetros:
+        - por: Dimensões e/ou colunas da IES do resultado (ex: ['ESCOLARIDADE', 'UF']);
+          com mais de uma coluna da IES, elas devem vir juntas.
+        - nome_qtd: Nome da coluna com as contagens.
+
+        Retorna:
+        - DataFrame no formato de `groupby(por, observed=True)[QTD].sum()`:
+          uma linha por combinação com contagem positiva, em ordem de
+          categoria, e as colunas de `por` como object.
+        """
+
+        base = self._base
+        colunas_ies = [coluna for coluna in por if coluna not in base.categorias]
+        # dimensões do resultado e as filtradas, na ordem de `self.dimensoes`
+        nomes = [
+            dimensao for dimensao in base.dimensoes
+            if dimensao in por or dimensao in self._posicoes
+        ]
+        contagens = base._marginal(tuple(nomes))
+
+        entidades = base.entidades
+        if self._ies is not None:
+            contagens = contagens.take(self._ies, axis=0)
+            entidades = entidades.iloc[self._ies]
+
+        # escolhe as posições de cada eixo, o que também descarta os valores ausentes
+        rotulos = {}
+        for eixo, dimensao in enumerate(nomes, start=1):
+            posicoes = self._posicoes.get(dimensao)
+            if posicoes is None:
+                posicoes = np.arange(len(base.categorias[dimensao]))
+            contagens = contagens.take(posicoes, axis=eixo)
+            rotulos[dimensao] = base.categorias[dimensao].to_numpy(dtype=object)[posicoes]
+        somados = tuple(eixo for eixo, dimensao in enumerate(nomes, start=1) if dimensao not in por)
+        contagens = contagens.sum(axis=somados)
+        nomes = ['IES'] + [dimensao for dimensao in nomes if dimensao in por]
+
+        if colunas_ies:
+            grupos = entidades.groupby(colunas_ies, observed=True, sort=True)
+            # IES sem o atributo (ex: fora de `dim_ies`) ficam de fora, como no groupby
+            codigos = grupos.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+            chaves = grupos.size().index.to_frame(index=False)
+            validos = codigos >= 0
+            agrupado = np.zeros((len(chaves), *contagens.shape[1:]), dtype=np.int64)
+            np.add.at(agrupado, codigos[validos], contagens[validos])
+            contagens = agrupado
+            for coluna in colunas_ies:
+                rotulos[coluna] = chaves[coluna].to_numpy(dtype=object)
+        else:
+            contagens = contagens.sum(axis=0)
+            nomes = nomes[1:]
+
+        # eixos na ordem de `por`
+        destino = list(dict.fromkeys('IES' if coluna in colunas_ies else coluna for coluna in por))
+        contagens = contagens.transpose([nomes.index(nome) for nome in destino])
+
+        posicoes = np.nonzero(contagens > 0)
+        resultado = {}
+        for nome, posicao in zip(destino, posicoes):
+            for coluna in (colunas_ies if nome == 'IES' else [nome]):
+                resultado[coluna] = rotulos[coluna][posicao]
+        resultado = pd.DataFrame({coluna: resultado[coluna] for coluna in por}).astype(object)
+        resultado[nome_qtd] = contagens[posicoes]
+        return resultado
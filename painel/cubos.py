@@ -0,0 +1,154 @@
+"""
+Cubos de contagem pré-agregados.
+
+As tabelas em `data/` têm uma linha por pessoa (docente ou concluinte).
+Um cubo guarda apenas uma linha por combinação distinta das dimensões
+(ex: UF, NO_IES, CURSO, RAÇA ou ID_IES, ESCOLARIDADE, COR_RACA, SEXO) com a quantidade de pessoas em `QTD`, de modo
+que filtrar e contar passa a depender do número de categorias e não do
+número de pessoas.
+
+Para gerar os cubos em `data/cubos/`:
+
+    $ python -m painel.cubos
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+from painel.armazenamento import caminho_colunar, ler_tabela
+
+RAIZ = Path(__file__).resolve().parent.parent
+PASTA_CUBOS = Path('data/cubos')
+COLUNA_QTD = 'QTD'
+
+# nome do cubo -> (tabela de origem, dimensões)
+CUBOS = {
+    'docentes_faixa_etaria': ('data/tabela_doc_faixa_etaria.csv', ['UF', 'NO_IES', 'FAIXA_ETARIA']),
+    'docentes': ('data/fato_docentes.csv', ['ID_IES', 'ESCOLARIDADE', 'COR_RACA', 'SEXO']),
+    'concluintes': ('data/qtd_total_concluintes.csv', ['UF', 'NO_IES', 'CURSO', 'RAÇA']),
+    'turnos': ('data/qtd_total_vaga.csv', ['UF', 'NO_IES', 'CURSO', 'TURNO']),
+}
+
+
+def caminho_cubo(nome: str) -> Path:
+    """Caminho, relativo à raiz do projeto, do arquivo do cubo `nome`."""
+    return PASTA_CUBOS / f'{nome}.csv'
+
+
+def construir_cubo(df: pd.DataFrame, dimensoes: list[str]) -> pd.DataFrame:
+    """
+    Agrega um DataFrame linha a linha em um cubo de contagem.
+
+    Parâmetros:
+    - df: DataFrame com uma linha por pessoa.
+    - dimensoes: Colunas que identificam uma célula do cubo. Colunas
+      ausentes em `df` são ignoradas.
+
+    Retorna:
+    - DataFrame com as dimensões e a coluna `QTD` com o número de linhas
+      de `df` em cada célula.
+    """
+
+    dimensoes = [coluna for coluna in dimensoes if coluna in df.columns]
+    return (
+        df.groupby(dimensoes, observed=True, dropna=False, sort=True)
+        .size()
+        .reset_index(name=COLUNA_QTD)
+    )
+
+
+def pegar_frequencias_cubo(
+    cubo: pd.DataFrame,
+    coluna: str,
+    nome_coluna_1: str,
+    nome_coluna_2: str
+) -> tuple[pd.Series, pd.DataFrame]:
+    """
+    Equivalente a `pegar_frequencias` para cubos: soma as células do cubo
+    (já filtrado) por valor de `coluna`.
+
+    Parâmetros:
+    - cubo: Cubo de contagem, com a coluna `QTD`.
+    - coluna: Dimensão pela qual as células são somadas.
+    - nome_coluna_1: Nome para a primeira coluna do DataFrame de resultado (ex: categorias).
+    - nome_coluna_2: Nome para a segunda coluna do DataFrame de resultado (ex: frequências).
+
+    Retorna:
+    - frequencia_total: Série com a frequência dos valores (ordenada pelo índice).
+    - frequencia_index: DataFrame com índice resetado e colunas renomeadas.
+    """
+
+    frequencia_total = cubo.groupby(coluna, observed=True, sort=True)[COLUNA_QTD].sum()
+    return formatar_frequencias(frequencia_total, nome_coluna_1, nome_coluna_2)
+
+
+def formatar_frequencias(
+    totais: pd.Series,
+    nome_coluna_1: str,
+    nome_coluna_2: str
+) -> tuple[pd.Series, pd.DataFrame]:
+    """
+    Saída de `pegar_frequencias_cubo` a partir de totais já somados por valor
+    (ex: os de `painel.filtros.IndiceContagem`).
+    """
+
+    frequencia_total = totais[totais > 0].rename('count')
+    frequencia_index = frequencia_total.reset_index()
+    frequencia_index.columns = [nome_coluna_1, nome_coluna_2]
+    frequencia_index[nome_coluna_1] = frequencia_index[nome_coluna_1].astype(object)
+
+    return frequencia_total, frequencia_index
+
+
+def contar_por(cubo: pd.DataFrame, coluna: str) -> pd.Series:
+    """Total de pessoas por valor de `coluna`, como um `value_counts`."""
+    return cubo.groupby(coluna, observed=True)[COLUNA_QTD].sum()
+
+
+def carregar_cubo(nome: str, raiz: Path = RAIZ) -> pd.DataFrame:
+    """
+    Lê o cubo `nome` de `data/cubos/`. Se ele ainda não foi gerado, agrega
+    a tabela de origem em memória.
+    """
+
+    caminho = caminho_cubo(nome)
+    if (raiz / caminho).exists() or (raiz / caminho_colunar(caminho)).exists():
+        return ler_tabela(caminho, raiz)
+
+    origem, dimensoes = CUBOS[nome]
+    return construir_cubo(ler_tabela(origem, raiz), dimensoes)
+
+
+def gerar_cubos(raiz: Path = RAIZ) -> list[tuple[str, int, int]]:
+    """
+    Gera os cubos de todas as tabelas de origem existentes em `raiz`.
+
+    Retorna:
+    - Lista de (nome do cubo, linhas da origem, células do cubo).
+    """
+
+    (raiz / PASTA_CUBOS).mkdir(parents=True, exist_ok=True)
+
+    gerados = []
+    for nome, (origem, dimensoes) in CUBOS.items():
+        if not (raiz / origem).exists() and not (raiz / caminho_colunar(origem)).exists():
+            continue
+
+        df = ler_tabela(origem, raiz)
+        cubo = construir_cubo(df, dimensoes)
+        cubo.to_csv(raiz / caminho_cubo(nome), index=False)
+        gerados.append((nome, len(df), len(cubo)))
+    return gerados
+
+
+def main() -> None:
+    gerados = gerar_cubos()
+    for nome, linhas, celulas in gerados:
+        print(f'{nome}: {linhas} linhas -> {celulas} células')
+    for nome in CUBOS.keys() - {nome for nome, _, _ in gerados}:
+        print(f'{nome}: {CUBOS[nome][0]} não encontrado, ignorado')
+
+
+if __name__ == '__main__':
+    main()
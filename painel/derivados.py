@@ -0,0 +1,291 @@
+"""
+Tabelas derivadas dos dados filtrados (frequências, percentuais e
+cruzamentos) que alimentam os gráficos do dashboard.
+
+As tabelas são separadas por aba, para que só a aba aberta seja calculada.
+"""
+
+import pandas as pd
+
+from painel.cubos import COLUNA_QTD, formatar_frequencias, pegar_frequencias_cubo
+
+
+def pegar_frequencias(
+    df: pd.DataFrame,
+    coluna: str,
+    nome_coluna_1: str,
+    nome_coluna_2: str
+) -> tuple[pd.Series, pd.DataFrame]:
+    """
+    Calcula a frequência dos valores de uma coluna em um DataFrame,
+    cria um DataFrame com índice resetado e renomeia as colunas.
+
+    Parâmetros:
+    - df: DataFrame onde a coluna está presente.
+    - coluna: Nome da coluna para calcular a frequência.
+    - nome_coluna_1: Nome para a primeira coluna do DataFrame de resultado (ex: categorias).
+    - nome_coluna_2: Nome para a segunda coluna do DataFrame de resultado (ex: frequências).
+
+    Retorna:
+    - frequencia_total: Série com a frequência dos valores (ordenada pelo índice).
+    - frequencia_index: DataFrame com índice resetado e colunas renomeadas.
+    """
+
+    frequencia_total = df[coluna].value_counts().sort_index()
+    frequencia_total = frequencia_total[frequencia_total > 0]
+    frequencia_index = frequencia_total.reset_index()
+    frequencia_index.columns = [nome_coluna_1, nome_coluna_2]
+    frequencia_index[nome_coluna_1] = frequencia_index[nome_coluna_1].astype(object)
+
+    return frequencia_total, frequencia_index
+
+
+def adicionar_percentual(frequencia_df: pd.DataFrame) -> pd.DataFrame:
+    """Acrescenta as colunas `Percentual` e `Percentual_str` (rótulo das fatias)."""
+    frequencia_df['Percentual'] = frequencia_df['Frequência'] / frequencia_df['Frequência'].sum() * 100
+    frequencia_df['Percentual_str'] = frequencia_df['Percentual'].map(lambda x: f"{x:.1f}%")
+    return frequencia_df
+
+
+def contar_acesso_rede(df_acesso_internet: pd.DataFrame, df_tprede: pd.DataFrame) -> pd.DataFrame:
+    """
+    Número de IES por acesso à internet, tipo de rede e UF.
+
+    Substitui a junção linha a linha que era enviada inteira ao gráfico: o
+    resultado tem no máximo uma linha por combinação das três colunas, no
+    mesmo formato de `tabela_heatmap_escol_internet.csv` (em formato longo).
+    """
+
+    df_acesso_rede = pd.merge(df_acesso_internet, df_tprede, on=['NO_IES', 'UF'])
+    return (
+        df_acesso_rede
+        .groupby(['IN_SERVICO_INTERNET', 'TP_REDE', 'UF'], observed=True)
+        .size()
+        .reset_index(name=COLUNA_QTD)
+        .astype({'IN_SERVICO_INTERNET': object, 'TP_REDE': object, 'UF': object})
+    )
+
+
+def derivados_docentes(filtrados: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+    """Frequências de faixa etária, cor/raça, sexo e escolaridade dos docentes."""
+    derivados = {}
+
+    _, derivados['frequencia_df_faixa_etaria'] = pegar_frequencias_cubo(
+        filtrados['df_faixa_etaria'],
+        "FAIXA_ETARIA",
+        "Faixa Etária",
+        "Frequência"
+    )
+
+    _, derivados['frequencia_df_cor_raca'] = pegar_frequencias_cubo(
+        filtrados['df_docentes'],
+        "COR_RACA",
+        "Cor_Raca",
+        "Frequência"
+    )
+
+    _, derivados['frequencia_df_sexo'] = pegar_frequencias_cubo(
+        filtrados['df_docentes'],
+        "SEXO",
+        "Sexo",
+        "Frequência"
+    )
+
+    _, derivados['frequencia_df_escol'] = pegar_frequencias_cubo(
+        filtrados['df_docentes'],
+        "ESCOLARIDADE",
+        "Escolaridade",
+        "Frequência"
+    )
+
+    adicionar_percentual(derivados['frequencia_df_sexo'])
+
+    return derivados
+
+
+def _contar_cubo(cubo: pd.DataFrame, por: list[str]) -> pd.DataFrame:
+    """Soma de QTD por `por`, no formato de `Cruzamento.contar(por, 'quantidade')`."""
+    return (
+        cubo
+        .groupby(por, observed=True)[COLUNA_QTD]
+        .sum()
+        .reset_index(name='quantidade')
+        .astype({coluna: object for coluna in por})
+    )
+
+
+def derivados_formados(filtrados: dict) -> dict[str, pd.DataFrame]:
+    """
+    Docentes por escolaridade e cor/raça e por escolaridade e UF.
+
+    Os dois cortes saem do cruzamento dos docentes já filtrado por UF/IES
+    (`df_docentes_cruzamento`, ver `painel.cruzamentos`), que também dá a UF
+    de cada docente sem juntar o cubo com `dim_ies`. Sem o cruzamento (acima
+    de `PAINEL_CRUZAMENTO_MAX_CELULAS`), são groupby do cubo filtrado.
+    """
+
+    cruzamento = filtrados.get('df_docentes_cruzamento')
+    if cruzamento is not None:
+        return {
+            'df_agg': cruzamento.contar(['ESCOLARIDADE', 'COR_RACA'], 'quantidade'),
+            'df_escol_uf': cruzamento.contar(['ESCOLARIDADE', 'UF'], 'quantidade'),
+        }
+
+    docentes = filtrados['df_docentes']
+    uf_por_id = filtrados['df_dim_ies'].drop_duplicates('ID_IES').set_index('ID_IES')['UF']
+    return {
+        'df_agg': _contar_cubo(docentes, ['ESCOLARIDADE', 'COR_RACA']),
+        'df_escol_uf': _contar_cubo(docentes.assign(UF=docentes['ID_IES'].map(uf_por_id)), ['ESCOLARIDADE', 'UF']),
+    }
+
+
+def derivados_redes(filtrados: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+    """Frequências por tipo de rede, acesso à internet e repositório das IES."""
+    derivados = {}
+
+    _, derivados['frequencia_df_tprede'] = pegar_frequencias(
+        filtrados['df_tprede'],
+        "TP_REDE",
+        "Tipo de rede",
+        "Frequência"
+    )
+
+    _, derivados['frequencia_df_acesso_internet'] = pegar_frequencias(
+        filtrados['df_acesso_internet'],
+        "IN_SERVICO_INTERNET",
+        "Acesso a Internet",
+        "Frequência"
+    )
+
+    _, derivados['frequencia_df_repositorio'] = pegar_frequencias(
+        filtrados['df_repositorio_inst'],
+        "IN_REPOSITORIO_INSTITUCIONAL",
+        "Repositório Acadêmico",
+        "Frequência"
+    )
+
+    derivados['df_acesso_rede'] = contar_acesso_rede(
+        filtrados['df_acesso_internet'],
+        filtrados['df_tprede']
+    )
+
+    return derivados
+
+
+def frequencias_por_curso(filtrados: dict, tabela: str) -> pd.DataFrame:
+    """
+    Frequência por curso do cubo `tabela`.
+
+    Se o fragmento já somou os totais por curso (`<tabela>_por_curso`, ver
+    `painel.filtros.IndiceContagem`), eles são reaproveitados.
+    """
+
+    totais = filtrados.get(f'{tabela}_por_curso')
+    if totais is not None:
+        return formatar_frequencias(totais, "Curso", "Frequência")[1]
+    return pegar_frequencias_cubo(filtrados[tabela], "CURSO", "Curso", "Frequência")[1]
+
+
+def derivados_concluintes(filtrados: dict) -> dict[str, pd.DataFrame]:
+    """Concluintes por curso, por cor/raça e por cor/raça e UF."""
+    derivados = {}
+
+    derivados['frequencia_df_concluintes'] = frequencias_por_curso(filtrados, 'df_concluintes')
+
+    _, derivados['frequencia_df_raca_conc'] = pegar_frequencias_cubo(
+        filtrados['df_concluintes'],
+        "RAÇA",
+        "Raça",
+        "Frequência"
+    )
+
+    # com o cruzamento (`painel.cruzamentos`) já filtrado pelo fragmento, o corte é uma soma de eixos
+    cruzamento = filtrados.get('df_concluintes_cruzamento')
+    if cruzamento is not None:
+        derivados['df_raca_uf'] = cruzamento.contar(['UF', 'RAÇA'], 'quantidade')
+    else:
+        derivados['df_raca_uf'] = _contar_cubo(filtrados['df_concluintes'], ['UF', 'RAÇA'])
+
+    return derivados
+
+
+def derivados_vagas(filtrados: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+    """Vagas por turno e por curso."""
+    derivados = {}
+
+    _, derivados['frequencia_df_turnos'] = pegar_frequencias_cubo(
+        filtrados['df_turnos'],
+        "TURNO",
+        "Turno",
+        "Frequência"
+    )
+
+    derivados['frequencia_df_turno_cursos'] = frequencias_por_curso(filtrados, 'df_turnos')
+
+    return derivados
+
+
+# aba -> (função que calcula as tabelas, filtros dos quais as tabelas
+# dependem, tabelas de `data/` lidas pela aba)
+DERIVADOS_POR_ABA = {
+    'Docentes': (derivados_docentes, ['ufs', 'ies'], ['df_docentes', 'df_faixa_etaria']),
+    'Formados': (derivados_formados, ['ufs', 'ies'], ['df_docentes']),
+    'Redes': (derivados_redes, ['ufs', 'ies'], ['df_tprede', 'df_acesso_internet', 'df_repositorio_inst']),
+    'Concluintes': (derivados_concluintes, ['ufs', 'ies', 'faixa_concluintes', 'racas_concluintes'], ['df_concluintes']),
+    'Vagas': (derivados_vagas, ['ufs', 'ies', 'faixa_vagas', 'turnos'], ['df_turnos']),
+}
+
+# tabelas usadas pelos filtros gerais de todas as abas
+TABELAS_FILTROS = ['df_dim_ies']
+
+# tabelas lidas diretamente pelos gráficos, fora das tabelas derivadas
+TABELAS_GRAFICOS = {
+    'Redes': ['df_tabela_mapa'],
+}
+
+
+def tabelas_da_aba(aba: str, derivadas: bool = True) -> list[str]:
+    """
+    Tabelas que precisam estar carregadas para exibir `aba`.
+
+    Com `derivadas=False`, omite as tabelas lidas só para calcular as tabelas
+    derivadas (o motor SQL, `painel.motor_sql`, as consulta direto nos arquivos).
+    Abas sem tabelas derivadas (ex: Tendências) só leem as tabelas dos filtros.
+    """
+
+    tabelas = DERIVADOS_POR_ABA[aba][2] if derivadas and aba in DERIVADOS_POR_ABA else []
+    return TABELAS_FILTROS + tabelas + TABELAS_GRAFICOS.get(aba, [])
+
+
+def estado_da_aba(aba: str, estado_filtros: dict, versoes: dict | None = None) -> dict:
+    """
+    Parte do estado dos filtros que afeta as tabelas de `aba`.
+
+    `versoes` ({tabela: hash}, ver `painel.construcao.versoes_dados`) entra
+    no estado só com as tabelas da aba, para que atualizar uma tabela não
+    descarte as tabelas derivadas das outras abas.
+    """
+
+    _, filtros, tabelas = DERIVADOS_POR_ABA[aba]
+    estado = {'aba': aba, **{nome: estado_filtros.get(nome) for nome in filtros}}
+    if versoes:
+        estado['versoes'] = {tabela: versoes.get(tabela) for tabela in TABELAS_FILTROS + tabelas}
+    return estado
+
+
+def calcular_derivados(filtrados: dict[str, pd.DataFrame], aba: str) -> dict[str, pd.DataFrame]:
+    """
+    Calcula as tabelas usadas pelos gráficos de uma aba.
+
+    Parâmetros:
+    - filtrados: Tabelas já filtradas, com as mesmas chaves de
+      `painel.tabelas.NOMES_TABELAS` (ex: 'df_docentes'), e os cruzamentos
+      filtrados (ex: 'df_docentes_cruzamento', ver `painel.tabelas.filtrar`).
+    - aba: Nome da aba (chave de `DERIVADOS_POR_ABA`).
+
+    Retorna:
+    - Dicionário com os DataFrames da aba (ex: 'frequencia_df_sexo').
+    """
+
+    calcular, _, _ = DERIVADOS_POR_ABA[aba]
+    return calcular(filtrados)
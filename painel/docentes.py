@@ -0,0 +1,88 @@
+"""
+Modelo estrela dos docentes.
+
+`tabela_doc_completa.csv` e `tabela_doc_sexo.csv` descrevem os mesmos
+docentes, linha a linha (assim como `tabela_doc_cor_raca.csv` e
+`tabela_doc_escol.csv`, que são projeções da tabela completa). Elas são
+consolidadas em:
+
+- `data/dim_ies.csv`: uma linha por IES, com a chave inteira `ID_IES`,
+  construída a partir de `tabela_universidade.csv`;
+- `data/fato_docentes.csv`: uma linha por docente, com `ID_IES` e todos os
+  atributos do docente (ESCOLARIDADE, COR_RACA, SEXO).
+
+A faixa etária vem de outra extração (com menos docentes) e continua em
+`tabela_doc_faixa_etaria.csv`.
+
+Para regerar as tabelas:
+
+    $ python -m painel.docentes
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+from painel.armazenamento import ler_tabela
+
+RAIZ = Path(__file__).resolve().parent.parent
+ARQUIVO_DIM_IES = Path('data/dim_ies.csv')
+ARQUIVO_FATO_DOCENTES = Path('data/fato_docentes.csv')
+
+ORIGEM_IES = Path('data/tabela_universidade.csv')
+ORIGEM_DOCENTES = Path('data/tabela_doc_completa.csv')
+ORIGEM_SEXO = Path('data/tabela_doc_sexo.csv')
+
+
+def construir_dim_ies(universidades: pd.DataFrame) -> pd.DataFrame:
+    """Atribui a chave `ID_IES` (1, 2, ...) a cada IES, na ordem da origem."""
+    dim_ies = universidades.drop_duplicates(['NO_IES', 'UF']).reset_index(drop=True)
+    dim_ies.insert(0, 'ID_IES', range(1, len(dim_ies) + 1))
+    return dim_ies
+
+
+def construir_fato_docentes(
+    docentes: pd.DataFrame,
+    sexo: pd.DataFrame,
+    dim_ies: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Junta os atributos dos docentes em uma única tabela fato.
+
+    Parâmetros:
+    - docentes: Tabela completa (NO_IES, UF, ESCOLARIDADE, COR_RACA).
+    - sexo: Tabela de sexo, alinhada linha a linha com `docentes`.
+    - dim_ies: Dimensão de IES (ver `construir_dim_ies`).
+
+    Retorna:
+    - DataFrame com ID_IES, ESCOLARIDADE, COR_RACA e SEXO.
+    """
+
+    if len(docentes) != len(sexo) or not (
+        docentes['NO_IES'].astype(str).values == sexo['NO_IES'].astype(str).values
+    ).all():
+        raise ValueError("As tabelas de docentes não estão alinhadas linha a linha.")
+
+    fato = docentes.assign(SEXO=sexo['SEXO'].values)
+    chaves = dim_ies[['ID_IES', 'NO_IES', 'UF']].astype({'NO_IES': str, 'UF': str})
+    fato = fato.astype({'NO_IES': str, 'UF': str}).merge(chaves, on=['NO_IES', 'UF'], how='left')
+
+    if fato['ID_IES'].isna().any():
+        faltantes = sorted(fato.loc[fato['ID_IES'].isna(), 'NO_IES'].unique())
+        raise ValueError(f"IES sem correspondência em {ORIGEM_IES}: {faltantes}")
+
+    return fato[['ID_IES', 'ESCOLARIDADE', 'COR_RACA', 'SEXO']]
+
+
+def main() -> None:
+    dim_ies = construir_dim_ies(ler_tabela(ORIGEM_IES))
+    fato = construir_fato_docentes(ler_tabela(ORIGEM_DOCENTES), ler_tabela(ORIGEM_SEXO), dim_ies)
+
+    dim_ies.to_csv(RAIZ / ARQUIVO_DIM_IES, index=False)
+    fato.to_csv(RAIZ / ARQUIVO_FATO_DOCENTES, index=False)
+    print(f'{ARQUIVO_DIM_IES}: {len(dim_ies)} IES')
+    print(f'{ARQUIVO_FATO_DOCENTES}: {len(fato)} docentes')
+
+
+if __name__ == '__main__':
+    main()
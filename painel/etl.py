@@ -0,0 +1,399 @@
+"""
+Ingestão dos microdados do Censo da Educação Superior (INEP).
+
+Lê os arquivos de IES, docentes e cursos em blocos (`chunksize`), só com as
+colunas usadas, e reduz cada bloco a um cubo parcial de contagens em
+processos separados. Os cubos parciais são somados à medida que chegam, de
+modo que a memória depende do tamanho do bloco e do número de categorias, e
+não do tamanho do arquivo.
+
+Gera `data/ies.csv` (uma linha por IES, de onde `painel.construcao` deriva
+`dim_ies`, `tabela_tp_rede`, `tabela_mapa` e as demais tabelas por IES) e, em
+`data/cubos/`, os cubos de docentes, faixa etária, concluintes e turnos (ver
+`painel.cubos`). As tabelas com uma linha por pessoa não são materializadas:
+o app lê os cubos.
+
+A pasta de destino é obrigatória (`--destino`): o `data/` do repositório tem
+um `fato_docentes.csv` que o ETL não regera, cujos `ID_IES` deixariam de
+corresponder ao novo `dim_ies`. O app lê a saída com `PAINEL_RAIZ_DADOS`.
+
+    $ python -m painel.etl --ies MICRODADOS_CADASTRO_IES_2019.CSV \\
+          --docentes DM_DOCENTE.CSV --cursos MICRODADOS_CADASTRO_CURSOS_2019.CSV \\
+          --ufs DF GO MG --destino /tmp/censo2019
+    $ PAINEL_RAIZ_DADOS=/tmp/censo2019 streamlit run streamlit_app.py
+
+Os nomes das colunas e os códigos de cada arquivo ficam em `MAPEAMENTO` e
+podem ser sobrescritos com `--mapeamento arquivo.json` (mesma estrutura),
+pois mudam entre as edições do censo.
+"""
+
+import argparse
+import copy
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from painel.construcao import FONTE_IES, SAIDAS_IES, construir
+from painel.cubos import COLUNA_QTD, CUBOS, PASTA_CUBOS, caminho_cubo
+from painel.docentes import construir_dim_ies
+from painel.mapa import ARQUIVO_CENTROIDES
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+FAIXAS_ETARIAS = [
+    (29, 'ATÉ 29'),
+    (34, 'ENTRE 30 E 34'),
+    (39, 'ENTRE 35 E 39'),
+    (44, 'ENTRE 40 E 44'),
+    (49, 'ENTRE 45 E 49'),
+    (54, 'ENTRE 50 E 54'),
+    (59, 'ENTRE 55 E 59'),
+    (np.inf, '60 +'),
+]
+
+# arquivo -> colunas de origem (nome no app -> nome no microdado) e códigos.
+# Os rótulos seguem os das tabelas de `data/`.
+MAPEAMENTO = {
+    'ies': {
+        'colunas': {
+            'CO_IES': 'CO_IES',
+            'NO_IES': 'NO_IES',
+            'UF': 'SG_UF_IES',
+            'CATEGORIA': 'TP_CATEGORIA_ADMINISTRATIVA',
+            'IN_SERVICO_INTERNET': 'IN_SERVICO_INTERNET',
+            'IN_REPOSITORIO_INSTITUCIONAL': 'IN_REPOSITORIO_INSTITUCIONAL',
+        },
+        'codigos': {
+            'TP_REDE': {'1': 'PUBLICA', '2': 'PUBLICA', '3': 'PUBLICA'},
+            'IN_SERVICO_INTERNET': {'1': 'SIM', '0': 'NÃO'},
+            'IN_REPOSITORIO_INSTITUCIONAL': {'1': 'SIM', '0': 'NÃO'},
+        },
+    },
+    'docentes': {
+        'colunas': {
+            'CO_IES': 'CO_IES',
+            'ESCOLARIDADE': 'TP_ESCOLARIDADE',
+            'COR_RACA': 'TP_COR_RACA',
+            'SEXO': 'TP_SEXO',
+            'IDADE': 'NU_IDADE',
+        },
+        'codigos': {
+            'ESCOLARIDADE': {'1': 'SEM GRADUAÇÃO', '2': 'GRADUAÇÃO', '3': 'ESPECILIZAÇÃO', '4': 'MESTRADO', '5': 'DOUTORADO'},
+            'COR_RACA': {
+                '0': 'NÃO DECLARADO', '1': 'BRANCA', '2': 'PRETO', '3': 'PARDA',
+                '4': 'AMARELA', '5': 'INDIGENA', '9': 'NÃO DECLARADO',
+            },
+            'SEXO': {'1': 'FEM', '2': 'MASC'},
+        },
+    },
+    'cursos': {
+        'colunas': {
+            'CO_IES': 'CO_IES',
+            'CURSO': 'NO_CURSO',
+            'TURNO': 'TP_TURNO',
+        },
+        # RAÇA do concluinte -> coluna com o número de concluintes
+        'concluintes': {
+            'BRANCA': 'QT_CONC_BRANCA',
+            'PRETA': 'QT_CONC_PRETA',
+            'PARDA': 'QT_CONC_PARDA',
+            'AMARELA': 'QT_CONC_AMARELA',
+            'INDÍGENA': 'QT_CONC_INDIGENA',
+            'COR NÃO DECLARADA': 'QT_CONC_CORND',
+        },
+        'codigos': {
+            'TURNO': {'1': 'MATUTINO', '2': 'VESPERTINO', '3': 'NOTURNO', '4': 'INTEGRAL'},
+        },
+    },
+}
+
+LEITURA = {'sep': ';', 'encoding': 'latin-1'}
+
+COLUNAS_FONTE_IES = ['NO_IES', 'UF', 'TP_REDE', 'IN_SERVICO_INTERNET', 'IN_REPOSITORIO_INSTITUCIONAL']
+
+
+def carregar_mapeamento(caminho: str | None) -> dict:
+    """`MAPEAMENTO` com as chaves sobrescritas pelo JSON em `caminho`."""
+    mapeamento = copy.deepcopy(MAPEAMENTO)
+    if caminho is None:
+        return mapeamento
+
+    with open(caminho, encoding='utf-8') as arquivo:
+        extra = json.load(arquivo)
+
+    def mesclar(base, novo):
+        for chave, valor in novo.items():
+            if isinstance(valor, dict) and isinstance(base.get(chave), dict):
+                mesclar(base[chave], valor)
+            else:
+                base[chave] = valor
+
+    mesclar(mapeamento, extra)
+    return mapeamento
+
+
+def _decodificar(serie: pd.Series, codigos: dict[str, str]) -> pd.Series:
+    """Troca códigos por rótulos; códigos sem rótulo ficam como texto."""
+    texto = serie.astype('string').str.replace(r'\.0$', '', regex=True)
+    return texto.map(codigos).fillna(texto).astype(object)
+
+
+def construir_ies(ies: pd.DataFrame, mapeamento: dict, ufs: list[str] | None = None) -> pd.DataFrame:
+    """
+    Projeta o cadastro de IES nas colunas do app.
+
+    Retorna:
+    - DataFrame com ID_IES, CO_IES, NO_IES, UF, TP_REDE,
+      IN_SERVICO_INTERNET e IN_REPOSITORIO_INSTITUCIONAL.
+    """
+
+    colunas = mapeamento['colunas']
+    codigos = mapeamento['codigos']
+    ies = ies.rename(columns={origem: nome for nome, origem in colunas.items()})
+    if ufs:
+        ies = ies[ies['UF'].isin(ufs)]
+
+    rede = _decodificar(ies['CATEGORIA'], codigos['TP_REDE'])
+    ies = ies.assign(
+        NO_IES=ies['NO_IES'].str.strip().str.upper(),
+        TP_REDE=rede.where(rede == 'PUBLICA', 'PRIVADA'),
+        IN_SERVICO_INTERNET=_decodificar(ies['IN_SERVICO_INTERNET'], codigos['IN_SERVICO_INTERNET']),
+        IN_REPOSITORIO_INSTITUCIONAL=_decodificar(
+            ies['IN_REPOSITORIO_INSTITUCIONAL'], codigos['IN_REPOSITORIO_INSTITUCIONAL']
+        ),
+    )
+    ies = ies.drop_duplicates('CO_IES').sort_values(['UF', 'NO_IES'])
+
+    dim_ies = construir_dim_ies(ies[['NO_IES', 'IN_SERVICO_INTERNET', 'UF']])
+    return ies.merge(dim_ies[['ID_IES', 'NO_IES', 'UF']], on=['NO_IES', 'UF'])
+
+
+def fonte_ies(ies: pd.DataFrame) -> pd.DataFrame:
+    """Tabela `data/ies.csv`, de onde `painel.construcao` deriva as tabelas por IES."""
+    # IES com o mesmo nome na mesma UF (vários CO_IES) viram uma só
+    return ies.drop_duplicates(['NO_IES', 'UF'])[COLUNAS_FONTE_IES]
+
+
+# estado dos processos de trabalho (ver `_iniciar_trabalhador`)
+_MAPEAMENTO: dict = {}
+_IES_VALIDAS: frozenset = frozenset()
+
+
+def _iniciar_trabalhador(mapeamento: dict, ies_validas: frozenset) -> None:
+    global _MAPEAMENTO, _IES_VALIDAS
+    _MAPEAMENTO = mapeamento
+    _IES_VALIDAS = ies_validas
+
+
+def _somar(parciais: list[pd.DataFrame], dimensoes: list[str]) -> pd.DataFrame:
+    return (
+        pd.concat(parciais, ignore_index=True)
+        .groupby(dimensoes, sort=False, dropna=False)[COLUNA_QTD]
+        .sum()
+        .reset_index()
+    )
+
+
+def reduzir_docentes(bloco: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Cubos parciais (em códigos) de um bloco do arquivo de docentes."""
+    colunas = _MAPEAMENTO['docentes']['colunas']
+    bloco = bloco.rename(columns={origem: nome for nome, origem in colunas.items()})
+    bloco = bloco[bloco['CO_IES'].isin(_IES_VALIDAS)]
+
+    limites = [-np.inf] + [limite for limite, _ in FAIXAS_ETARIAS]
+    faixa = pd.cut(bloco['IDADE'], limites, labels=[rotulo for _, rotulo in FAIXAS_ETARIAS])
+    bloco = bloco.assign(FAIXA_ETARIA=faixa.astype(object))
+
+    dimensoes = ['CO_IES', 'ESCOLARIDADE', 'COR_RACA', 'SEXO']
+    return {
+        'docentes': bloco.groupby(dimensoes, dropna=False).size().reset_index(name=COLUNA_QTD),
+        'docentes_faixa_etaria': (
+            bloco.dropna(subset=['FAIXA_ETARIA'])
+            .groupby(['CO_IES', 'FAIXA_ETARIA'])
+            .size()
+            .reset_index(name=COLUNA_QTD)
+        ),
+    }
+
+
+def reduzir_cursos(bloco: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Cubos parciais de um bloco do arquivo de cursos (turnos e concluintes)."""
+    mapeamento = _MAPEAMENTO['cursos']
+    bloco = bloco.rename(columns={origem: nome for nome, origem in mapeamento['colunas'].items()})
+    bloco = bloco[bloco['CO_IES'].isin(_IES_VALIDAS)]
+
+    concluintes = (
+        bloco.rename(columns={origem: raca for raca, origem in mapeamento['concluintes'].items()})
+        .melt(id_vars=['CO_IES', 'CURSO'], value_vars=list(mapeamento['concluintes']), var_name='RAÇA', value_name=COLUNA_QTD)
+    )
+    concluintes = concluintes[concluintes[COLUNA_QTD].fillna(0) > 0]
+
+    return {
+        'turnos': bloco.groupby(['CO_IES', 'CURSO', 'TURNO'], dropna=False).size().reset_index(name=COLUNA_QTD),
+        'concluintes': _somar([concluintes.astype({COLUNA_QTD: 'int64'})], ['CO_IES', 'CURSO', 'RAÇA']),
+    }
+
+
+def _colunas_lidas(mapeamento: dict, arquivo: str) -> list[str]:
+    colunas = list(mapeamento[arquivo]['colunas'].values())
+    return colunas + list(mapeamento[arquivo].get('concluintes', {}).values())
+
+
+def reduzir_arquivo(
+    caminho: Path | str,
+    reduzir,
+    mapeamento: dict,
+    arquivo: str,
+    ies_validas: frozenset,
+    chunksize: int = 200_000,
+    processos: int | None = None,
+) -> dict[str, pd.DataFrame]:
+    """
+    Lê `caminho` em blocos e soma os cubos parciais de `reduzir(bloco)`.
+
+    Cada bloco é reduzido em um processo de trabalho. No máximo dois blocos
+    por processo ficam em memória ao mesmo tempo, e os parciais recebidos
+    são somados a cada rodada.
+
+    Parâmetros:
+    - caminho: Arquivo de microdados.
+    - reduzir: `reduzir_docentes` ou `reduzir_cursos`.
+    - mapeamento: Mapeamento completo (ver `MAPEAMENTO`).
+    - arquivo: Chave do arquivo em `mapeamento` ('docentes' ou 'cursos').
+    - ies_validas: CO_IES mantidos (as IES das UFs selecionadas).
+    - chunksize: Linhas por bloco.
+    - processos: Processos de trabalho (padrão: número de CPUs).
+
+    Retorna:
+    - Cubos (ainda com CO_IES e códigos), por nome.
+    """
+
+    processos = processos or os.cpu_count() or 1
+    leitor = pd.read_csv(
+        caminho,
+        usecols=_colunas_lidas(mapeamento, arquivo),
+        chunksize=chunksize,
+        low_memory=False,
+        **LEITURA
+    )
+
+    totais: dict[str, list[pd.DataFrame]] = {}
+
+    def acumular(parciais: dict[str, pd.DataFrame]) -> None:
+        for nome, parcial in parciais.items():
+            dimensoes = [coluna for coluna in parcial.columns if coluna != COLUNA_QTD]
+            totais[nome] = [_somar(totais.get(nome, []) + [parcial], dimensoes)]
+
+    with ProcessPoolExecutor(processos, initializer=_iniciar_trabalhador, initargs=(mapeamento, ies_validas)) as executor:
+        pendentes = []
+        for bloco in leitor:
+            pendentes.append(executor.submit(reduzir, bloco))
+            if len(pendentes) >= 2 * processos:
+                acumular(pendentes.pop(0).result())
+        for futuro in pendentes:
+            acumular(futuro.result())
+
+    return {nome: partes[0] for nome, partes in totais.items()}
+
+
+def finalizar_cubo(cubo: pd.DataFrame, ies: pd.DataFrame, nome: str, codigos: dict) -> pd.DataFrame:
+    """Troca CO_IES pelas colunas de IES e os códigos por rótulos, no formato de `painel.cubos`."""
+    _, dimensoes = CUBOS[nome]
+    for coluna, mapa in codigos.items():
+        if coluna in cubo:
+            cubo[coluna] = _decodificar(cubo[coluna], mapa)
+
+    cubo = cubo.merge(ies[['CO_IES', 'ID_IES', 'NO_IES', 'UF']], on='CO_IES')
+    return (
+        cubo.groupby(dimensoes, sort=True, dropna=False)[COLUNA_QTD]
+        .sum()
+        .reset_index()
+    )
+
+
+def ingerir(
+    arquivo_ies: Path | str,
+    arquivo_docentes: Path | str | None = None,
+    arquivo_cursos: Path | str | None = None,
+    ufs: list[str] | None = None,
+    mapeamento: dict = MAPEAMENTO,
+    chunksize: int = 200_000,
+    processos: int | None = None,
+    raiz: Path = RAIZ,
+) -> tuple[dict[str, int], dict[str, str]]:
+    """
+    Gera `data/ies.csv` e os cubos do app a partir dos microdados e deriva
+    as tabelas por IES com `painel.construcao`.
+
+    Retorna:
+    - Número de linhas de cada arquivo escrito (relativo a `raiz`).
+    - Situação das tabelas derivadas (ver `painel.construcao.construir`).
+    """
+
+    leitura_ies = pd.read_csv(arquivo_ies, usecols=_colunas_lidas(mapeamento, 'ies'), **LEITURA)
+    ies = construir_ies(leitura_ies, mapeamento['ies'], ufs)
+    ies_validas = frozenset(ies['CO_IES'])
+
+    saidas = {str(FONTE_IES): fonte_ies(ies)}
+
+    reducoes = [
+        (arquivo_docentes, reduzir_docentes, 'docentes'),
+        (arquivo_cursos, reduzir_cursos, 'cursos'),
+    ]
+    for caminho, reduzir, arquivo in reducoes:
+        if caminho is None:
+            continue
+        cubos = reduzir_arquivo(caminho, reduzir, mapeamento, arquivo, ies_validas, chunksize, processos)
+        for nome, cubo in cubos.items():
+            saidas[str(caminho_cubo(nome))] = finalizar_cubo(cubo, ies, nome, mapeamento[arquivo]['codigos'])
+
+    (raiz / PASTA_CUBOS).mkdir(parents=True, exist_ok=True)
+    for destino, tabela in saidas.items():
+        tabela.to_csv(raiz / destino, index=False)
+
+    # o mapa usa os centroides das UFs; numa raiz nova, copia os do projeto
+    if not (raiz / ARQUIVO_CENTROIDES).exists():
+        (raiz / ARQUIVO_CENTROIDES).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(RAIZ / ARQUIVO_CENTROIDES, raiz / ARQUIVO_CENTROIDES)
+
+    situacao = construir(raiz, SAIDAS_IES)
+    return {destino: len(tabela) for destino, tabela in saidas.items()}, situacao
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Gera as tabelas do app a partir dos microdados do INEP.")
+    parser.add_argument('--ies', required=True, help="cadastro de IES (ex: MICRODADOS_CADASTRO_IES_2019.CSV)")
+    parser.add_argument('--docentes', help="microdados de docentes (ex: DM_DOCENTE.CSV)")
+    parser.add_argument('--cursos', help="cadastro de cursos (ex: MICRODADOS_CADASTRO_CURSOS_2019.CSV)")
+    parser.add_argument('--ufs', nargs='+', help="UFs mantidas (padrão: todas)")
+    parser.add_argument('--mapeamento', help="JSON que sobrescreve colunas e códigos de MAPEAMENTO")
+    parser.add_argument('--chunksize', type=int, default=200_000, help="linhas lidas por bloco")
+    parser.add_argument('--processos', type=int, help="processos de trabalho (padrão: número de CPUs)")
+    parser.add_argument(
+        '--destino', required=True, help="pasta onde `data/` é escrito (ex: /tmp/censo2019; não a do repositório)"
+    )
+    args = parser.parse_args()
+
+    escritos, situacao = ingerir(
+        args.ies,
+        args.docentes,
+        args.cursos,
+        args.ufs,
+        carregar_mapeamento(args.mapeamento),
+        args.chunksize,
+        args.processos,
+        Path(args.destino),
+    )
+    for destino, linhas in escritos.items():
+        print(f'{destino}: {linhas} linhas')
+    for saida, estado in situacao.items():
+        print(f'{saida}: {estado}')
+
+
+if __name__ == '__main__':
+    main()
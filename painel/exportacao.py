@@ -0,0 +1,215 @@
+"""
+Exportação das tabelas filtradas em CSV ou Parquet, em blocos.
+
+As linhas exportadas são as mesmas que alimentam os gráficos: o índice da
+tabela (`painel.filtros.IndiceInvertido`) e as linhas já selecionadas pelos
+filtros gerais e pelos filtros da aba. Em vez de montar uma cópia filtrada
+da tabela e convertê-la inteira em texto, os geradores deste módulo
+percorrem as linhas em blocos de `TAMANHO_BLOCO` e devolvem os bytes de cada
+bloco; a memória usada depende do tamanho do bloco, e não da exportação.
+
+No app, o botão de download só gera o arquivo quando é clicado, em outra
+thread. Os blocos são gravados em um arquivo temporário, que o Streamlit lê
+uma vez e guarda em memória até o download, então
+o app só oferece o download de seleções com até `PAINEL_EXPORTAR_MAX_LINHAS`
+linhas. Acima disso, ele mostra o comando que grava o arquivo direto em
+disco (ou na saída padrão), bloco a bloco (`comando_exportacao`):
+
+    $ python -m painel.exportacao --tabela df_concluintes --ufs DF GO --saida concluintes.csv
+    $ python -m painel.exportacao --tabela df_docentes --formato parquet --saida docentes.parquet
+"""
+
+import argparse
+import io
+import shlex
+import sys
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+import numpy as np
+import pandas as pd
+
+from painel.filtros import IndiceInvertido
+
+TAMANHO_BLOCO = 100_000
+
+# formato -> (extensão, tipo MIME)
+FORMATOS = {
+    'CSV': ('csv', 'text/csv'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+# colunas da IES acrescentadas às tabelas que só têm o ID_IES (ex: cubo de docentes)
+COLUNAS_IES = ['NO_IES', 'UF']
+
+
+def blocos_linhas(
+    indice: IndiceInvertido,
+    linhas: np.ndarray | None,
+    atributos: pd.DataFrame | None = None,
+    tamanho: int = TAMANHO_BLOCO
+) -> Iterator[pd.DataFrame]:
+    """
+    Percorre as `linhas` selecionadas de `indice` em blocos.
+
+    Parâmetros:
+    - indice: Índice da tabela.
+    - linhas: Linhas selecionadas (None = todas), como em `IndiceInvertido.tabela`.
+    - atributos: Tabela com ID_IES e as `COLUNAS_IES` (ex: `dim_ies`), juntada a
+      cada bloco quando a tabela não tem essas colunas.
+    - tamanho: Linhas por bloco.
+
+    Retorna:
+    - Blocos de até `tamanho` linhas (ao menos um, vazio se nada foi selecionado).
+    """
+
+    total = len(indice) if linhas is None else len(linhas)
+    if atributos is not None:
+        faltantes = [coluna for coluna in COLUNAS_IES if coluna not in indice.df.columns]
+        if faltantes and 'ID_IES' in indice.df.columns:
+            atributos = atributos.drop_duplicates('ID_IES')[['ID_IES', *faltantes]]
+        else:
+            atributos = None
+
+    for inicio in range(0, max(total, 1), tamanho):
+        if linhas is None:
+            bloco = indice.df.iloc[inicio:inicio + tamanho]
+        else:
+            bloco = indice.tabela(linhas[inicio:inicio + tamanho])
+        if atributos is not None:
+            bloco = bloco.merge(atributos, on='ID_IES', how='left')
+        yield bloco
+
+
+def blocos_csv(blocos: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    """Bytes de um CSV (UTF-8, com cabeçalho) gerado bloco a bloco."""
+    cabecalho = True
+    for bloco in blocos:
+        yield bloco.to_csv(index=False, header=cabecalho).encode('utf-8')
+        cabecalho = False
+
+
+class _Bytes(io.RawIOBase):
+    """Destino de escrita que acumula os bytes até serem retirados."""
+
+    def __init__(self):
+        self._partes: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, dados) -> int:
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def retirar(self) -> bytes:
+        dados, self._partes = b''.join(self._partes), []
+        return dados
+
+
+def blocos_parquet(blocos: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    """Bytes de um arquivo Parquet gerado com um row group por bloco."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    saida = _Bytes()
+    escritor = None
+    for bloco in blocos:
+        tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+        if escritor is None:
+            escritor = pq.ParquetWriter(saida, tabela.schema)
+        escritor.write_table(tabela)
+        yield saida.retirar()
+    escritor.close()
+    yield saida.retirar()
+
+
+def exportar(
+    indice: IndiceInvertido,
+    linhas: np.ndarray | None,
+    formato: str,
+    atributos: pd.DataFrame | None = None,
+    tamanho: int = TAMANHO_BLOCO
+) -> Iterator[bytes]:
+    """
+    Bytes da exportação das `linhas` de `indice` no `formato` de `FORMATOS`,
+    bloco a bloco (ver `blocos_linhas`).
+    """
+
+    blocos = blocos_linhas(indice, linhas, atributos, tamanho)
+    if formato == 'CSV':
+        return blocos_csv(blocos)
+    if formato == 'Parquet':
+        return blocos_parquet(blocos)
+    raise ValueError(f"formato deve ser um de {list(FORMATOS)}, recebido {formato!r}.")
+
+
+def gravar(partes: Iterator[bytes], destino: BinaryIO) -> int:
+    """Grava os blocos em `destino`, sem juntá-los em memória; retorna os bytes gravados."""
+    total = 0
+    for parte in partes:
+        destino.write(parte)
+        total += len(parte)
+    return total
+
+
+def arquivo_temporario(partes: Iterator[bytes]) -> io.FileIO:
+    """
+    Grava os blocos em um arquivo temporário (apagado ao ser fechado), já no
+    início. O arquivo é aberto sem buffer (`io.FileIO`), que o Streamlit aceita
+    como retorno do `data=` de `st.download_button`.
+    """
+    arquivo = tempfile.TemporaryFile(buffering=0)
+    gravar(partes, arquivo)
+    arquivo.seek(0)
+    return arquivo
+
+
+def comando_exportacao(tabela: str, ufs: list[str], ies: list[str], ano: int | None = None) -> str:
+    """Linha de comando que exporta `tabela` com os filtros de UF e IES."""
+    argumentos = ['python', '-m', 'painel.exportacao', '--tabela', tabela]
+    if ufs:
+        argumentos += ['--ufs', *ufs]
+    if ies:
+        argumentos += ['--ies', *ies]
+    if ano is not None:
+        argumentos += ['--ano', str(ano)]
+    return shlex.join(argumentos) + f' --saida {tabela.removeprefix("df_")}.csv'
+
+
+def main() -> None:
+    from painel import config
+    from painel.registro import RegistroDados
+    from painel.tabelas import NOMES_TABELAS, linhas_filtradas, pedidos, versoes_tabelas
+
+    parser = argparse.ArgumentParser(description="Exporta uma tabela filtrada por UF e IES, em blocos.")
+    parser.add_argument('--tabela', required=True, choices=NOMES_TABELAS, help="tabela a exportar")
+    parser.add_argument('--ufs', nargs='*', default=[], help="UFs (padrão: todas)")
+    parser.add_argument('--ies', nargs='*', default=[], help="IES, pelo NO_IES (padrão: todas)")
+    parser.add_argument('--formato', default='csv', choices=[formato.lower() for formato in FORMATOS])
+    parser.add_argument('--ano', type=int, help="ano das partições em data/anos/ (padrão: as tabelas de data/)")
+    parser.add_argument('--tamanho-bloco', type=int, default=TAMANHO_BLOCO, help="linhas por bloco")
+    parser.add_argument('--saida', default='-', help="arquivo de saída (padrão: saída padrão)")
+    args = parser.parse_args()
+
+    formato = {formato.lower(): formato for formato in FORMATOS}[args.formato]
+    versoes = versoes_tabelas(config.RAIZ_DADOS, args.ano)
+    indices = RegistroDados(config.RAIZ_DADOS).carregar(
+        pedidos(list(dict.fromkeys(['df_dim_ies', args.tabela])), versoes, args.ano)
+    )
+    linhas = linhas_filtradas(indices, args.ufs, args.ies)
+
+    partes = exportar(
+        indices[args.tabela], linhas.get(args.tabela), formato, indices['df_dim_ies'].df, args.tamanho_bloco
+    )
+    if args.saida == '-':
+        gravar(partes, sys.stdout.buffer)
+        return
+    with open(args.saida, 'wb') as destino:
+        total = gravar(partes, destino)
+    print(f'{Path(args.saida)}: {total / 2**20:.1f} MB', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""
+Motor de filtros por índice invertido.
+
+Para cada tabela carregada, `IndiceInvertido` guarda, para cada valor de
+cada coluna filtrável (UF, NO_IES, CURSO, RAÇA, TURNO, ...), o array
+ordenado das linhas que têm aquele valor. Uma combinação de seleções é
+respondida unindo os arrays dos valores escolhidos em cada coluna e
+intersectando o resultado entre colunas, de modo que o custo depende do
+tamanho da seleção e não do tamanho da tabela.
+
+A tabela é ordenada pelas colunas do índice na construção; assim, seleções
+de uma única UF ou IES formam um bloco contínuo de linhas e são devolvidas
+como fatias (views) da tabela original.
+
+`IndiceContagem` responde aos sliders de contagem por curso: os totais de
+cada curso de uma seleção são ordenados uma vez, e cada faixa do slider vira
+duas buscas binárias e uma fatia das linhas já agrupadas por curso.
+"""
+
+import numpy as np
+import pandas as pd
+
+from painel.cubos import contar_por
+
+COLUNAS_FILTRAVEIS = ['UF', 'NO_IES', 'ID_IES', 'CURSO', 'RAÇA', 'TURNO']
+
+
+class IndiceInvertido:
+    """
+    Índice de linhas por valor das colunas filtráveis de uma tabela.
+
+    Parâmetros:
+    - df: Tabela a ser indexada.
+    - colunas: Colunas candidatas ao índice; as ausentes em `df` são ignoradas.
+    """
+
+    def __init__(self, df: pd.DataFrame, colunas: list[str] = COLUNAS_FILTRAVEIS):
+        self.colunas = [coluna for coluna in colunas if coluna in df.columns]
+        if self.colunas:
+            df = df.sort_values(self.colunas, kind='stable').reset_index(drop=True)
+        self.df = df
+        self.linhas_por_valor = {
+            coluna: {
+                valor: linhas.astype(np.int64)
+                for valor, linhas in df.groupby(coluna, observed=True, sort=False).indices.items()
+            }
+            for coluna in self.colunas
+        }
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def _linhas_da_coluna(self, coluna: str, valores) -> np.ndarray:
+        """União (ordenada) das linhas de cada valor selecionado em `coluna`."""
+        indice = self.linhas_por_valor[coluna]
+        blocos = [indice[valor] for valor in valores if valor in indice]
+        if not blocos:
+            return np.empty(0, dtype=np.int64)
+        if len(blocos) == 1:
+            return blocos[0]
+        return np.sort(np.concatenate(blocos))
+
+    def refinar(self, linhas: np.ndarray | None, coluna: str, valores) -> np.ndarray | None:
+        """
+        Restringe um conjunto de linhas às que têm um dos `valores` em `coluna`.
+
+        Parâmetros:
+        - linhas: Linhas já selecionadas, ou None para a tabela inteira.
+        - coluna: Coluna do filtro. Colunas que a tabela não tem são ignoradas.
+        - valores: Valores aceitos. None não filtra; uma lista vazia não
+          seleciona nenhuma linha.
+
+        Retorna:
+        - Array ordenado das linhas selecionadas, ou None se nada foi filtrado.
+        """
+
+        if valores is None or coluna not in self.linhas_por_valor:
+            return linhas
+
+        selecionadas = self._linhas_da_coluna(coluna, valores)
+        if linhas is None:
+            return selecionadas
+        return np.intersect1d(linhas, selecionadas, assume_unique=True)
+
+    def linhas(self, selecoes: dict) -> np.ndarray | None:
+        """Linhas que atendem a todas as `selecoes` ({coluna: valores})."""
+        resultado = None
+        for coluna, valores in selecoes.items():
+            resultado = self.refinar(resultado, coluna, valores)
+        return resultado
+
+    def contar(self, linhas: np.ndarray | None) -> int:
+        """Número de linhas selecionadas (None = tabela inteira)."""
+        return len(self.df) if linhas is None else len(linhas)
+
+    def tabela(self, linhas: np.ndarray | None) -> pd.DataFrame:
+        """
+        DataFrame com as `linhas` selecionadas.
+
+        Blocos contínuos de linhas viram fatias da tabela indexada, sem cópia.
+        """
+
+        if linhas is None:
+            return self.df
+        if len(linhas) == 0:
+            return self.df.iloc[0:0]
+        inicio, fim = int(linhas[0]), int(linhas[-1]) + 1
+        if fim - inicio == len(linhas):
+            return self.df.iloc[inicio:fim]
+        return self.df.take(linhas)
+
+    def selecionar(self, selecoes: dict) -> pd.DataFrame:
+        """Atalho para `tabela(linhas(selecoes))`."""
+        return self.tabela(self.linhas(selecoes))
+
+
+class IndiceContagem:
+    """
+    Totais por valor de `coluna` (ex: concluintes por curso) em uma seleção,
+    ordenados para filtrar por faixa de total.
+
+    Parâmetros:
+    - indice: Índice do cubo.
+    - linhas: Linhas selecionadas do cubo (None = todas).
+    - coluna: Coluna cujos valores são totalizados.
+    """
+
+    def __init__(self, indice: IndiceInvertido, linhas: np.ndarray | None, coluna: str = 'CURSO'):
+        tabela = indice.tabela(linhas)
+        self.contagens = contar_por(tabela, coluna)
+
+        totais = self.contagens.to_numpy()
+        self._ordem = np.argsort(totais, kind='stable')
+        self._totais = totais[self._ordem]
+
+        # posição de cada linha na ordem dos totais; as linhas sem valor ficam de fora
+        posicao = np.empty(len(self._ordem), dtype=np.int64)
+        posicao[self._ordem] = np.arange(len(self._ordem))
+        grupo = self.contagens.index.get_indexer(tabela[coluna])
+        linhas = np.arange(len(indice.df)) if linhas is None else linhas
+        linhas, grupo = linhas[grupo >= 0], posicao[grupo[grupo >= 0]]
+
+        agrupadas = np.argsort(grupo, kind='stable')
+        self._linhas = linhas[agrupadas]
+        self._inicios = np.searchsorted(grupo[agrupadas], np.arange(len(self._ordem) + 1))
+
+    @property
+    def nbytes(self) -> int:
+        return int(
+            self._ordem.nbytes + self._totais.nbytes + self._linhas.nbytes + self._inicios.nbytes
+            + self.contagens.memory_usage(index=True, deep=True)
+        )
+
+    @property
+    def vazio(self) -> bool:
+        return len(self._totais) == 0
+
+    @property
+    def minimo(self) -> int:
+        return int(self._totais[0])
+
+    @property
+    def maximo(self) -> int:
+        return int(self._totais[-1])
+
+    def _posicoes(self, minimo: int, maximo: int) -> tuple[int, int]:
+        return (
+            int(np.searchsorted(self._totais, minimo, side='left')),
+            int(np.searchsorted(self._totais, maximo, side='right')),
+        )
+
+    def linhas(self, minimo: int, maximo: int) -> np.ndarray:
+        """Linhas (ordenadas) dos valores com total entre `minimo` e `maximo`."""
+        inicio, fim = self._posicoes(minimo, maximo)
+        return np.sort(self._linhas[self._inicios[inicio]:self._inicios[fim]])
+
+    def totais(self, minimo: int, maximo: int) -> pd.Series:
+        """Totais dos valores com total entre `minimo` e `maximo`, na ordem de `contagens`."""
+        inicio, fim = self._posicoes(minimo, maximo)
+        return self.contagens.iloc[np.sort(self._ordem[inicio:fim])]
@@ -0,0 +1,478 @@
+"""
+Construção dos gráficos Altair do dashboard a partir das tabelas derivadas
+(ver `painel.derivados`).
+
+O altair é importado dentro de cada função, no primeiro gráfico desenhado, e
+não ao importar o módulo (ver `painel.importacoes`).
+
+Cada função é chamada uma vez por processo e tipo de tabela, para montar o
+modelo do gráfico (`painel.modelos`); as execuções seguintes só trocam os
+dados. Por isso o spec não deve depender dos valores da tabela: totais e
+rótulos calculados devem vir de colunas ou de transformações do Vega-Lite.
+"""
+
+
+def grafico_faixa_etaria(frequencia_df_faixa_etaria):
+    """Barras horizontais com a faixa etária dos docentes."""
+    import altair as alt
+
+    faixa_etaria_barra = alt.Chart(frequencia_df_faixa_etaria).mark_bar(orient='horizontal').encode(
+        x=alt.X("Frequência"),
+        y=alt.Y("Faixa Etária", sort='-x'),
+        tooltip=["Faixa Etária", "Frequência"],
+        color=alt.Color("Faixa Etária", legend=None),
+    ).properties(
+        title=alt.TitleParams(
+            text="Distribuição de Docentes por Faixa Etária",
+            anchor='middle',
+            fontSize=20
+        ),
+        height=835
+    ).interactive().configure_axisY(
+        labelFontSize=15
+    ).configure_axisX(
+        labelFontSize=15
+    )
+
+    return faixa_etaria_barra
+
+
+def grafico_cor_raca(frequencia_df_cor_raca):
+    """Barras com a cor/raça dos docentes."""
+    import altair as alt
+
+    cor_raca_barra = alt.Chart(frequencia_df_cor_raca).mark_bar(orient='vertical').encode(
+        x=alt.X("Cor_Raca", sort='-y', axis=alt.Axis(labelAngle=0)),
+        y=alt.Y("Frequência"),
+        tooltip=["Cor_Raca", "Frequência"],
+        color=alt.Color("Cor_Raca", legend=None)
+    ).properties(
+        title=alt.TitleParams(
+            text="Distribuição de Docentes por Cor e Raça",
+            anchor='middle',
+            fontSize=20
+        ),
+
+        width=600,
+        height=400
+    ).interactive().configure_axisY(
+        labelFontSize=20
+    ).configure_axisX(
+        labelFontSize=13
+    )
+
+    return cor_raca_barra
+
+
+def grafico_sexo(frequencia_df_sexo):
+    """Rosca com o sexo dos docentes, o total no centro e o percentual de cada fatia."""
+    import altair as alt
+
+    sexo_barra = alt.Chart(frequencia_df_sexo).mark_arc(innerRadius=100).encode(
+        theta=alt.Theta(field="Frequência", type="quantitative"),
+        color=alt.Color(field="Sexo", type="nominal", scale=alt.Scale(
+            domain=["FEM", "MASC"],
+            range=["#ff69b4", "#1f77b4"]
+        )),
+        order=alt.Order('Sexo', sort='ascending'),
+        tooltip=["Sexo", "Frequência"]
+    ).properties(
+        title=alt.TitleParams(
+            text="Distribuição de Docentes por Sexo",
+            anchor='middle',
+            fontSize=20,
+        )
+    ).interactive()
+
+    # o total é calculado no navegador, para o spec não depender dos dados (ver `painel.modelos`)
+    texto_central = alt.Chart(frequencia_df_sexo).transform_aggregate(
+        total='sum(Frequência)'
+    ).mark_text(
+        fontSize=50,
+        fontWeight='bold',
+        color='white'
+    ).encode(
+        text=alt.Text('total:Q', format='d')
+    )
+
+    texto_fatia = alt.Chart(frequencia_df_sexo).mark_text(
+        radius=120, size=14, fontWeight="bold", color="white"
+    ).encode(
+        theta=alt.Theta(field="Frequência", type="quantitative", stack="center"),
+        text='Percentual_str:N',
+        order=alt.Order('Sexo', sort='ascending')
+    )
+
+    sexo_pizza = (sexo_barra + 
+                  texto_central + 
+                  texto_fatia)
+
+    return sexo_pizza
+
+
+def grafico_escolaridade(frequencia_df_escol):
+    """Barras com o nível de escolaridade dos docentes."""
+    import altair as alt
+
+    barra_escolaridade = alt.Chart(frequencia_df_escol).mark_bar(orient="vertical").encode(
+        x=alt.X("Escolaridade", sort="-y", axis=alt.Axis(labelAngle=45)),
+        y=alt.Y("Frequência"),
+        tooltip=["Escolaridade", "Frequência"],
+        color=alt.Color("Escolaridade", legend=None)
+    ).properties(
+        title=alt.TitleParams(
+            text="Nivel de escolaridade dos docentes",
+            anchor="middle",
+            fontSize=20
+        ),
+        height=400
+    ).interactive().configure_axisY(
+        labelFontSize=20
+    ).configure_axisX(
+        labelFontSize=15
+    )
+
+    return barra_escolaridade
+
+
+def grafico_tprede(frequencia_df_tprede):
+    """Barras com as IES por tipo de rede."""
+    import altair as alt
+
+    barra_tprede = alt.Chart(frequencia_df_tprede).mark_bar(orient="vertical").encode(
+        x=alt.X("Tipo de rede", sort='-y', axis=alt.Axis(labelAngle=0)),
+        y=alt.Y("Frequência"),
+        tooltip=["Tipo de rede", "Frequência"],
+        color=alt.Color("Tipo de rede", legend=None)
+    ).properties(
+        title=alt.TitleParams("Tipos de rede",
+            anchor="middle",
+            fontSize=20
+        ),
+        width=900,
+        height=500
+    ).configure_axisX(
+        labelFontSize=15
+    ).configure_axisY(
+        labelFontSize=20
+    )
+
+    return barra_tprede
+
+
+def grafico_acesso_internet(frequencia_df_acesso_internet):
+    """Barras com as IES com e sem acesso à internet."""
+    import altair as alt
+
+    barra_acesso_internet = alt.Chart(frequencia_df_acesso_internet).mark_bar(orient="horizontal").encode(
+        x=alt.X("Frequência"),
+        y=alt.Y("Acesso a Internet", sort='-y'),
+        tooltip=["Frequência", "Acesso a Internet"],
+        color=alt.Color("Acesso a Internet", legend=None)
+    ).properties(
+        title=alt.TitleParams("Universidades com acesso a internet",
+                anchor="middle")
+    ).configure_axisX(
+        labelFontSize=15
+    ).configure_axisY(
+        labelFontSize=12
+    )
+
+    return barra_acesso_internet
+
+
+def grafico_repositorio(frequencia_df_repositorio):
+    """Barras com as IES com e sem repositório institucional."""
+    import altair as alt
+
+    barra_repositorio = alt.Chart(frequencia_df_repositorio).mark_bar(orient="horizontal").encode(
+        x=alt.X("Frequência"),
+        y=alt.Y("Repositório Acadêmico", sort="-y"),
+        tooltip=["Frequência", "Repositório Acadêmico"],
+        color=alt.Color("Repositório Acadêmico", legend=None)
+    ).properties(
+        title=alt.TitleParams("Universidades no repositorio",
+                              anchor="middle")
+    ).configure_axisX(
+        labelFontSize=15
+    ).configure_axisY(
+        labelFontSize=12
+    )
+
+    return barra_repositorio
+
+
+def grafico_concluintes(frequencia_df_concluintes):
+    """Barras com o total de concluintes por curso."""
+    import altair as alt
+
+    concluintes_bar = alt.Chart(frequencia_df_concluintes).mark_bar(orient="vertical").encode(
+        x=alt.X("Curso", sort="-y", axis=alt.Axis(labelAngle=45)),
+        y=alt.Y("Frequência"),
+        tooltip=["Curso", "Frequência"],
+        color=alt.Color("Curso", legend=None)
+    ).properties(
+        title=alt.TitleParams("Total de concluintes por curso",
+                              anchor="middle")
+    ).configure_axisX(
+        labelFontSize=15
+    ).configure_axisY(
+        labelFontSize=15
+    )
+
+    return concluintes_bar
+
+
+def grafico_concluintes_cor_raca(frequencia_df_raca_conc):
+    """Barras com o total de concluintes por cor/raça."""
+    import altair as alt
+
+    concluintes_cor_raca_bar = alt.Chart(frequencia_df_raca_conc).mark_bar(orient="horizontal").encode(
+        x=alt.X("Frequência"),
+        y=alt.Y("Raça", sort="-x"),
+        tooltip=["Raça", "Frequência"],
+        color=alt.Color("Raça", legend=None)
+    ).properties(
+        title=alt.TitleParams("Total de concluintes por cor e raça",
+                              anchor="middle")
+    ).configure_axisX(
+        labelFontSize=15
+    ).configure_axisY(
+        labelFontSize=12
+    )
+
+    return concluintes_cor_raca_bar
+
+
+def grafico_concluintes_raca_uf(df_raca_uf):
+    """Barras empilhadas (normalizadas) de cor/raça dos concluintes por UF."""
+    import altair as alt
+
+    raca_uf_bar = alt.Chart(df_raca_uf).mark_bar(orient="horizontal").encode(
+        x=alt.X('sum(quantidade):Q',
+                axis=alt.Axis(title='Proporção de Concluintes', format='%'),
+                stack='normalize'),
+        y=alt.Y('UF:N', title='UF'),
+        color=alt.Color('RAÇA:N', title='Cor/Raça'),
+        tooltip=[
+            alt.Tooltip('UF:N', title='UF'),
+            alt.Tooltip('RAÇA:N', title='Cor/Raça'),
+            alt.Tooltip('sum(quantidade):Q', title='Quantidade')
+        ]
+    ).properties(
+        title=alt.TitleParams("Cor e raça dos concluintes por UF",
+                              anchor="middle")
+    ).configure_axisX(
+        labelFontSize=15
+    ).configure_axisY(
+        labelFontSize=12
+    )
+
+    return raca_uf_bar
+
+
+def grafico_turnos(frequencia_df_turnos):
+    """Barras com o total de vagas por turno."""
+    import altair as alt
+
+    turnos_bar = alt.Chart(frequencia_df_turnos).mark_bar(orient="horizontal").encode(
+        x=alt.X("Frequência"),
+        y=alt.Y("Turno", sort="-x"),
+        tooltip=["Frequência", "Turno"],
+        color=alt.Color("Turno", legend=None)
+    ).properties(
+        title=alt.TitleParams("Total de vagas disponíveis por turno",
+                              anchor="middle")
+    ).configure_axisX(
+        labelFontSize=15
+    ).configure_axisY(
+        labelFontSize=12
+    )
+
+    return turnos_bar
+
+
+def grafico_turnos_cursos(frequencia_df_turno_cursos):
+    """Barras com o total de vagas por curso."""
+    import altair as alt
+
+    turnos_cursos_bar = alt.Chart(frequencia_df_turno_cursos).mark_bar(orient="vertical").encode(
+        x=alt.X("Curso", sort="-y", axis=alt.Axis(labelAngle=45)),
+        y=alt.Y("Frequência"),
+        tooltip=["Curso", "Frequência"],
+        color=alt.Color("Curso", legend=None)
+    ).properties(
+        title=alt.TitleParams("Total de vagas disponíveis por curso",
+                              anchor="middle")
+    ).configure_axisX(
+        labelFontSize=15
+    ).configure_axisY(
+        labelFontSize=15
+    )
+
+    return turnos_cursos_bar
+
+
+def grafico_escol_cor(df_agg):
+    """Barras empilhadas (normalizadas) de cor/raça por escolaridade."""
+    import altair as alt
+
+    escol_cor_tree = alt.Chart(df_agg).mark_bar().encode(
+        x=alt.X('ESCOLARIDADE:N', title='Escolaridade', sort=None, axis=alt.Axis(labelAngle=0)),
+        y=alt.Y('sum(quantidade):Q',
+                axis=alt.Axis(title='Proporção de Docentes', format='%'),
+                stack='normalize'),
+
+        color=alt.Color('COR_RACA:N', title='Cor/Raça'),
+
+        tooltip=[
+            alt.Tooltip('ESCOLARIDADE:N', title='Escolaridade'),
+            alt.Tooltip('COR_RACA:N', title='Cor/Raça'),
+            alt.Tooltip('sum(quantidade):Q', title='Quantidade')
+        ]
+    ).properties(
+        title=alt.TitleParams("Composição de Cor/Raça por Nível de Escolaridade",
+            anchor="middle"),
+        width=600,
+        height=800
+    ).configure_axisX(
+        labelFontSize=15
+    ).configure_axisY(
+        labelFontSize=15
+    )
+
+    return escol_cor_tree
+
+
+def grafico_escol_uf(df_escol_uf):
+    """Barras empilhadas (normalizadas) de escolaridade por UF."""
+    import altair as alt
+
+    escol_uf_bar = alt.Chart(df_escol_uf).mark_bar().encode(
+        x=alt.X('UF:N', title='UF', sort=None, axis=alt.Axis(labelAngle=0)),
+        y=alt.Y('sum(quantidade):Q',
+                axis=alt.Axis(title='Proporção de Docentes', format='%'),
+                stack='normalize'),
+
+        color=alt.Color('ESCOLARIDADE:N', title='Escolaridade'),
+
+        tooltip=[
+            alt.Tooltip('UF:N', title='UF'),
+            alt.Tooltip('ESCOLARIDADE:N', title='Escolaridade'),
+            alt.Tooltip('sum(quantidade):Q', title='Quantidade')
+        ]
+    ).properties(
+        title=alt.TitleParams("Escolaridade dos Docentes por UF",
+            anchor="middle"),
+        height=400
+    ).configure_axisX(
+        labelFontSize=15
+    ).configure_axisY(
+        labelFontSize=15
+    )
+
+    return escol_uf_bar
+
+
+def grafico_tendencias(df_tendencias):
+    """Linhas com o total de cada indicador por ano, uma por indicador (escalas próprias)."""
+    import altair as alt
+
+    tendencias_linha = alt.Chart(df_tendencias).mark_line(point=True).encode(
+        x=alt.X('ANO:O', title='Ano', axis=alt.Axis(labelAngle=0)),
+        y=alt.Y('QTD:Q', title='Total'),
+        color=alt.Color('INDICADOR:N', legend=None),
+        tooltip=[
+            alt.Tooltip('ANO:O', title='Ano'),
+            alt.Tooltip('INDICADOR:N', title='Indicador'),
+            alt.Tooltip('QTD:Q', title='Total')
+        ]
+    ).properties(
+        width=350,
+        height=250
+    ).facet(
+        facet=alt.Facet('INDICADOR:N', title=None),
+        columns=2
+    ).resolve_scale(
+        y='independent'
+    ).properties(
+        title=alt.TitleParams("Evolução entre os anos do Censo",
+            anchor="middle")
+    ).configure_axisX(
+        labelFontSize=15
+    ).configure_axisY(
+        labelFontSize=15
+    )
+
+    return tendencias_linha
+
+
+def grafico_acesso_rede(df_acesso_rede):
+    """
+    Mapa de calor de IES por UF e tipo de rede, separado por acesso à internet.
+
+    `df_acesso_rede` já vem agregado (uma linha por célula, com a contagem em
+    `QTD`), então o navegador não precisa contar as IES.
+    """
+    import altair as alt
+
+    base_acesso_rede = alt.Chart(df_acesso_rede).encode(
+        alt.X('TP_REDE:N', title='Tipo de Rede'),
+        alt.Y('UF:N', title='UF')
+    ).properties(
+        width=250,
+        height=200
+    )
+
+    heatmap_layer = base_acesso_rede.mark_rect().encode(
+        alt.Color('QTD:Q',
+                  scale=alt.Scale(scheme='viridis'),
+                  title='Nº de Instituições')
+    )
+
+    text_layer = base_acesso_rede.mark_text(baseline='middle').encode(
+        text=alt.Text('QTD:Q'),
+        color=alt.value('black')
+    )
+
+    df_acesso_rede_final = (heatmap_layer + text_layer).facet(
+        column=alt.Column('IN_SERVICO_INTERNET:N', title='Possui acesso à internet?')
+    ).properties(
+        title='Distribuição de Instituições por UF que possui ou não acesso à internet'
+    ).configure_axisX(
+        labelFontSize=15
+    ).configure_axisY(
+        labelFontSize=15
+    ).interactive()
+
+    return df_acesso_rede_final
+
+
+# gráficos Altair de cada aba: (função, tabela derivada desenhada), como em `painel.abas`
+GRAFICOS_POR_ABA = {
+    'Docentes': [
+        (grafico_sexo, 'frequencia_df_sexo'),
+        (grafico_escolaridade, 'frequencia_df_escol'),
+        (grafico_faixa_etaria, 'frequencia_df_faixa_etaria'),
+        (grafico_cor_raca, 'frequencia_df_cor_raca'),
+    ],
+    'Formados': [
+        (grafico_escol_cor, 'df_agg'),
+        (grafico_escol_uf, 'df_escol_uf'),
+    ],
+    'Redes': [
+        (grafico_acesso_internet, 'frequencia_df_acesso_internet'),
+        (grafico_tprede, 'frequencia_df_tprede'),
+        (grafico_acesso_rede, 'df_acesso_rede'),
+        (grafico_repositorio, 'frequencia_df_repositorio'),
+    ],
+    'Concluintes': [
+        (grafico_concluintes_cor_raca, 'frequencia_df_raca_conc'),
+        (grafico_concluintes_raca_uf, 'df_raca_uf'),
+        (grafico_concluintes, 'frequencia_df_concluintes'),
+    ],
+    'Vagas': [
+        (grafico_turnos, 'frequencia_df_turnos'),
+        (grafico_turnos_cursos, 'frequencia_df_turno_cursos'),
+    ],
+}
@@ -0,0 +1,113 @@
+"""
+Relatório do tempo de importação do dashboard na partida.
+
+Importa, em um processo novo com `python -X importtime`, os mesmos módulos
+que o `streamlit_app.py` importa e soma o tempo gasto por pacote. Também
+aponta as dependências pesadas que não deveriam ser carregadas na partida:
+o altair é importado no primeiro gráfico (`painel.graficos`), o plotly ao
+montar o mapa (`painel.mapa.figura_mapa`) e o geopandas e o requests só ao
+regenerar a malha.
+
+    $ python -m painel.importacoes
+    $ python -m painel.importacoes --limite 1500   # falha acima de 1,5 s
+"""
+
+import argparse
+import ast
+import json
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+ARQUIVO_APP = RAIZ / 'streamlit_app.py'
+
+# pacotes que só devem ser importados quando a parte do app que os usa é desenhada
+MODULOS_PESADOS = ['altair', 'geopandas', 'shapely', 'pyproj', 'pyogrio', 'fiona', 'requests']
+
+
+def modulos_do_app(arquivo: Path = ARQUIVO_APP) -> list[str]:
+    """Módulos importados no nível de módulo de `arquivo`, na ordem do código."""
+    arvore = ast.parse(arquivo.read_text(encoding='utf-8'))
+    modulos = []
+    for no in arvore.body:
+        if isinstance(no, ast.Import):
+            modulos += [alias.name for alias in no.names]
+        elif isinstance(no, ast.ImportFrom) and no.module:
+            modulos.append(no.module)
+    return list(dict.fromkeys(modulos))
+
+
+def medir_importacoes(modulos: list[str], raiz: Path = RAIZ) -> list[dict]:
+    """
+    Tempo de importação de cada módulo carregado ao importar `modulos`.
+
+    Parâmetros:
+    - modulos: Módulos importados, em ordem, por um processo novo.
+    - raiz: Pasta de onde o processo é executado.
+
+    Retorna:
+    - Uma entrada por módulo, na ordem do `-X importtime`, com 'modulo',
+      'nivel' (profundidade na árvore de importações) e os tempos 'proprio' e
+      'acumulado', em segundos.
+    """
+
+    codigo = '; '.join(f'import {modulo}' for modulo in modulos)
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', codigo],
+        cwd=raiz, capture_output=True, text=True, check=True
+    )
+
+    medicoes = []
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        proprio, acumulado, nome = linha[len('import time:'):].split('|')
+        medicoes.append({
+            'modulo': nome.strip(),
+            'nivel': (len(nome) - len(nome.lstrip()) - 1) // 2,
+            'proprio': int(proprio) / 1e6,
+            'acumulado': int(acumulado) / 1e6,
+        })
+    return medicoes
+
+
+def resumir(medicoes: list[dict], pacotes: int = 15) -> dict:
+    """Tempo total, os `pacotes` mais lentos e os módulos pesados importados."""
+    por_pacote = Counter()
+    for medicao in medicoes:
+        por_pacote[medicao['modulo'].split('.')[0]] += medicao['proprio']
+
+    carregados = {medicao['modulo'].split('.')[0] for medicao in medicoes}
+    return {
+        'total': sum(por_pacote.values()),
+        'modulos': len(medicoes),
+        'pacotes': dict(por_pacote.most_common(pacotes)),
+        'pesados': [modulo for modulo in MODULOS_PESADOS if modulo in carregados],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mede o tempo de importação dos módulos do dashboard.")
+    parser.add_argument('--pacotes', type=int, default=15, help="pacotes exibidos no relatório")
+    parser.add_argument('--limite', type=float, help="falha se o total passar deste tempo (ms)")
+    parser.add_argument('--json', action='store_true', help="imprime o relatório em JSON")
+    args = parser.parse_args()
+
+    resumo = resumir(medir_importacoes(modulos_do_app()), args.pacotes)
+    if args.json:
+        print(json.dumps(resumo, indent=2))
+    else:
+        print(f"{resumo['modulos']} módulos em {resumo['total'] * 1000:.0f} ms")
+        for pacote, segundos in resumo['pacotes'].items():
+            print(f'{pacote:<24} {segundos * 1000:8.1f} ms')
+        if resumo['pesados']:
+            print(f"Importados na partida: {', '.join(resumo['pesados'])}")
+
+    if resumo['pesados'] or (args.limite is not None and resumo['total'] * 1000 > args.limite):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
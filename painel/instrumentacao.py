@@ -0,0 +1,173 @@
+"""
+Histórico, exportação e painel das medições de cada execução.
+
+Ao fim de cada execução (da página ou só de um fragmento) o resumo de
+`painel.medicao` é guardado no histórico da sessão e, se
+`PAINEL_TRACE_ARQUIVO` estiver definido, acrescentado ao arquivo como uma
+linha JSON, para ser coletado dos servidores.
+
+O painel com as últimas execuções aparece na barra lateral só para quem
+abre o app com `?admin=<PAINEL_ADMIN_TOKEN>`. Sem o painel, sem o trace e
+sem `PAINEL_MEDIR` (usado pelo benchmark), nada é medido.
+"""
+
+import functools
+import hmac
+import json
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+import streamlit as st
+
+from painel import config
+from painel.medicao import ETAPAS, Medicao, estatisticas_cache, iniciar_medicao, medicao_atual
+
+_trava_trace = threading.Lock()
+
+
+def _historico() -> deque:
+    historico = st.session_state.get('_historico_medicao')
+    if historico is None or historico.maxlen != config.HISTORICO_EXECUCOES:
+        historico = deque(historico or [], maxlen=config.HISTORICO_EXECUCOES)
+        st.session_state['_historico_medicao'] = historico
+    return historico
+
+
+def medicao_ligada() -> bool:
+    """Verdadeiro se alguém lê a medição: o painel, o trace ou o benchmark."""
+    return config.MEDIR or bool(config.TRACE_ARQUIVO) or admin_autorizado()
+
+
+def _exportar(registro: dict) -> None:
+    linha = json.dumps(registro, ensure_ascii=False, default=str)
+    with _trava_trace, open(config.TRACE_ARQUIVO, 'a', encoding='utf-8') as arquivo:
+        arquivo.write(linha + '\n')
+
+
+def encerrar_execucao(medicao: Medicao, tipo: str = 'pagina', **contexto) -> dict:
+    """
+    Finaliza a medição e a registra no histórico da sessão e no trace.
+
+    Parâmetros:
+    - medicao: Medição da execução.
+    - tipo: 'pagina' ou 'fragmento'.
+    - contexto: Informações extras do registro (ex: aba, filtros).
+    """
+
+    registro = {
+        'momento': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+        'tipo': tipo,
+        **contexto,
+        **medicao.finalizar(),
+        'cache': estatisticas_cache(),
+    }
+    st.session_state['_medicao'] = registro
+    _historico().append(registro)
+    if config.TRACE_ARQUIVO:
+        _exportar(registro)
+    return registro
+
+
+@contextmanager
+def execucao_fragmento(aba: str, **contexto):
+    """
+    Mede o bloco como uma execução própria quando só o fragmento reexecuta.
+
+    Numa execução da página inteira a medição da página já está aberta e o
+    bloco entra nela.
+    """
+
+    medicao = medicao_atual()
+    if medicao is not None and not medicao.finalizada:
+        yield
+        return
+
+    medicao = iniciar_medicao(medicao_ligada())
+    if medicao is None:
+        yield
+        return
+
+    try:
+        yield
+    finally:
+        encerrar_execucao(medicao, 'fragmento', aba=aba, **contexto)
+
+
+def medir_fragmento(aba: str):
+    """Decorador de fragmentos (`st.fragment`) que aplica `execucao_fragmento`."""
+
+    def decorar(funcao):
+        @functools.wraps(funcao)
+        def medir(*args, **kwargs):
+            with execucao_fragmento(aba):
+                return funcao(*args, **kwargs)
+
+        return medir
+
+    return decorar
+
+
+def admin_autorizado() -> bool:
+    """Verdadeiro se o app foi aberto com `?admin=` igual a `PAINEL_ADMIN_TOKEN`."""
+    if not config.ADMIN_TOKEN:
+        return False
+    token = st.query_params.get('admin', '')
+    return hmac.compare_digest(token.encode(), config.ADMIN_TOKEN.encode())
+
+
+def _tabela_execucoes(historico) -> pd.DataFrame:
+    linhas = []
+    for registro in reversed(historico):
+        linha = {
+            'momento': registro['momento'][11:23],
+            'tipo': registro['tipo'],
+            'aba': registro.get('aba'),
+            'total (ms)': registro['total'] * 1000,
+        }
+        for nome in ETAPAS:
+            linha[f'{nome} (ms)'] = registro['etapas'].get(nome, 0.0) * 1000
+        linhas.append(linha)
+    return pd.DataFrame(linhas).round(1)
+
+
+def painel_admin() -> None:
+    """Painel de instrumentação na barra lateral (só para administradores)."""
+    if not admin_autorizado():
+        return
+
+    historico = list(st.session_state.get('_historico_medicao', []))
+    with st.sidebar.expander("Instrumentação", expanded=False):
+        if not historico:
+            st.caption("Nenhuma execução medida ainda.")
+            return
+
+        st.caption(f"Últimas {len(historico)} execuções (mais recente primeiro)")
+        st.dataframe(_tabela_execucoes(historico), hide_index=True)
+
+        ultima = historico[-1]
+        st.caption("Intervalos da última execução")
+        spans = pd.DataFrame(ultima['spans'])
+        if not spans.empty:
+            spans[['inicio', 'duracao']] = (spans[['inicio', 'duracao']] * 1000).round(1)
+            st.dataframe(spans.rename(columns={'inicio': 'início (ms)', 'duracao': 'duração (ms)'}), hide_index=True)
+
+        if ultima['linhas']:
+            st.caption("Linhas nos filtros")
+            st.dataframe(pd.DataFrame(ultima['linhas']).T)
+
+        st.caption("Caches (processo)")
+        st.dataframe(pd.DataFrame(ultima['cache']).T)
+        for chave in ['cache_derivados', 'cache_etapas', 'registro', 'aquecimento']:
+            if ultima.get(chave) is not None:
+                st.caption(chave)
+                st.json(ultima[chave], expanded=False)
+
+        st.download_button(
+            "Exportar (JSON lines)",
+            data='\n'.join(json.dumps(registro, ensure_ascii=False, default=str) for registro in historico),
+            file_name='medicoes.jsonl',
+            mime='application/jsonl'
+        )
@@ -0,0 +1,197 @@
+"""
+Mapa das UFs da RIDE a partir de uma malha local.
+
+O dashboard não baixa mais o GeoJSON dos estados a cada execução: a malha
+fica em `data/geo/`, já recortada para as UFs da RIDE e simplificada, e os
+centroides ficam em `data/geo/centroides_ride.csv`.
+
+O plotly só é importado ao montar a figura, e o geopandas e o requests só ao
+regenerar a malha, para não pesar na partida do app.
+
+A malha empacotada foi gerada da malha municipal do IBGE (1:2.500.000), com
+os municípios unidos por UF. Para regenerá-la (exige o geopandas), a partir
+do GeoJSON dos estados ou de qualquer camada de estados ou municípios que o
+geopandas leia, com a sigla da UF em uma coluna:
+
+    $ python -m painel.mapa
+    $ python -m painel.mapa --origem caminho/para/brazil-states.geojson
+    $ python -m painel.mapa --origem 55mu2500gsd.shp --coluna-uf Sigla
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pandas as pd
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+RAIZ = Path(__file__).resolve().parent.parent
+ARQUIVO_MALHA = Path('data/geo/ride_estados.geojson')
+ARQUIVO_CENTROIDES = Path('data/geo/centroides_ride.csv')
+
+ORIGEM_MALHA = "https://raw.githubusercontent.com/codeforamerica/click_that_hood/master/public/data/brazil-states.geojson"
+UFS_RIDE = ['DF', 'GO', 'MG']
+
+
+def carregar_malha(raiz: Path = RAIZ) -> dict | None:
+    """GeoJSON da RIDE empacotado com o projeto, ou None se o arquivo foi removido."""
+    caminho = raiz / ARQUIVO_MALHA
+    if not caminho.exists():
+        return None
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def carregar_centroides(raiz: Path = RAIZ) -> pd.DataFrame:
+    """Centroides (lat, lon) de cada UF, indexados pela sigla."""
+    return pd.read_csv(raiz / ARQUIVO_CENTROIDES).set_index('sigla')
+
+
+def figura_mapa(
+    valores: dict[str, float],
+    malha: dict | None,
+    centroides: pd.DataFrame
+) -> 'go.Figure':
+    """
+    Monta o mapa coroplético da RIDE.
+
+    Parâmetros:
+    - valores: Valor a ser exibido por sigla de UF.
+    - malha: GeoJSON das UFs (ver `carregar_malha`). Se o arquivo da malha
+      faltar, as UFs são desenhadas como marcadores nos centroides.
+    - centroides: Centroides das UFs (ver `carregar_centroides`).
+
+    Retorna:
+    - Figura do plotly pronta para o `st.plotly_chart`.
+    """
+
+    import plotly.graph_objects as go
+
+    siglas = list(centroides.index)
+    z = [valores.get(sigla, 0) for sigla in siglas]
+    visiveis = [sigla for sigla, v in zip(siglas, z) if v > 1]
+
+    text_annotations = go.Scattergeo(
+        lon=centroides.loc[visiveis, 'lon'],
+        lat=centroides.loc[visiveis, 'lat'],
+        text=visiveis,
+        mode='text',
+        textfont=dict(
+            size=14,
+            color='black',
+            family='Tahoma'
+        )
+    )
+
+    if malha is not None:
+        camada = go.Choropleth(
+            geojson=malha,
+            locations=siglas,
+            z=[v if v > 1 else None for v in z],
+            featureidkey="properties.sigla",
+            colorscale="Viridis",
+            marker_line_color='white',
+            marker_line_width=0.5,
+            colorbar_title="Valor"
+        )
+    else:
+        camada = go.Scattergeo(
+            lon=centroides['lon'],
+            lat=centroides['lat'],
+            mode='markers',
+            marker=dict(
+                size=40,
+                color=z,
+                colorscale="Viridis",
+                colorbar_title="Valor"
+            )
+        )
+
+    fig = go.Figure(data=[camada, text_annotations])
+
+    fig.update_geos(
+        fitbounds="locations",
+        visible=malha is None
+    )
+
+    fig.update_layout(
+        geo=dict(
+            bgcolor='rgba(0,0,0,0)'
+        ),
+        paper_bgcolor='rgba(0,0,0,0)',
+        margin={"r":0,"t":0,"l":0,"b":0}
+    )
+
+    return fig
+
+
+def gerar_malha(
+    origem: str = ORIGEM_MALHA,
+    ufs: list[str] = UFS_RIDE,
+    tolerancia: float = 0.01,
+    raiz: Path = RAIZ,
+    coluna_uf: str = 'sigla'
+) -> None:
+    """
+    Gera a malha local e os centroides a partir de uma camada de estados.
+
+    Parâmetros:
+    - origem: URL de um GeoJSON ou caminho de qualquer arquivo que o
+      geopandas leia (GeoJSON, shapefile, ...).
+    - ufs: UFs mantidas no recorte.
+    - tolerancia: Tolerância da simplificação, em graus.
+    - raiz: Raiz do projeto onde os arquivos são escritos.
+    - coluna_uf: Coluna com a sigla da UF. As feições de cada UF são unidas,
+      então uma malha municipal também serve de origem.
+    """
+
+    import geopandas as gpd
+
+    if origem.startswith(('http://', 'https://')):
+        import requests
+        geojson = requests.get(origem, timeout=60).json()
+        gdf = gpd.GeoDataFrame.from_features(geojson["features"], crs='EPSG:4326')
+    else:
+        gdf = gpd.read_file(origem)
+
+    if gdf.crs is not None:
+        gdf = gdf.to_crs('EPSG:4326')
+    gdf = gdf[gdf[coluna_uf].isin(ufs)][[coluna_uf, 'geometry']]
+    gdf = gdf.dissolve(by=coluna_uf).rename_axis('sigla').sort_index()
+
+    # centroides calculados na policônica do Brasil (SIRGAS 2000), e não em graus
+    centroide = gdf.geometry.to_crs('EPSG:5880').centroid.to_crs('EPSG:4326')
+    centroides = pd.DataFrame({'lat': centroide.y.round(6), 'lon': centroide.x.round(6)})
+
+    # simplifica as divisas em conjunto para que UFs vizinhas continuem encaixadas
+    if hasattr(gdf.geometry, 'simplify_coverage'):
+        gdf['geometry'] = gdf.geometry.simplify_coverage(tolerancia)
+    else:
+        gdf['geometry'] = gdf.geometry.simplify(tolerancia, preserve_topology=True)
+
+    gdf['lat'] = centroides['lat']
+    gdf['lon'] = centroides['lon']
+
+    (raiz / ARQUIVO_MALHA).parent.mkdir(parents=True, exist_ok=True)
+    gdf.reset_index()[['sigla', 'lat', 'lon', 'geometry']].to_file(
+        raiz / ARQUIVO_MALHA, driver='GeoJSON', COORDINATE_PRECISION=4
+    )
+    centroides.reset_index().to_csv(raiz / ARQUIVO_CENTROIDES, index=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Gera a malha local das UFs da RIDE.")
+    parser.add_argument('--origem', default=ORIGEM_MALHA, help="URL ou caminho do GeoJSON dos estados")
+    parser.add_argument('--tolerancia', type=float, default=0.01, help="tolerância da simplificação, em graus")
+    parser.add_argument('--coluna-uf', default='sigla', help="coluna com a sigla da UF na origem")
+    args = parser.parse_args()
+
+    gerar_malha(args.origem, tolerancia=args.tolerancia, coluna_uf=args.coluna_uf)
+    print(f'Malha escrita em {ARQUIVO_MALHA} e centroides em {ARQUIVO_CENTROIDES}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Medição do tempo gasto em cada etapa de uma execução do dashboard.
+
+O script chama `iniciar_medicao()` no começo de cada execução e envolve o
+código de cada etapa com `etapa(nome)`. Os tempos de etapas com o mesmo nome
+são somados; cada bloco também fica registrado como um intervalo (`spans`),
+com um detalhe opcional (ex: o nome do gráfico). O resumo da última execução
+fica em `st.session_state['_medicao']`, onde o benchmark (`painel.benchmark`)
+e o painel de instrumentação (`painel.instrumentacao`) o leem.
+
+Além dos tempos, a medição guarda as linhas que entram e saem de cada filtro
+e, no processo todo, os acessos e falhas dos caches (`contar_cache`).
+
+A medição só é ligada quando alguém a lê (ver
+`painel.instrumentacao.medicao_ligada`). Sem medição aberta, `etapa` devolve
+um contexto vazio e `contar_linhas` não faz nada.
+"""
+
+import contextvars
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+ETAPAS = ['carga', 'filtros', 'agregacao', 'graficos', 'serializacao']
+
+
+class Medicao:
+    """Tempos (em segundos) das etapas de uma execução."""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.etapas: dict[str, float] = {}
+        self.spans: list[dict] = []
+        self.linhas: dict[str, dict[str, int]] = {}
+        self.finalizada = False
+
+    def registrar(self, nome: str, segundos: float, inicio: float | None = None, detalhe: str | None = None) -> None:
+        self.etapas[nome] = self.etapas.get(nome, 0.0) + segundos
+        if inicio is not None:
+            self.spans.append({
+                'etapa': nome,
+                'detalhe': detalhe,
+                'inicio': inicio - self.inicio,
+                'duracao': segundos,
+            })
+
+    def contar_linhas(self, filtro: str, entrada: int, saida: int) -> None:
+        self.linhas[filtro] = {'entrada': entrada, 'saida': saida}
+
+    def resumo(self) -> dict:
+        return {
+            'etapas': dict(self.etapas),
+            'total': time.perf_counter() - self.inicio,
+            'spans': list(self.spans),
+            'linhas': dict(self.linhas),
+        }
+
+    def finalizar(self) -> dict:
+        """Resumo da execução; etapas medidas depois disso começam outra medição."""
+        self.finalizada = True
+        return self.resumo()
+
+
+_medicao_atual: contextvars.ContextVar[Medicao | None] = contextvars.ContextVar(
+    'medicao_atual', default=None
+)
+
+
+def iniciar_medicao(ligada: bool = True) -> Medicao | None:
+    """
+    Começa a medição de uma nova execução na thread atual. Com `ligada`
+    falso, encerra a medição da execução anterior e devolve None.
+    """
+    medicao = Medicao() if ligada else None
+    _medicao_atual.set(medicao)
+    return medicao
+
+
+def medicao_atual() -> Medicao | None:
+    return _medicao_atual.get()
+
+
+_SEM_MEDICAO = nullcontext()
+
+
+@contextmanager
+def _medir(medicao: Medicao, nome: str, detalhe: str | None):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        medicao.registrar(nome, time.perf_counter() - inicio, inicio, detalhe)
+
+
+def etapa(nome: str, detalhe: str | None = None):
+    """Soma o tempo do bloco à etapa `nome` da medição atual, se houver."""
+    medicao = _medicao_atual.get()
+    if medicao is None:
+        return _SEM_MEDICAO
+    return _medir(medicao, nome, detalhe)
+
+
+def contar_linhas(filtro: str, entrada: int, saida: int) -> None:
+    """Registra quantas linhas entraram e saíram de um filtro."""
+    medicao = _medicao_atual.get()
+    if medicao is not None:
+        medicao.contar_linhas(filtro, entrada, saida)
+
+
+def pico_memoria_mb() -> float | None:
+    """Pico de memória residente do processo (MB), ou None fora do Unix."""
+    try:
+        import resource
+    except ImportError:
+        # o módulo `resource` só existe no Unix (ex: não no Windows)
+        return None
+
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+_chamadas_cache: Counter = Counter()
+_falhas_cache: Counter = Counter()
+_trava_cache = threading.Lock()
+
+
+def contar_cache(nome: str, falha: bool) -> None:
+    """Registra um acesso ao cache `nome` (falha = o valor teve de ser calculado)."""
+    with _trava_cache:
+        _chamadas_cache[nome] += 1
+        if falha:
+            _falhas_cache[nome] += 1
+
+
+def estatisticas_cache() -> dict[str, dict[str, int]]:
+    """Chamadas, acertos e falhas de cada cache registrado com `contar_cache`."""
+    with _trava_cache:
+        return {
+            nome: {
+                'chamadas': chamadas,
+                'acertos': chamadas - _falhas_cache[nome],
+                'falhas': _falhas_cache[nome],
+            }
+            for nome, chamadas in sorted(_chamadas_cache.items())
+        }
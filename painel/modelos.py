@@ -0,0 +1,166 @@
+"""
+Modelos dos gráficos Altair: o spec Vega-Lite de cada gráfico é montado e
+validado uma vez por processo, e cada execução só troca os dados.
+
+`st.altair_chart` monta o gráfico, converte-o em um spec Vega-Lite (com a
+validação do esquema pelo altair) e serializa os dados a cada execução, mesmo
+quando só os números mudaram. Aqui, a primeira chamada de cada função de
+`painel.graficos` com um tipo de tabela (nomes e dtypes das colunas) guarda
+o spec com os dados substituídos por um dataset nomeado. Nas seguintes, o
+spec guardado é reaproveitado com a tabela nova nesse dataset e enviado com
+`st.vega_lite_chart`. Como o nome do dataset não muda, o spec enviado também
+não muda entre as execuções, e o navegador só atualiza os dados do gráfico.
+
+Para medir o tempo de gráficos e serialização por execução, com e sem os
+modelos (no `data/` de `PAINEL_RAIZ_DADOS`):
+
+    $ python -m painel.modelos --repeticoes 10
+"""
+
+import argparse
+import os
+import threading
+from contextlib import nullcontext
+from typing import Callable
+
+import pandas as pd
+
+from painel.medicao import contar_cache
+
+# o tema e o transformador de dados do altair são globais: a montagem dos
+# modelos não pode se misturar com outra, em outra sessão
+_trava = threading.Lock()
+
+
+def _nomear(data, dados: pd.DataFrame, nome: str) -> dict:
+    """Transformador de dados do altair que troca a tabela por um dataset nomeado."""
+    if data is not dados:
+        raise ValueError(f"o gráfico {nome!r} usa dados que não vêm da tabela recebida.")
+    return {'name': nome}
+
+
+class ModelosGraficos:
+    """
+    Specs Vega-Lite já montados e validados, um por (função, tipo de tabela).
+
+    O registro é compartilhado pelas sessões; os specs guardados não são
+    alterados, cada `spec` devolve uma cópia rasa com os dados da execução.
+    """
+
+    def __init__(self):
+        self._modelos: dict[tuple, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._modelos)
+
+    @staticmethod
+    def _chave(funcao: Callable, dados: pd.DataFrame) -> tuple:
+        # dtypes categóricos incluem as categorias, que o altair usa na ordem dos eixos
+        return funcao.__module__, funcao.__qualname__, tuple(dados.dtypes.items())
+
+    @staticmethod
+    def montar(funcao: Callable, dados: pd.DataFrame) -> dict:
+        """
+        Monta o spec de `funcao(dados)` como o Streamlit o monta (sem tema do
+        altair), com os dados no dataset nomeado pela função.
+        """
+
+        import altair as alt
+
+        nome = funcao.__name__
+        with _trava:
+            alt.data_transformers.register('painel_modelo', _nomear)
+            tema = alt.theme.enable('none') if alt.theme.active == 'default' else nullcontext()
+            with tema, alt.data_transformers.enable('painel_modelo', dados=dados, nome=nome):
+                spec = funcao(dados).to_dict()
+        spec.pop('datasets', None)
+        return spec
+
+    def spec(self, funcao: Callable, dados: pd.DataFrame) -> dict:
+        """
+        Spec de `funcao(dados)` para `st.vega_lite_chart`, a partir do modelo.
+
+        Parâmetros:
+        - funcao: Função de `painel.graficos` (tabela -> gráfico Altair).
+        - dados: Tabela da execução.
+
+        Retorna:
+        - Spec do modelo com `dados` em `datasets`.
+        """
+
+        chave = self._chave(funcao, dados)
+        modelo = self._modelos.get(chave)
+        contar_cache('modelos', falha=modelo is None)
+        if modelo is None:
+            # duas sessões podem montar o mesmo modelo; fica o primeiro guardado
+            modelo = self._modelos.setdefault(chave, self.montar(funcao, dados))
+        return {**modelo, 'datasets': {funcao.__name__: dados}}
+
+
+def medir(repeticoes: int) -> pd.DataFrame:
+    """
+    Executa o app (AppTest) em cada aba, sem e com os modelos, e soma o tempo
+    das etapas de gráficos e serialização de cada execução.
+
+    Retorna:
+    - DataFrame com a mediana (ms) por aba, das execuções depois da primeira
+      de cada aba, e a primeira execução com os modelos (quando são montados).
+    """
+
+    from streamlit.testing.v1 import AppTest
+
+    from painel import config
+    from painel.abas import NOMES_ABAS
+    from painel.benchmark import APP
+
+    # as etapas só são medidas com a medição ligada (ver `painel.instrumentacao`)
+    config.MEDIR = True
+    registros = []
+    for usar_modelos in (False, True):
+        config.MODELOS_GRAFICOS = usar_modelos
+        at = AppTest.from_file(str(APP), default_timeout=600)
+        for indice, aba in enumerate(NOMES_ABAS):
+            if indice:
+                at.radio(key='aba').set_value(aba)
+            for repeticao in range(repeticoes + 1):
+                at.run()
+                if at.exception:
+                    raise RuntimeError(f'{aba}: {at.exception[0].value}')
+                etapas = at.session_state['_medicao']['etapas']
+                registros.append({
+                    'aba': aba,
+                    'modelos': usar_modelos,
+                    'primeira': repeticao == 0,
+                    'ms': (etapas.get('graficos', 0.0) + etapas.get('serializacao', 0.0)) * 1000,
+                })
+
+    df = pd.DataFrame(registros)
+    seguintes = df[~df['primeira']].pivot_table(index='aba', columns='modelos', values='ms', aggfunc='median')
+    resumo = pd.DataFrame({
+        'sem_modelos': seguintes[False],
+        'com_modelos': seguintes[True],
+        'primeira_com_modelos': df[df['primeira'] & df['modelos']].set_index('aba')['ms'],
+    }).reindex(NOMES_ABAS)
+    resumo['economia'] = resumo['sem_modelos'] - resumo['com_modelos']
+    return resumo.round(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Mede o tempo de gráficos e serialização por execução, sem e com os modelos dos gráficos."
+    )
+    parser.add_argument('--repeticoes', type=int, default=10, help="execuções medidas de cada aba")
+    args = parser.parse_args()
+
+    # sem tarefas em segundo plano concorrendo com as execuções medidas
+    os.environ.setdefault('PAINEL_AQUECER', '0')
+    os.environ.setdefault('PAINEL_PRECARREGAR', '0')
+
+    resumo = medir(args.repeticoes)
+    with pd.option_context('display.width', 200):
+        print(resumo)
+    print(f"economia por execução (mediana, ms): {resumo['economia'].median():.1f}")
+
+
+if __name__ == '__main__':
+    main()
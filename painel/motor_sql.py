@@ -0,0 +1,290 @@
+"""
+Motor SQL (DuckDB) para filtrar e agregar as tabelas direto dos arquivos.
+
+No modo padrão (`PAINEL_MOTOR=pandas`), o app mantém as tabelas inteiras em
+memória e as filtra e agrega com o pandas. Com `PAINEL_MOTOR=duckdb`, as
+tabelas derivadas de cada aba são calculadas por consultas ao DuckDB sobre os
+arquivos de `data/` (Parquet, se houver, ou CSV): os filtros da barra lateral
+viram um `WHERE` (empurrado para a leitura do Parquet) e cada tabela de
+frequência, um `GROUP BY`. Só os resultados, e os cubos já filtrados das
+abas Concluintes e Vagas, chegam ao pandas.
+
+O resultado é o mesmo de `painel.derivados.calcular_derivados`: mesmas
+tabelas, colunas, tipos e ordem das linhas.
+"""
+
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+
+from painel.armazenamento import caminho_colunar, esquema
+from painel.cubos import COLUNA_QTD, CUBOS, caminho_cubo, formatar_frequencias
+from painel.derivados import adicionar_percentual
+from painel.particoes import arquivos_particoes
+from painel.tabelas import ARQUIVOS_TABELAS, CAMINHOS_TABELAS, CUBOS_TABELAS
+
+_TIPOS_SQL = {'category': 'VARCHAR', 'int64': 'BIGINT', 'float64': 'DOUBLE'}
+
+# aba -> [(tabela derivada, tabela de `data/`, coluna, nome da coluna de
+# categorias)], como em `painel.derivados`; a coluna de valores é 'Frequência'
+FREQUENCIAS = {
+    'Docentes': [
+        ('frequencia_df_faixa_etaria', 'df_faixa_etaria', 'FAIXA_ETARIA', 'Faixa Etária'),
+        ('frequencia_df_cor_raca', 'df_docentes', 'COR_RACA', 'Cor_Raca'),
+        ('frequencia_df_sexo', 'df_docentes', 'SEXO', 'Sexo'),
+        ('frequencia_df_escol', 'df_docentes', 'ESCOLARIDADE', 'Escolaridade'),
+    ],
+    'Formados': [],
+    'Redes': [
+        ('frequencia_df_tprede', 'df_tprede', 'TP_REDE', 'Tipo de rede'),
+        ('frequencia_df_acesso_internet', 'df_acesso_internet', 'IN_SERVICO_INTERNET', 'Acesso a Internet'),
+        ('frequencia_df_repositorio', 'df_repositorio_inst', 'IN_REPOSITORIO_INSTITUCIONAL', 'Repositório Acadêmico'),
+    ],
+    'Concluintes': [
+        ('frequencia_df_concluintes', 'df_concluintes', 'CURSO', 'Curso'),
+        ('frequencia_df_raca_conc', 'df_concluintes', 'RAÇA', 'Raça'),
+    ],
+    'Vagas': [
+        ('frequencia_df_turnos', 'df_turnos', 'TURNO', 'Turno'),
+        ('frequencia_df_turno_cursos', 'df_turnos', 'CURSO', 'Curso'),
+    ],
+}
+
+
+def _texto(valor) -> str:
+    """Literal de texto SQL."""
+    return "'" + str(valor).replace("'", "''") + "'"
+
+
+def _nome(coluna: str) -> str:
+    """Identificador SQL entre aspas (as colunas têm acentos, ex: RAÇA)."""
+    return '"' + coluna.replace('"', '""') + '"'
+
+
+class MotorDuckDB:
+    """
+    Consultas às tabelas de `raiz/data/` pelo DuckDB, em processo.
+
+    As tabelas são identificadas pelos nomes de `painel.tabelas` (ex:
+    'df_docentes'). Cada chamada usa um cursor próprio, então o motor pode
+    ser compartilhado entre as sessões.
+
+    Com `ano`, lê as partições daquele ano (`painel.particoes`): só os
+    arquivos das UFs filtradas entram em cada consulta.
+    """
+
+    def __init__(self, raiz: Path, ano: int | None = None):
+        self.raiz = raiz
+        self.ano = ano
+        self._conexao = duckdb.connect()
+        self._fontes: dict[str, str] = {}
+        self._colunas: dict[str, list[str]] = {}
+
+    def fechar(self) -> None:
+        """Fecha a conexão; as consultas de outras threads precisam ter terminado."""
+        self._conexao.close()
+
+    def _arquivo(self, caminho: Path | str) -> str:
+        """Expressão FROM que lê um arquivo de `data/` com o esquema de `painel.armazenamento`."""
+        colunar = self.raiz / caminho_colunar(caminho)
+        if colunar.exists():
+            return f'read_parquet({_texto(colunar)})'
+
+        colunas = pd.read_csv(self.raiz / caminho, nrows=0).columns
+        tipos = ', '.join(
+            f'{_texto(coluna)}: {_texto(_TIPOS_SQL[tipo])}' for coluna, tipo in esquema(list(colunas)).items()
+        )
+        return f'read_csv({_texto(self.raiz / caminho)}, header = true, types = {{{tipos}}})'
+
+    def _fonte(self, nome: str, ufs: list[str] | None = None) -> str:
+        """
+        Expressão FROM da tabela `nome` (guardada: o formato dos arquivos é lido
+        uma vez). Nas partições de um ano, só as das `ufs` (None ou vazio = todas).
+        """
+        if self.ano is not None and ufs:
+            return self._particoes(nome, ufs)
+        if nome not in self._fontes:
+            self._fontes[nome] = self._montar_fonte(nome)
+        return self._fontes[nome]
+
+    def _particoes(self, nome: str, ufs: list[str] | None = None) -> str:
+        """Expressão FROM que lê só as partições das `ufs` da tabela `nome` em `self.ano`."""
+        arquivos = arquivos_particoes(CAMINHOS_TABELAS[nome], self.ano, ufs, self.raiz)
+        if not arquivos:
+            # nenhuma UF filtrada tem a tabela: as colunas vêm de todas as partições
+            return f'(SELECT * FROM {self._particoes(nome)} WHERE false)'
+        lista = ', '.join(_texto(arquivo) for arquivo in arquivos)
+        return f'read_parquet([{lista}], union_by_name = true)'
+
+    def _montar_fonte(self, nome: str) -> str:
+        """Expressão FROM da tabela `nome`; um cubo ainda não gerado é agregado da origem."""
+        if self.ano is not None:
+            return self._particoes(nome)
+        if nome in ARQUIVOS_TABELAS:
+            return self._arquivo(ARQUIVOS_TABELAS[nome])
+
+        cubo = CUBOS_TABELAS[nome]
+        caminho = caminho_cubo(cubo)
+        if (self.raiz / caminho).exists() or (self.raiz / caminho_colunar(caminho)).exists():
+            return self._arquivo(caminho)
+
+        origem, dimensoes = CUBOS[cubo]
+        fonte = self._arquivo(origem)
+        existentes = self._conexao.cursor().execute(f'DESCRIBE SELECT * FROM {fonte}').fetchall()
+        dimensoes = ', '.join(_nome(coluna) for coluna in dimensoes if coluna in {linha[0] for linha in existentes})
+        return f'(SELECT {dimensoes}, COUNT(*) AS {COLUNA_QTD} FROM {fonte} GROUP BY ALL)'
+
+    def colunas(self, nome: str) -> list[str]:
+        if nome not in self._colunas:
+            descricao = self._conexao.cursor().execute(f'DESCRIBE SELECT * FROM {self._fonte(nome)}').fetchall()
+            self._colunas[nome] = [linha[0] for linha in descricao]
+        return self._colunas[nome]
+
+    def _filtro(self, nome: str, ufs: list[str], ies: list[str]) -> tuple[str, list]:
+        """Cláusula WHERE dos filtros gerais sobre `nome`, como em `painel.tabelas.filtrar`."""
+        if nome == 'df_docentes':
+            if not (ufs or ies):
+                return '', []
+            onde, parametros = self._filtro('df_dim_ies', ufs, ies)
+            return f'WHERE "ID_IES" IN (SELECT "ID_IES" FROM {self._fonte("df_dim_ies", ufs)} {onde})', parametros
+
+        condicoes, parametros = [], []
+        for coluna, valores in (('UF', ufs), ('NO_IES', ies)):
+            if valores and coluna in self.colunas(nome):
+                condicoes.append(f'{_nome(coluna)} IN ({", ".join("?" * len(valores))})')
+                parametros += [str(valor) for valor in valores]
+        return ('WHERE ' + ' AND '.join(condicoes) if condicoes else ''), parametros
+
+    def _relacao(self, cursor, nome: str, ufs: list[str], ies: list[str], filtrados: dict) -> tuple[str, list]:
+        """Subconsulta com a tabela `nome` filtrada (ou a tabela já filtrada em `filtrados`)."""
+        if nome in filtrados:
+            df = filtrados[nome]
+            # o DuckDB lê categorias como ENUM, que não pode ser vazio
+            vazias = {
+                coluna: object for coluna, tipo in df.dtypes.items()
+                if isinstance(tipo, pd.CategoricalDtype) and len(tipo.categories) == 0
+            }
+            cursor.register(nome, df.astype(vazias) if vazias else df)
+            return _nome(nome), []
+        onde, parametros = self._filtro(nome, ufs, ies)
+        return f'(SELECT * FROM {self._fonte(nome, ufs)} {onde})', parametros
+
+    def tabela(self, nome: str, ufs: list[str], ies: list[str]) -> pd.DataFrame:
+        """Tabela `nome` com os filtros gerais aplicados, com as colunas de texto como `category`."""
+        onde, parametros = self._filtro(nome, ufs, ies)
+        df = self._conexao.cursor().execute(f'SELECT * FROM {self._fonte(nome, ufs)} {onde}', parametros).df()
+        return df.astype(esquema(list(df.columns)))
+
+    def contar(self, nome: str, ufs: list[str], ies: list[str]) -> int:
+        """Linhas da tabela `nome` com os filtros gerais aplicados."""
+        onde, parametros = self._filtro(nome, ufs, ies)
+        consulta = f'SELECT COUNT(*) FROM {self._fonte(nome, ufs)} {onde}'
+        return self._conexao.cursor().execute(consulta, parametros).fetchone()[0]
+
+    def ies_com_mais_docentes(self, quantidade: int) -> list[str]:
+        """Como `painel.aquecimento.ies_com_mais_docentes`."""
+        if quantidade <= 0:
+            return []
+        consulta = f'''
+            SELECT ies."NO_IES", SUM(docentes.{COLUNA_QTD}) AS total
+            FROM {self._fonte('df_dim_ies')} AS ies JOIN {self._fonte('df_docentes')} AS docentes USING ("ID_IES")
+            GROUP BY 1 ORDER BY total DESC, 1 LIMIT {int(quantidade)}
+        '''
+        return [linha[0] for linha in self._conexao.cursor().execute(consulta).fetchall()]
+
+    def _frequencia(self, cursor, relacao: tuple[str, list], coluna: str, nome_coluna: str, soma: bool) -> pd.DataFrame:
+        """Equivalente SQL de `pegar_frequencias` (contagem) e `pegar_frequencias_cubo` (soma de QTD)."""
+        tabela, parametros = relacao
+        valor = f'CAST(SUM({COLUNA_QTD}) AS BIGINT)' if soma else 'COUNT(*)'
+        consulta = f'''
+            SELECT {_nome(coluna)} AS {_nome(nome_coluna)}, {valor} AS "Frequência"
+            FROM {tabela} WHERE {_nome(coluna)} IS NOT NULL
+            GROUP BY 1 HAVING {valor} > 0 ORDER BY 1
+        '''
+        df = cursor.execute(consulta, parametros).df()
+        return df.astype({nome_coluna: object})
+
+    def _contar_por(self, cursor, relacao: tuple[str, list], colunas: list[str], uf_da_ies: bool = False) -> pd.DataFrame:
+        """
+        Equivalente SQL de `painel.cruzamentos.Cruzamento.contar` (soma de QTD
+        por `colunas`, na coluna 'quantidade'). Com `uf_da_ies`, a UF vem de
+        `dim_ies`, pelo ID_IES (cubo de docentes).
+        """
+        tabela, parametros = relacao
+        if uf_da_ies:
+            tabela = f'(SELECT cubo.*, ies."UF" FROM {tabela} AS cubo JOIN {self._fonte("df_dim_ies")} AS ies USING ("ID_IES"))'
+        selecao = ', '.join(_nome(coluna) for coluna in colunas)
+        posicoes = ', '.join(str(posicao) for posicao in range(1, len(colunas) + 1))
+        consulta = f'''
+            SELECT {selecao}, CAST(SUM({COLUNA_QTD}) AS BIGINT) AS quantidade
+            FROM {tabela} WHERE {' AND '.join(f'{_nome(coluna)} IS NOT NULL' for coluna in colunas)}
+            GROUP BY {posicoes} HAVING SUM({COLUNA_QTD}) > 0 ORDER BY {posicoes}
+        '''
+        return cursor.execute(consulta, parametros).df().astype({coluna: object for coluna in colunas})
+
+    def _acesso_rede(self, cursor, internet: tuple[str, list], rede: tuple[str, list]) -> pd.DataFrame:
+        """Equivalente SQL de `painel.derivados.contar_acesso_rede`."""
+        consulta = f'''
+            SELECT internet."IN_SERVICO_INTERNET", rede."TP_REDE", internet."UF", COUNT(*) AS {COLUNA_QTD}
+            FROM {internet[0]} AS internet JOIN {rede[0]} AS rede
+                ON internet."NO_IES" = rede."NO_IES" AND internet."UF" = rede."UF"
+            WHERE internet."IN_SERVICO_INTERNET" IS NOT NULL AND rede."TP_REDE" IS NOT NULL AND internet."UF" IS NOT NULL
+            GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+        '''
+        df = cursor.execute(consulta, internet[1] + rede[1]).df()
+        return df.astype({'IN_SERVICO_INTERNET': object, 'TP_REDE': object, 'UF': object})
+
+    def derivados(
+        self,
+        aba: str,
+        ufs: list[str],
+        ies: list[str],
+        filtrados: dict[str, pd.DataFrame] | None = None
+    ) -> dict[str, pd.DataFrame]:
+        """
+        Tabelas derivadas de `aba`, como `painel.derivados.calcular_derivados`.
+
+        Parâmetros:
+        - aba: Nome da aba.
+        - ufs, ies: Filtros gerais (vazio = todas).
+        - filtrados: Tabelas já filtradas (ex: o cubo de concluintes depois dos
+          filtros do fragmento), usadas no lugar da leitura dos arquivos.
+
+        Retorna:
+        - Dicionário com os DataFrames da aba (ex: 'frequencia_df_sexo').
+        """
+
+        filtrados = filtrados or {}
+        cursor = self._conexao.cursor()
+        relacoes = {}
+
+        def relacao(nome: str) -> tuple[str, list]:
+            if nome not in relacoes:
+                relacoes[nome] = self._relacao(cursor, nome, ufs, ies, filtrados)
+            return relacoes[nome]
+
+        derivados = {}
+        for derivada, nome, coluna, nome_coluna in FREQUENCIAS[aba]:
+            # totais por curso já somados pelo fragmento (ver `painel.derivados.frequencias_por_curso`)
+            totais = filtrados.get(f'{nome}_por_curso') if coluna == 'CURSO' else None
+            if totais is not None:
+                derivados[derivada] = formatar_frequencias(totais, nome_coluna, 'Frequência')[1]
+            else:
+                derivados[derivada] = self._frequencia(
+                    cursor, relacao(nome), coluna, nome_coluna, soma=nome in CUBOS_TABELAS
+                )
+        if aba == 'Docentes':
+            adicionar_percentual(derivados['frequencia_df_sexo'])
+        elif aba == 'Formados':
+            derivados['df_agg'] = self._contar_por(cursor, relacao('df_docentes'), ['ESCOLARIDADE', 'COR_RACA'])
+            derivados['df_escol_uf'] = self._contar_por(
+                cursor, relacao('df_docentes'), ['ESCOLARIDADE', 'UF'], uf_da_ies=True
+            )
+        elif aba == 'Concluintes':
+            derivados['df_raca_uf'] = self._contar_por(cursor, relacao('df_concluintes'), ['UF', 'RAÇA'])
+        elif aba == 'Redes':
+            derivados['df_acesso_rede'] = self._acesso_rede(
+                cursor, relacao('df_acesso_internet'), relacao('df_tprede')
+            )
+        return derivados
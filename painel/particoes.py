@@ -0,0 +1,306 @@
+"""
+Dados de vários anos do Censo, particionados por ano e UF.
+
+Cada ano é uma cópia das tabelas do app (as de `data/` e os cubos), dividida
+em uma partição por UF, em Parquet:
+
+    data/anos/2019/DF/dim_ies.parquet
+    data/anos/2019/DF/cubos/concluintes.parquet
+    data/anos/2019/DF/resumo.parquet       totais por IES, para as tendências
+    data/anos/2019/manifesto.json          hash de cada partição
+
+O app lê só as partições do ano escolhido, e o motor SQL lê só as UFs
+filtradas (`arquivos_particoes`). Os gráficos de tendência entre anos usam
+os resumos de cada partição (algumas linhas por IES), sem juntar as tabelas
+de todos os anos.
+
+Para particionar um ano a partir de uma pasta com `data/` (o próprio
+repositório ou a saída de `python -m painel.etl` para aquele ano):
+
+    $ python -m painel.particoes --ano 2019
+    $ python -m painel.particoes --ano 2020 --origem /tmp/censo2020
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+from painel.armazenamento import PASTA_DADOS, esquema, ler_tabela
+from painel.cubos import COLUNA_QTD, PASTA_CUBOS, carregar_cubo
+from painel.docentes import ARQUIVO_DIM_IES
+
+RAIZ = Path(__file__).resolve().parent.parent
+PASTA_ANOS = Path('data/anos')
+ARQUIVO_RESUMO = 'resumo.parquet'
+
+# indicador das tendências -> cubo somado por IES
+INDICADORES = {
+    'Docentes': 'docentes',
+    'Concluintes': 'concluintes',
+    'Vagas (ofertas)': 'turnos',
+}
+
+
+def anos_disponiveis(raiz: Path = RAIZ) -> list[int]:
+    """Anos já particionados em `data/anos/`, em ordem."""
+    pasta = raiz / PASTA_ANOS
+    if not pasta.exists():
+        return []
+    return sorted(
+        int(ano.name) for ano in pasta.iterdir()
+        if ano.name.isdigit() and (ano / 'manifesto.json').exists()
+    )
+
+
+def manifesto_ano(ano: int, raiz: Path = RAIZ) -> dict:
+    """Manifesto das partições de `ano` (ver `particionar`)."""
+    caminho = raiz / PASTA_ANOS / str(ano) / 'manifesto.json'
+    return _manifesto(caminho, caminho.stat().st_mtime_ns)
+
+
+def ufs_do_ano(ano: int, raiz: Path = RAIZ) -> list[str]:
+    """UFs com partição no ano `ano`, pelo manifesto do ano."""
+    return sorted({uf for hashes in manifesto_ano(ano, raiz)['tabelas'].values() for uf in hashes})
+
+
+def _relativo(caminho: Path | str) -> Path:
+    """Caminho de uma tabela dentro da partição (ex: `data/cubos/x.csv` -> `cubos/x.parquet`)."""
+    return Path(caminho).relative_to(PASTA_DADOS).with_suffix('.parquet')
+
+
+def arquivos_particoes(
+    caminho: Path | str,
+    ano: int,
+    ufs: list[str] | None = None,
+    raiz: Path = RAIZ
+) -> list[Path]:
+    """
+    Arquivos da tabela `caminho` (como em `data/`, ex: 'data/dim_ies.csv')
+    nas partições de `ano`, só das `ufs` (None ou vazio = todas) que a tabela
+    tem no manifesto do ano.
+    """
+
+    pasta = raiz / PASTA_ANOS / str(ano)
+    hashes = manifesto_ano(ano, raiz)['tabelas'].get(str(caminho), {})
+    return [pasta / uf / _relativo(caminho) for uf in (ufs or sorted(hashes)) if uf in hashes]
+
+
+def ler_particoes(
+    caminho: Path | str,
+    ano: int,
+    ufs: list[str] | None = None,
+    raiz: Path = RAIZ
+) -> pd.DataFrame:
+    """
+    Lê a tabela `caminho` de `ano`, juntando só as partições das `ufs`.
+
+    Retorna:
+    - DataFrame com o esquema de `painel.armazenamento` (as categorias das
+      partições são unificadas).
+    """
+
+    partes = [pd.read_parquet(arquivo, memory_map=True) for arquivo in arquivos_particoes(caminho, ano, ufs, raiz)]
+    if not partes:
+        raise FileNotFoundError(f'{caminho} não tem partições em {raiz / PASTA_ANOS / str(ano)}')
+    df = pd.concat(partes, ignore_index=True)
+    return df.astype(esquema(list(df.columns)))
+
+
+def _hash(caminho: Path) -> str:
+    with open(caminho, 'rb') as arquivo:
+        return hashlib.sha256(arquivo.read()).hexdigest()
+
+
+@lru_cache(maxsize=64)
+def _manifesto(caminho: Path, modificado: int) -> dict[str, str]:
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def versoes_ano(ano: int, raiz: Path = RAIZ) -> dict[str, str]:
+    """
+    Versão de cada tabela de `ano` (pelo caminho em `data/`): o hash dos
+    hashes das suas partições, lidos do manifesto do ano.
+    """
+
+    return {
+        tabela: hashlib.sha256(''.join(hashes[uf] for uf in sorted(hashes)).encode()).hexdigest()
+        for tabela, hashes in manifesto_ano(ano, raiz)['tabelas'].items()
+    }
+
+
+def _uf_das_linhas(df: pd.DataFrame, uf_por_id: pd.Series) -> pd.Series:
+    """UF de cada linha: pela coluna UF (ou `estado`) ou, sem ela, pelo ID_IES."""
+    if 'UF' in df.columns:
+        return df['UF'].astype(object)
+    if 'estado' in df.columns:
+        return df['estado'].astype(object)
+    return df['ID_IES'].map(uf_por_id)
+
+
+def resumo_por_ies(tabelas: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Totais de cada indicador (`INDICADORES`, mais o número de IES) por IES
+    de uma partição.
+
+    Parâmetros:
+    - tabelas: Partição já separada, com 'dim_ies' e os cubos de `INDICADORES`.
+
+    Retorna:
+    - DataFrame com NO_IES, INDICADOR e QTD.
+    """
+
+    dim_ies = tabelas['dim_ies']
+    partes = [dim_ies.groupby('NO_IES', observed=True).size().reset_index(name=COLUNA_QTD).assign(INDICADOR='IES')]
+    for indicador, cubo in INDICADORES.items():
+        df = tabelas.get(cubo)
+        if df is None:
+            continue
+        if 'NO_IES' not in df.columns:
+            df = df.merge(dim_ies[['ID_IES', 'NO_IES']], on='ID_IES')
+        totais = df.groupby('NO_IES', observed=True)[COLUNA_QTD].sum().reset_index()
+        partes.append(totais.assign(INDICADOR=indicador))
+    resumo = pd.concat(partes, ignore_index=True)[['NO_IES', 'INDICADOR', COLUNA_QTD]]
+    return resumo.astype({'NO_IES': str, 'INDICADOR': str})
+
+
+def particionar(caminhos: list[str], ano: int, origem: Path = RAIZ, raiz: Path = RAIZ) -> dict[str, int]:
+    """
+    Grava as tabelas `caminhos` de `origem/data/` como as partições de `ano`.
+
+    Parâmetros:
+    - caminhos: Tabelas a particionar, como em `data/` (ex: 'data/dim_ies.csv'
+      ou 'data/cubos/docentes.csv'). Os cubos que ainda não foram gerados são
+      agregados da origem.
+    - ano: Ano do Censo.
+    - origem: Pasta que contém o `data/` do ano.
+    - raiz: Pasta onde `data/anos/` é gravado.
+
+    Linhas sem UF (nem pela coluna, nem pelo ID_IES em `dim_ies`) ficam de fora.
+    Partições de uma gravação anterior de `ano` que esta não regravou (ex: uma
+    UF que saiu da origem) são apagadas depois do novo manifesto.
+
+    Retorna:
+    - Número de linhas gravadas de cada tabela.
+    """
+
+    pasta = raiz / PASTA_ANOS / str(ano)
+    dim_ies = ler_tabela(ARQUIVO_DIM_IES, origem)
+    uf_por_id = dim_ies.drop_duplicates('ID_IES').set_index('ID_IES')['UF'].astype(object)
+
+    tabelas = {}
+    for caminho in caminhos:
+        if Path(caminho).parent == PASTA_CUBOS:
+            tabelas[caminho] = carregar_cubo(Path(caminho).stem, origem)
+        else:
+            tabelas[caminho] = ler_tabela(caminho, origem)
+
+    manifesto = {'ano': ano, 'tabelas': {caminho: {} for caminho in caminhos}}
+    resumos = {}
+    linhas = {}
+    gravados = set()
+    for caminho, df in tabelas.items():
+        ufs = _uf_das_linhas(df, uf_por_id)
+        for uf, parte in df.groupby(ufs, sort=True):
+            destino = pasta / uf / _relativo(caminho)
+            destino.parent.mkdir(parents=True, exist_ok=True)
+            parte.reset_index(drop=True).to_parquet(destino, index=False)
+            gravados.add(destino)
+            manifesto['tabelas'][caminho][uf] = _hash(destino)
+            resumos.setdefault(uf, {})[Path(caminho).stem] = parte
+        linhas[caminho] = len(df)
+
+    for uf, partes in resumos.items():
+        if 'dim_ies' in partes:
+            resumo_por_ies(partes).to_parquet(pasta / uf / ARQUIVO_RESUMO, index=False)
+            gravados.add(pasta / uf / ARQUIVO_RESUMO)
+
+    temporario = pasta / 'manifesto.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False, indent=2, sort_keys=True)
+        arquivo.write('\n')
+    # o manifesto é gravado por último: o ano só aparece no app com as partições completas
+    os.replace(temporario, pasta / 'manifesto.json')
+    _apagar_antigas(pasta, gravados)
+    return linhas
+
+
+def _apagar_antigas(pasta: Path, gravados: set[Path]) -> None:
+    """Apaga as pastas de UF e os arquivos de `pasta` que não estão em `gravados`."""
+    ufs = {arquivo.relative_to(pasta).parts[0] for arquivo in gravados}
+    for uf in pasta.iterdir():
+        if not uf.is_dir():
+            continue
+        if uf.name not in ufs:
+            shutil.rmtree(uf)
+            continue
+        for arquivo in uf.rglob('*'):
+            if arquivo.is_file() and arquivo not in gravados:
+                arquivo.unlink()
+
+
+def versao_tendencias(raiz: Path = RAIZ) -> str:
+    """Versão dos resumos de todos os anos (muda quando algum ano é regravado)."""
+    versoes = [json.dumps(versoes_ano(ano, raiz), sort_keys=True) for ano in anos_disponiveis(raiz)]
+    return hashlib.sha256('\n'.join(versoes).encode()).hexdigest()
+
+
+def tendencias(ufs: list[str], ies: list[str], raiz: Path = RAIZ) -> pd.DataFrame:
+    """
+    Totais de cada indicador por ano, a partir dos resumos das partições.
+
+    Parâmetros:
+    - ufs: UFs escolhidas (vazio = todas); só as partições dessas UFs são lidas.
+    - ies: IES escolhidas (vazio = todas).
+
+    Retorna:
+    - DataFrame com ANO, INDICADOR e QTD, uma linha por (ano, indicador).
+    """
+
+    partes = []
+    for ano in anos_disponiveis(raiz):
+        pasta = raiz / PASTA_ANOS / str(ano)
+        todas = ufs_do_ano(ano, raiz)
+        for uf in (ufs or todas):
+            if uf not in todas:
+                continue
+            arquivo = pasta / uf / ARQUIVO_RESUMO
+            if arquivo.exists():
+                partes.append(pd.read_parquet(arquivo).assign(ANO=ano))
+    if not partes:
+        return pd.DataFrame({'ANO': pd.Series(dtype='int64'), 'INDICADOR': pd.Series(dtype=object),
+                             COLUNA_QTD: pd.Series(dtype='int64')})
+
+    resumo = pd.concat(partes, ignore_index=True)
+    if ies:
+        resumo = resumo[resumo['NO_IES'].isin(ies)]
+    return (
+        resumo.groupby(['ANO', 'INDICADOR'], sort=True)[COLUNA_QTD]
+        .sum()
+        .reset_index()
+        .astype({'INDICADOR': object})
+    )
+
+
+def main() -> None:
+    from painel.tabelas import CAMINHOS_TABELAS
+
+    parser = argparse.ArgumentParser(description="Grava as tabelas de um ano do Censo particionadas por UF.")
+    parser.add_argument('--ano', type=int, required=True, help="ano do Censo")
+    parser.add_argument('--origem', default=str(RAIZ), help="pasta que contém o data/ do ano (padrão: o repositório)")
+    args = parser.parse_args()
+
+    linhas = particionar(list(CAMINHOS_TABELAS.values()), args.ano, Path(args.origem))
+    for caminho, total in linhas.items():
+        print(f'{caminho}: {total} linhas')
+    print(f'{args.ano}: {len(ufs_do_ano(args.ano))} UFs em {PASTA_ANOS / str(args.ano)}')
+
+
+if __name__ == '__main__':
+    main()
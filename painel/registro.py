@@ -0,0 +1,190 @@
+"""
+Registro das tabelas do app, compartilhado por todas as sessões do processo.
+
+`st.cache_data` guarda cada tabela serializada e devolve uma cópia nova a
+cada chamada, em cada sessão. O registro (guardado com `st.cache_resource`)
+lê cada tabela uma única vez por processo, monta o seu `IndiceInvertido` e
+entrega o mesmo objeto a todas as sessões.
+
+As tabelas são somente leitura. Com o Copy-on-Write do pandas, os filtros
+(`IndiceInvertido.tabela`) devolvem fatias que não copiam dados e uma
+escrita acidental em uma fatia copia os dados em vez de alterar a tabela
+compartilhada. Assim, a memória de cada sessão se resume ao estado dos
+filtros e às tabelas agregadas.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from painel.armazenamento import ler_tabela
+from painel.cruzamentos import Cruzamento
+from painel.cubos import carregar_cubo
+from painel.filtros import IndiceInvertido
+from painel.medicao import contar_cache
+from painel.particoes import ler_particoes
+
+# padrão a partir do pandas 3; no pandas 2 precisa ser ligado
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+_MAX_LEITURAS = min(8, os.cpu_count() or 1)
+_executor_precarga = ThreadPoolExecutor(_MAX_LEITURAS, thread_name_prefix='precarga')
+
+
+class RegistroDados:
+    """
+    Tabelas e cubos de `raiz/data/`, carregados sob demanda e compartilhados.
+
+    Cada tabela é identificada pelo caminho (ou nome do cubo) e pela versão
+    (hash do manifesto, ver `painel.construcao`). Uma versão nova substitui a
+    anterior no registro. Várias tabelas podem ser lidas em paralelo
+    (`carregar`) ou em segundo plano (`precarregar`). O registro também
+    guarda os cruzamentos dos cubos (`painel.cruzamentos`).
+
+    As partições de um ano podem ser lidas só para algumas UFs (um recorte).
+    Cada combinação de UFs é uma entrada própria; só as `max_recortes`
+    usadas mais recentemente ficam no registro.
+    """
+
+    def __init__(self, raiz: Path, max_recortes: int = 8):
+        self.raiz = raiz
+        self.max_recortes = max_recortes
+        self._indices: dict[str, tuple[str | None, IndiceInvertido | Cruzamento]] = {}
+        self._bytes: dict[str, int] = {}
+        self._travas: dict[str, threading.Lock] = {}
+        self._trava = threading.Lock()
+        # (ano, UFs) -> chaves das tabelas e cruzamentos do recorte, do menos ao mais usado
+        self._recortes: OrderedDict[tuple[int, tuple[str, ...]], set[str]] = OrderedDict()
+
+    def _obter(self, chave: str, versao: str | None, montar, tamanho=None):
+        with self._trava:
+            atual = self._indices.get(chave)
+            trava = self._travas.setdefault(chave, threading.Lock())
+        if atual is not None and atual[0] == versao:
+            contar_cache('registro', falha=False)
+            return atual[1]
+
+        # uma trava por tabela: sessões simultâneas esperam a mesma leitura
+        with trava:
+            atual = self._indices.get(chave)
+            if atual is not None and atual[0] == versao:
+                contar_cache('registro', falha=False)
+                return atual[1]
+
+            contar_cache('registro', falha=True)
+            objeto = montar()
+            with self._trava:
+                self._indices[chave] = (versao, objeto)
+                if tamanho is None:
+                    self._bytes[chave] = int(objeto.df.memory_usage(index=True, deep=True).sum())
+                else:
+                    self._bytes[chave] = tamanho(objeto)
+            return objeto
+
+    def tabela(self, caminho: str, versao: str | None = None) -> IndiceInvertido:
+        """Índice da tabela `caminho` (relativo à raiz, ex: 'data/tabela_uf.csv')."""
+        return self._obter(
+            self._chave('tabela', caminho), versao, lambda: IndiceInvertido(ler_tabela(caminho, self.raiz))
+        )
+
+    def cubo(self, nome: str, versao: str | None = None) -> IndiceInvertido:
+        """Índice do cubo `nome` (ver `painel.cubos.CUBOS`)."""
+        return self._obter(
+            self._chave('cubo', nome), versao, lambda: IndiceInvertido(carregar_cubo(nome, self.raiz))
+        )
+
+    def cruzamento(
+        self,
+        nome: str,
+        versao,
+        montar: Callable[[], Cruzamento | None],
+        recorte: tuple[int, tuple[str, ...]] | None = None
+    ) -> Cruzamento | None:
+        """
+        Cruzamento `nome` (ver `painel.tabelas.CRUZAMENTOS`), montado com
+        `montar()` uma vez por versão (None, se `montar` não o montar). Com
+        `recorte` (ano, UFs), o cruzamento é descartado junto com as
+        partições desse recorte.
+        """
+        chave = f'cruzamento:{nome}'
+        cruzamento = self._obter(chave, versao, montar, lambda cruzamento: getattr(cruzamento, 'nbytes', 0))
+        if recorte:
+            self._lembrar_recorte(recorte, chave)
+        return cruzamento
+
+    def particao(self, alvo: tuple[int, str, tuple[str, ...]], versao: str | None = None) -> IndiceInvertido:
+        """
+        Índice da tabela `alvo[1]` (caminho em `data/`) lida das partições do
+        ano `alvo[0]`, só das UFs `alvo[2]` (vazio = todas).
+        """
+        ano, caminho, ufs = alvo
+        chave = self._chave('particao', alvo)
+        indice = self._obter(
+            chave, versao, lambda: IndiceInvertido(ler_particoes(caminho, ano, list(ufs), raiz=self.raiz))
+        )
+        if ufs:
+            self._lembrar_recorte((ano, ufs), chave)
+        return indice
+
+    def _lembrar_recorte(self, recorte: tuple[int, tuple[str, ...]], chave: str) -> None:
+        """Marca `recorte` como usado e descarta os menos usados além de `max_recortes`."""
+        with self._trava:
+            self._recortes.setdefault(recorte, set()).add(chave)
+            self._recortes.move_to_end(recorte)
+            while len(self._recortes) > self.max_recortes:
+                # as sessões que ainda usam um índice descartado continuam com a sua referência
+                _, chaves = self._recortes.popitem(last=False)
+                for antiga in chaves:
+                    self._indices.pop(antiga, None)
+                    self._bytes.pop(antiga, None)
+
+    def _pronto(self, chave: str, versao: str | None) -> bool:
+        atual = self._indices.get(chave)
+        return atual is not None and atual[0] == versao
+
+    def _chave(self, tipo: str, alvo) -> str:
+        if tipo == 'particao':
+            ano, caminho, ufs = alvo
+            return f'{ano}:{caminho}:{",".join(ufs)}' if ufs else f'{ano}:{caminho}'
+        return alvo if tipo == 'tabela' else f'cubo:{alvo}'
+
+    def carregar(self, pedidos: dict[str, tuple[str, str, str | None]]) -> dict[str, IndiceInvertido]:
+        """
+        Índices de várias tabelas, lendo em paralelo as que ainda não estão no registro.
+
+        Parâmetros:
+        - pedidos: {nome: (tipo, alvo, versão)}, com tipo 'tabela' (alvo =
+          caminho), 'cubo' (alvo = nome do cubo) ou 'particao' (alvo = (ano,
+          caminho, UFs)). Pedidos com o mesmo alvo são lidos uma única vez.
+
+        Retorna:
+        - {nome: IndiceInvertido}
+        """
+
+        faltantes = {
+            (tipo, alvo, versao) for tipo, alvo, versao in pedidos.values()
+            if not self._pronto(self._chave(tipo, alvo), versao)
+        }
+        if len(faltantes) > 1:
+            with ThreadPoolExecutor(min(len(faltantes), _MAX_LEITURAS)) as executor:
+                for futuro in [executor.submit(getattr(self, tipo), alvo, versao) for tipo, alvo, versao in faltantes]:
+                    futuro.result()
+
+        return {nome: getattr(self, tipo)(alvo, versao) for nome, (tipo, alvo, versao) in pedidos.items()}
+
+    def precarregar(self, pedidos: dict[str, tuple[str, str, str | None]]) -> None:
+        """Lê em segundo plano as tabelas de `pedidos` que ainda não estão no registro."""
+        for tipo, alvo, versao in set(pedidos.values()):
+            if not self._pronto(self._chave(tipo, alvo), versao):
+                _executor_precarga.submit(getattr(self, tipo), alvo, versao)
+
+    def estatisticas(self) -> dict[str, int]:
+        """Tabelas (e cruzamentos) carregados e memória ocupada por eles (bytes)."""
+        with self._trava:
+            return {'tabelas': len(self._indices), 'bytes': sum(self._bytes.values())}
@@ -0,0 +1,367 @@
+"""
+Teste de carga com várias sessões simultâneas do dashboard.
+
+Sobe o `streamlit_app.py` em um servidor local e abre N sessões pelo mesmo
+websocket que o navegador usa (`/_stcore/stream`, mensagens protobuf
+`BackMsg`/`ForwardMsg`). Cada sessão se comporta como um usuário: troca de
+aba, escolhe UFs e IES na barra lateral e move os sliders das abas
+Concluintes e Vagas (que reexecutam só o fragmento), com pausas aleatórias
+entre as ações.
+
+Para cada número de sessões, informa a latência das execuções (p50, p95,
+p99: do envio da mudança até o fim da execução no servidor), a vazão e a
+memória (RSS) do servidor antes, durante e depois das sessões. Uma memória
+que cresce a cada rodada, mesmo depois de as sessões fecharem, aponta
+estado que fica preso às sessões.
+
+    $ python -m painel.simulacao --sessoes 1 5 10 20 --duracao 30
+    $ python -m painel.simulacao --raiz /tmp/painel-censo --saida simulacao.json
+
+Usa o pacote `websockets` (dependência do Streamlit a partir da versão com
+servidor Starlette; em versões anteriores, instale à parte). A memória é
+lida em `/proc`, então só é informada no Linux.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+APP = RAIZ / 'streamlit_app.py'
+
+# ação -> peso no sorteio de cada passo de um usuário
+ACOES = {
+    'aba': 3,
+    'ufs': 2,
+    'ies': 2,
+    'slider': 3,
+    'limpar': 1,
+}
+
+
+def memoria_mb(pid: int) -> float | None:
+    """RSS do processo `pid` (MB), ou None fora do Linux."""
+    try:
+        with open(f'/proc/{pid}/status', encoding='ascii') as arquivo:
+            for linha in arquivo:
+                if linha.startswith('VmRSS:'):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def _porta_livre() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def iniciar_servidor(porta: int, env: dict[str, str], espera: float = 60) -> subprocess.Popen:
+    """Sobe o app com `streamlit run` e espera o servidor responder."""
+    # em arquivo: um pipe cheio (o servidor registra avisos a cada execução) travaria o servidor
+    log = tempfile.TemporaryFile()
+    processo = subprocess.Popen(
+        [
+            sys.executable, '-m', 'streamlit', 'run', str(APP),
+            '--server.headless', 'true',
+            '--server.port', str(porta),
+            '--browser.gatherUsageStats', 'false',
+        ],
+        cwd=RAIZ, env=env, stdout=subprocess.DEVNULL, stderr=log,
+    )
+
+    limite = time.monotonic() + espera
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            log.seek(0)
+            raise RuntimeError(f'o servidor terminou:\n{log.read().decode()[-2000:]}')
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{porta}/_stcore/health', timeout=1):
+                return processo
+        except OSError:
+            time.sleep(0.2)
+    processo.terminate()
+    raise TimeoutError(f'o servidor não respondeu em {espera:.0f}s')
+
+
+@dataclass
+class Widget:
+    tipo: str
+    id: str
+    opcoes: list = field(default_factory=list)
+    minimo: float = 0
+    maximo: float = 0
+    fragmento: str = ''
+
+
+class Sessao:
+    """
+    Uma sessão do navegador simulada pelo websocket.
+
+    Guarda os widgets desenhados na última execução (pelo rótulo) e o valor
+    que o usuário escolheu em cada um, enviado a cada execução como o
+    navegador faz.
+    """
+
+    def __init__(self, url: str, rng: random.Random):
+        self.url = url
+        self.rng = rng
+        self.widgets: dict[str, Widget] = {}
+        self.valores = {}
+        self.erros = 0
+        self._conexao = None
+
+    async def conectar(self) -> None:
+        import websockets
+
+        self._conexao = await websockets.connect(
+            self.url, subprotocols=['streamlit'], max_size=None, ping_interval=None
+        )
+
+    async def fechar(self) -> None:
+        await self._conexao.close()
+
+    def _registrar(self, delta, vistos: set[str]) -> None:
+        if not delta.HasField('new_element'):
+            return
+        elemento = delta.new_element
+        tipo = elemento.WhichOneof('type')
+        if tipo == 'exception':
+            self.erros += 1
+        elif tipo in ('radio', 'multiselect', 'slider'):
+            widget = getattr(elemento, tipo)
+            self.widgets[widget.label] = Widget(
+                tipo, widget.id,
+                opcoes=list(getattr(widget, 'options', [])),
+                minimo=getattr(widget, 'min', 0),
+                maximo=getattr(widget, 'max', 0),
+                fragmento=delta.fragment_id,
+            )
+            vistos.add(widget.id)
+
+    async def executar(self, fragmento: str = '') -> float:
+        """Pede uma execução com os valores atuais e devolve quanto ela levou (s)."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        mensagem = BackMsg()
+        estado = mensagem.rerun_script
+        estado.fragment_id = fragmento
+        for id_widget, (tipo, valor) in self.valores.items():
+            widget = estado.widget_states.widgets.add()
+            widget.id = id_widget
+            if tipo == 'string_value':
+                widget.string_value = valor
+            else:
+                getattr(widget, tipo).data.extend(valor)
+
+        inicio = time.perf_counter()
+        await self._conexao.send(mensagem.SerializeToString())
+
+        vistos: set[str] = set()
+        while True:
+            resposta = ForwardMsg()
+            resposta.ParseFromString(await self._conexao.recv())
+            tipo = resposta.WhichOneof('type')
+            if tipo == 'delta':
+                self._registrar(resposta.delta, vistos)
+            elif tipo == 'script_finished':
+                if resposta.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue
+                if resposta.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    self.erros += 1
+                break
+        segundos = time.perf_counter() - inicio
+
+        if not fragmento:
+            # widgets que sumiram (ex: sliders de outra aba) não são mais enviados
+            self.widgets = {rotulo: w for rotulo, w in self.widgets.items() if w.id in vistos}
+            self.valores = {id_widget: valor for id_widget, valor in self.valores.items() if id_widget in vistos}
+        return segundos
+
+    def _widget(self, tipo: str, posicao: int = 0) -> Widget | None:
+        widgets = [widget for widget in self.widgets.values() if widget.tipo == tipo]
+        return widgets[posicao] if len(widgets) > posicao else None
+
+    def agir(self) -> tuple[str, str] | None:
+        """
+        Sorteia e aplica uma ação de usuário nos widgets desenhados.
+
+        Retorna:
+        - (ação, fragmento a reexecutar, '' para a página inteira), ou None
+          se a ação sorteada não tem widget na tela.
+        """
+
+        acao = self.rng.choices(list(ACOES), weights=list(ACOES.values()))[0]
+        if acao == 'aba':
+            widget = self._widget('radio')
+            if widget is None:
+                return None
+            self.valores[widget.id] = ('string_value', self.rng.choice(widget.opcoes))
+        elif acao in ('ufs', 'ies'):
+            widget = self._widget('multiselect', 0 if acao == 'ufs' else 1)
+            if widget is None or not widget.opcoes:
+                return None
+            escolhidas = self.rng.sample(widget.opcoes, self.rng.randint(1, min(3, len(widget.opcoes))))
+            self.valores[widget.id] = ('string_array_value', escolhidas)
+        elif acao == 'slider':
+            widget = self._widget('slider')
+            if widget is None or widget.minimo >= widget.maximo:
+                return None
+            minimo = self.rng.randint(int(widget.minimo), int(widget.maximo) - 1)
+            maximo = self.rng.randint(minimo + 1, int(widget.maximo))
+            self.valores[widget.id] = ('double_array_value', [float(minimo), float(maximo)])
+            return acao, widget.fragmento
+        else:
+            for widget in self.widgets.values():
+                if widget.tipo == 'multiselect':
+                    self.valores[widget.id] = ('string_array_value', [])
+        return acao, ''
+
+
+async def _usuario(url: str, semente: int, fim: float, pausa: tuple[float, float], registros: list) -> int:
+    """Uma sessão até o instante `fim`; devolve o número de erros vistos."""
+    sessao = Sessao(url, random.Random(semente))
+    await sessao.conectar()
+    try:
+        registros.append(('inicial', await sessao.executar()))
+        while True:
+            await asyncio.sleep(sessao.rng.uniform(*pausa))
+            if time.monotonic() >= fim:
+                break
+            passo = sessao.agir()
+            if passo is None:
+                continue
+            acao, fragmento = passo
+            registros.append((acao, await sessao.executar(fragmento)))
+    finally:
+        await sessao.fechar()
+    return sessao.erros
+
+
+async def _rodada(url: str, sessoes: int, duracao: float, pausa: tuple[float, float], semente: int) -> tuple[list, int]:
+    registros: list[tuple[str, float]] = []
+    fim = time.monotonic() + duracao
+    erros = await asyncio.gather(*[
+        _usuario(url, semente + numero, fim, pausa, registros) for numero in range(sessoes)
+    ])
+    return registros, sum(erros)
+
+
+def _percentis(segundos: list[float]) -> dict[str, float | None]:
+    if not segundos:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+    p50, p95, p99 = np.percentile(segundos, [50, 95, 99]) * 1000
+    return {'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99}
+
+
+def simular(
+    niveis: list[int],
+    duracao: float,
+    pausa: tuple[float, float],
+    raiz: Path | None = None,
+    espera: float = 5,
+    semente: int = 0
+) -> list[dict]:
+    """
+    Roda as rodadas de sessões simultâneas em um mesmo servidor.
+
+    Parâmetros:
+    - niveis: Número de sessões de cada rodada, em ordem (ex: [1, 5, 10]).
+    - duracao: Duração de cada rodada (s).
+    - pausa: Intervalo (mín., máx.) das pausas entre as ações de um usuário (s).
+    - raiz: Pasta com `data/` (`PAINEL_RAIZ_DADOS`); sem ela, a do repositório.
+    - espera: Tempo (s) depois de fechar as sessões para medir a memória que sobrou.
+    - semente: Semente do sorteio das ações.
+
+    Retorna:
+    - Uma entrada por rodada, com a latência das execuções depois da
+      primeira de cada sessão (p50/p95/p99, ms), a da primeira execução,
+      a mediana por tipo de ação, a vazão (execuções/s), os erros e a memória do servidor (MB) antes,
+      ao fim e `espera` segundos depois da rodada.
+    """
+
+    env = dict(os.environ)
+    if raiz is not None:
+        env['PAINEL_RAIZ_DADOS'] = str(raiz)
+    porta = _porta_livre()
+    servidor = iniciar_servidor(porta, env)
+    url = f'ws://127.0.0.1:{porta}/_stcore/stream'
+
+    resultado = []
+    try:
+        for sessoes in niveis:
+            memoria_inicio = memoria_mb(servidor.pid)
+            inicio = time.perf_counter()
+            registros, erros = asyncio.run(_rodada(url, sessoes, duracao, pausa, semente))
+            parede = time.perf_counter() - inicio
+            memoria_fim = memoria_mb(servidor.pid)
+            time.sleep(espera)
+
+            acoes = [segundos for acao, segundos in registros if acao != 'inicial']
+            iniciais = [segundos for acao, segundos in registros if acao == 'inicial']
+            resultado.append({
+                'sessoes': sessoes,
+                'execucoes': len(registros),
+                'erros': erros,
+                **_percentis(acoes),
+                'inicial_p50_ms': _percentis(iniciais)['p50_ms'],
+                'p50_por_acao_ms': {
+                    acao: _percentis([segundos for nome, segundos in registros if nome == acao])['p50_ms']
+                    for acao in ACOES if any(nome == acao for nome, _ in registros)
+                },
+                'vazao': len(registros) / parede,
+                'memoria_inicio_mb': memoria_inicio,
+                'memoria_fim_mb': memoria_fim,
+                'memoria_depois_mb': memoria_mb(servidor.pid),
+            })
+            semente += sessoes
+    finally:
+        servidor.terminate()
+        servidor.wait(timeout=30)
+    return resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mede latência e memória do dashboard com várias sessões simultâneas.")
+    parser.add_argument('--sessoes', type=int, nargs='+', default=[1, 5, 10, 20], help="sessões de cada rodada")
+    parser.add_argument('--duracao', type=float, default=30, help="duração de cada rodada (s)")
+    parser.add_argument('--pausa', type=float, nargs=2, default=[0.5, 2.0], metavar=('MIN', 'MAX'),
+                        help="pausa entre as ações de um usuário (s)")
+    parser.add_argument('--raiz', help="pasta com data/ (ex: dados sintéticos do painel.benchmark --pasta)")
+    parser.add_argument('--espera', type=float, default=5, help="espera depois de cada rodada antes de medir a memória (s)")
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--saida', help="arquivo JSON com o resultado")
+    args = parser.parse_args()
+
+    rodadas = simular(args.sessoes, args.duracao, tuple(args.pausa), args.raiz, args.espera, args.semente)
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(pd.DataFrame(rodadas).drop(columns='p50_por_acao_ms').set_index('sessoes').round(1))
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump({
+                'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'parametros': vars(args),
+                'rodadas': rodadas,
+            }, arquivo, ensure_ascii=False, indent=2)
+        print(f'Resultado escrito em {args.saida}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+"""
+Tabelas lidas pelo dashboard e os filtros gerais (UF e IES) aplicados a elas.
+
+Usado pelo `streamlit_app.py` e pelo aquecimento dos caches
+(`painel.aquecimento`), que precisam chegar às mesmas tabelas filtradas e,
+portanto, às mesmas chaves de cache.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from painel import config
+from painel.construcao import versao_cubo, versoes_dados
+from painel.cubos import caminho_cubo
+from painel.cruzamentos import Cruzamento, celulas
+from painel.filtros import IndiceInvertido
+from painel.particoes import versoes_ano
+from painel.registro import RegistroDados
+
+ARQUIVOS_TABELAS = {
+    'df_dim_ies': 'data/dim_ies.csv',
+    'df_tprede': 'data/tabela_tp_rede.csv',
+    'df_acesso_internet': 'data/tabela_acesso_internet.csv',
+    'df_repositorio_inst': 'data/tabela_repositorio_inst.csv',
+    'df_tabela_mapa': 'data/tabela_mapa.csv'
+}
+
+CUBOS_TABELAS = {
+    'df_docentes': 'docentes',
+    'df_faixa_etaria': 'docentes_faixa_etaria',
+    'df_turnos': 'turnos',
+    'df_concluintes': 'concluintes'
+}
+
+NOMES_TABELAS = [*ARQUIVOS_TABELAS, *CUBOS_TABELAS]
+
+# caminho de cada tabela em `data/` (e nas partições de cada ano, ver `painel.particoes`)
+CAMINHOS_TABELAS = {
+    **ARQUIVOS_TABELAS,
+    **{nome: str(caminho_cubo(cubo)) for nome, cubo in CUBOS_TABELAS.items()},
+}
+
+# cubo -> (colunas que identificam a IES, demais dimensões, tabela com a UF e o NO_IES da IES)
+CRUZAMENTOS = {
+    'df_docentes': (['ID_IES'], ['ESCOLARIDADE', 'COR_RACA', 'SEXO'], 'df_dim_ies'),
+    'df_concluintes': (['UF', 'NO_IES'], ['CURSO', 'RAÇA'], None),
+}
+
+# tabelas que não passam pelos filtros gerais (ou, como docentes, passam por ID_IES)
+_SEM_FILTRO_GERAL = ('df_dim_ies', 'df_docentes', 'df_tabela_mapa')
+
+# lidas com todas as UFs do ano mesmo com UFs escolhidas (opções da barra lateral e mapa)
+_TODAS_AS_UFS = ('df_dim_ies', 'df_tabela_mapa')
+
+# Concluintes e Vagas filtram os cubos nos próprios fragmentos
+_FILTRADAS_NOS_FRAGMENTOS = ('df_concluintes', 'df_turnos')
+
+
+def versoes_tabelas(raiz: Path, ano: int | None = None) -> dict[str, str | None]:
+    """
+    Versão (hash do manifesto) de cada tabela, pelo nome usado no app.
+
+    Com `ano`, a versão das partições daquele ano (ver `painel.particoes`).
+    """
+
+    if ano is not None:
+        versoes = versoes_ano(ano, raiz)
+        return {nome: versoes.get(caminho) for nome, caminho in CAMINHOS_TABELAS.items()}
+    versoes = versoes_dados(raiz)
+    resultado = {nome: versoes.get(caminho) for nome, caminho in ARQUIVOS_TABELAS.items()}
+    resultado.update({nome: versao_cubo(cubo, versoes) for nome, cubo in CUBOS_TABELAS.items()})
+    return resultado
+
+
+def _recorte(nome: str, ufs: list[str] | None) -> tuple[str, ...]:
+    """UFs das partições lidas para a tabela `nome` (vazio = todas)."""
+    return () if nome in _TODAS_AS_UFS else tuple(sorted(ufs or ()))
+
+
+def pedidos(
+    nomes: list[str],
+    versoes: dict[str, str | None],
+    ano: int | None = None,
+    ufs: list[str] | None = None
+) -> dict[str, tuple[str, str, str | None]]:
+    """
+    Pedidos de `nomes` no formato de `RegistroDados.carregar`. Com `ano`, das
+    partições do ano, só das `ufs` (nenhuma = todas).
+    """
+    if ano is not None:
+        return {
+            nome: ('particao', (ano, CAMINHOS_TABELAS[nome], _recorte(nome, ufs)), versoes[nome])
+            for nome in nomes
+        }
+    return {
+        nome: ('tabela', ARQUIVOS_TABELAS[nome], versoes[nome]) if nome in ARQUIVOS_TABELAS
+        else ('cubo', CUBOS_TABELAS[nome], versoes[nome])
+        for nome in nomes
+    }
+
+
+def cruzamentos(
+    registro: RegistroDados,
+    indices: dict[str, IndiceInvertido],
+    versoes: dict[str, str | None],
+    ano: int | None = None,
+    ufs: list[str] | None = None
+) -> dict[str, Cruzamento]:
+    """
+    Cruzamentos (`CRUZAMENTOS`) dos cubos carregados, montados uma vez por
+    versão (e ano e recorte de UFs, como em `pedidos`).
+
+    Cubos cujo array passaria de `PAINEL_CRUZAMENTO_MAX_CELULAS` células
+    ficam sem cruzamento (ver `painel.cruzamentos`).
+    """
+    resultado = {}
+    for nome, (entidade, dimensoes, atributos) in CRUZAMENTOS.items():
+        if nome not in indices:
+            continue
+        cubo = indices[nome].df
+        tabela_atributos = indices[atributos].df if atributos else None
+
+        def montar():
+            # a decisão também fica no registro: o tamanho só é calculado uma vez por versão
+            if celulas(cubo, entidade, dimensoes) > config.CRUZAMENTO_MAX_CELULAS:
+                return None
+            return Cruzamento(cubo, entidade, dimensoes, tabela_atributos)
+
+        chave = nome if ano is None else f'{ano}:{nome}'
+        recorte = _recorte(nome, ufs) if ano is not None else ()
+        if recorte:
+            chave = f'{chave}:{",".join(recorte)}'
+        cruzamento = registro.cruzamento(
+            chave, (versoes.get(nome), versoes.get(atributos)), montar, recorte=(ano, recorte) if recorte else None
+        )
+        if cruzamento is not None:
+            resultado[nome] = cruzamento
+    return resultado
+
+
+def linhas_filtradas(
+    indices: dict[str, IndiceInvertido],
+    ufs: list[str],
+    ies: list[str]
+) -> dict[str, np.ndarray | None]:
+    """
+    Linhas de cada tabela selecionadas pelos filtros gerais (None = todas),
+    sem montar as tabelas filtradas (ver `filtrar`).
+    """
+
+    selecao_geral = {'UF': ufs or None, 'NO_IES': ies or None}
+    linhas = {
+        nome: indices[nome].linhas(selecao_geral)
+        for nome in indices if nome not in _SEM_FILTRO_GERAL
+    }
+
+    if 'df_docentes' in indices:
+        ids_ies = None
+        if ufs or ies:
+            ids_ies = indices['df_dim_ies'].selecionar(selecao_geral)['ID_IES'].tolist()
+        linhas['df_docentes'] = indices['df_docentes'].linhas({'ID_IES': ids_ies})
+    return linhas
+
+
+def filtrar(
+    indices: dict[str, IndiceInvertido],
+    ufs: list[str],
+    ies: list[str],
+    cruzamentos: dict[str, Cruzamento] | None = None
+) -> tuple[dict[str, np.ndarray | None], dict[str, pd.DataFrame | Cruzamento]]:
+    """
+    Aplica os filtros gerais às tabelas carregadas.
+
+    Parâmetros:
+    - indices: Índices das tabelas carregadas, inclusive 'df_dim_ies'.
+    - ufs: UFs escolhidas (vazio = todas).
+    - ies: IES escolhidas (vazio = todas).
+    - cruzamentos: Cruzamentos dos cubos (ver `cruzamentos`).
+
+    Retorna:
+    - linhas: Linhas selecionadas de cada tabela filtrada (None = todas).
+    - filtrados: Tabelas filtradas, exceto os cubos filtrados nos
+      fragmentos, os cruzamentos filtrados (`<cubo>_cruzamento`) e
+      `df_dim_ies` inteira (a UF de cada ID_IES, para os cortes por UF sem
+      cruzamento).
+    """
+
+    linhas = linhas_filtradas(indices, ufs, ies)
+    filtrados = {
+        nome: indices[nome].tabela(linhas_tabela)
+        for nome, linhas_tabela in linhas.items() if nome not in _FILTRADAS_NOS_FRAGMENTOS
+    }
+    selecao_geral = {'UF': ufs or None, 'NO_IES': ies or None}
+    for nome, cruzamento in (cruzamentos or {}).items():
+        filtrados[f'{nome}_cruzamento'] = cruzamento.filtrar(selecao_geral)
+    filtrados['df_dim_ies'] = indices['df_dim_ies'].df
+    return linhas, filtrados
+
+
+def valores_mapa(indice: IndiceInvertido) -> tuple[tuple[str, int], ...]:
+    """Pares (UF, número de IES) de `tabela_mapa`, no formato de `painel.abas.get_mapa`."""
+    return tuple(zip(indice.df['estado'].astype(str), indice.df['valor'].tolist()))
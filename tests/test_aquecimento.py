@@ -0,0 +1,54 @@
+"""O que `painel.aquecimento.aquecer` deixa nos caches do app."""
+
+import pytest
+
+from painel import config
+from painel.aquecimento import ETAPAS_POR_CASCATA, FILTROS_DAS_ABAS, aquecer
+from painel.cache import CacheLRU
+from painel.cascata import Cascata, faixa_inicial, origem_cubo
+from painel.cubos import CUBOS, caminho_cubo
+from painel.graficos import GRAFICOS_POR_ABA
+from painel.modelos import ModelosGraficos
+from painel.registro import RegistroDados
+from painel.tabelas import versoes_tabelas
+
+
+def _falhar(_):
+    raise AssertionError('etapa recalculada: não estava no cache das etapas')
+
+
+@pytest.fixture(scope='module')
+def aquecido():
+    if not any((config.RAIZ_DADOS / caminho).exists() for caminho in (caminho_cubo('turnos'), CUBOS['turnos'][0])):
+        pytest.skip('data/qtd_total_vaga.csv não está em data/')
+    cache = CacheLRU(config.CACHE_MAX_ENTRADAS)
+    etapas = CacheLRU(config.CACHE_MAX_ENTRADAS)
+    modelos = ModelosGraficos()
+    resumo = aquecer(
+        RegistroDados(config.RAIZ_DADOS), cache, config.RAIZ_DADOS, quantidade_ies=0, etapas=etapas, modelos=modelos
+    )
+    return resumo, etapas, modelos
+
+
+def test_monta_um_modelo_por_grafico(aquecido):
+    resumo, _, modelos = aquecido
+    graficos = {funcao for lista in GRAFICOS_POR_ABA.values() for funcao, _ in lista}
+    assert resumo['modelos'] == len(modelos) == len(graficos)
+
+
+@pytest.mark.parametrize('aba', list(FILTROS_DAS_ABAS))
+@pytest.mark.parametrize('ufs', [[], ['GO'], ['DF', 'MG']])
+def test_cascata_inicial_no_cache(aquecido, aba, ufs):
+    _, etapas, _ = aquecido
+    nome, _, _, _, etapa_escolhidos = FILTROS_DAS_ABAS[aba]
+
+    # a cascata que o fragmento percorre ao abrir a aba, sem calcular nenhuma etapa
+    cascata = Cascata(etapas, origem_cubo(nome, versoes_tabelas(config.RAIZ_DADOS)))
+    cascata = cascata.seguir('geral', _falhar, ufs=ufs, ies=[]).seguir('contagem', _falhar)
+    cascata = cascata.seguir('faixa', _falhar, faixa=faixa_inicial(cascata.valor))
+    cascata.seguir(etapa_escolhidos, _falhar, **{etapa_escolhidos: []})
+
+
+def test_cascatas_cabem_no_cache(aquecido):
+    resumo, etapas, _ = aquecido
+    assert resumo['cascatas'] * ETAPAS_POR_CASCATA == len(etapas) <= etapas.max_entradas
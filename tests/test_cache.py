@@ -0,0 +1,64 @@
+"""Descarte do `CacheLRU` por número de entradas e por memória."""
+
+import numpy as np
+
+from painel.cache import CacheLRU, chave_estado
+
+
+def _array(kb):
+    return np.zeros(kb * 1024, dtype=np.uint8)
+
+
+def test_acerto_nao_recalcula():
+    cache = CacheLRU(max_entradas=4)
+    chamadas = []
+
+    def calcular():
+        chamadas.append(1)
+        return 'valor'
+
+    assert cache.obter('a', calcular) == 'valor'
+    assert cache.obter('a', calcular) == 'valor'
+    assert len(chamadas) == 1
+    assert cache.estatisticas()['acertos'] == 1
+    assert cache.estatisticas()['falhas'] == 1
+
+
+def test_descarte_por_entradas_usa_a_ordem_de_uso():
+    cache = CacheLRU(max_entradas=2)
+    cache.obter('a', lambda: 1)
+    cache.obter('b', lambda: 2)
+    cache.obter('a', lambda: 1)  # 'a' passa a ser a mais recente
+    cache.obter('c', lambda: 3)
+    assert 'a' in cache and 'c' in cache and 'b' not in cache
+    assert len(cache) == 2
+    assert cache.estatisticas()['descartes'] == 1
+
+
+def test_descarte_por_bytes():
+    cache = CacheLRU(max_entradas=100, max_bytes=250 * 1024)
+    for chave in 'abc':
+        cache.obter(chave, lambda: _array(100))
+    assert 'a' not in cache and 'b' in cache and 'c' in cache
+    assert cache.estatisticas()['bytes'] == 200 * 1024
+
+
+def test_entrada_maior_que_o_limite_fica_sozinha():
+    cache = CacheLRU(max_entradas=100, max_bytes=50 * 1024)
+    cache.obter('a', lambda: _array(10))
+    cache.obter('grande', lambda: _array(100))
+    assert len(cache) == 1 and 'grande' in cache
+    assert cache.estatisticas()['bytes'] == 100 * 1024
+
+
+def test_limpar_zera_a_memoria():
+    cache = CacheLRU(max_entradas=10)
+    cache.obter('a', lambda: _array(10))
+    cache.limpar()
+    assert len(cache) == 0
+    assert cache.estatisticas()['bytes'] == 0
+
+
+def test_chave_estado_normaliza_listas_mas_nao_faixas():
+    assert chave_estado({'ufs': ['GO', 'DF'], 'ies': []}) == chave_estado({'ies': [], 'ufs': ['DF', 'GO']})
+    assert chave_estado({'faixa': (1, 5)}) != chave_estado({'faixa': (5, 1)})
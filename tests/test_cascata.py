@@ -0,0 +1,87 @@
+"""Reaproveitamento e invalidação das etapas de `painel.cascata.Cascata`."""
+
+from painel.cache import CacheLRU
+from painel.cascata import Cascata
+
+ORIGEM = {'tabela': 'df_turnos', 'versao': 'v1'}
+
+
+class Contador:
+    """Etapa de filtro que conta as próprias execuções."""
+
+    def __init__(self, aplicar):
+        self.aplicar = aplicar
+        self.chamadas = 0
+
+    def __call__(self, anterior):
+        self.chamadas += 1
+        return self.aplicar(anterior)
+
+
+def _executar(cache, etapas, ufs, turnos, origem=ORIGEM):
+    """Uma execução do fragmento: filtros gerais, faixa e turnos."""
+    geral, faixa, refino = etapas
+    cascata = Cascata(cache, origem).seguir('geral', geral, ufs=ufs)
+    cascata = cascata.seguir('faixa', faixa, faixa=(1, 10))
+    return cascata.seguir('turnos', refino, turnos=turnos)
+
+
+def _etapas():
+    return (
+        Contador(lambda _: list(range(10))),
+        Contador(lambda linhas: [linha for linha in linhas if linha % 2 == 0]),
+        Contador(lambda linhas: linhas[:2]),
+    )
+
+
+def test_mesmos_filtros_reaproveitam_todas_as_etapas():
+    cache, etapas = CacheLRU(max_entradas=16), _etapas()
+    primeira = _executar(cache, etapas, ['GO'], ['Noturno'])
+    segunda = _executar(cache, etapas, ['GO'], ['Noturno'])
+    assert segunda.valor == primeira.valor == [0, 2]
+    assert [etapa.chamadas for etapa in etapas] == [1, 1, 1]
+
+
+def test_mudar_a_ultima_etapa_so_refaz_a_ultima():
+    cache, etapas = CacheLRU(max_entradas=16), _etapas()
+    _executar(cache, etapas, ['GO'], ['Noturno'])
+    _executar(cache, etapas, ['GO'], ['Integral'])
+    assert [etapa.chamadas for etapa in etapas] == [1, 1, 2]
+
+
+def test_mudar_uma_etapa_anterior_refaz_as_seguintes():
+    cache, etapas = CacheLRU(max_entradas=16), _etapas()
+    _executar(cache, etapas, ['GO'], ['Noturno'])
+    _executar(cache, etapas, ['DF'], ['Noturno'])
+    assert [etapa.chamadas for etapa in etapas] == [2, 2, 2]
+
+
+def test_outra_origem_nao_reaproveita():
+    cache, etapas = CacheLRU(max_entradas=16), _etapas()
+    _executar(cache, etapas, ['GO'], ['Noturno'])
+    _executar(cache, etapas, ['GO'], ['Noturno'], origem={**ORIGEM, 'versao': 'v2'})
+    assert [etapa.chamadas for etapa in etapas] == [2, 2, 2]
+
+
+def test_etapa_anterior_descartada_invalida_as_seguintes():
+    cache, etapas = CacheLRU(max_entradas=16), _etapas()
+    primeira = _executar(cache, etapas, ['GO'], ['Noturno'])
+
+    # descarta só o resultado dos filtros gerais (cada item guarda (resultado, marca));
+    # as etapas seguintes continuam no cache
+    chave_geral = next(chave for chave, (valor, _) in cache._itens.items() if valor[0] == list(range(10)))
+    del cache._itens[chave_geral]
+
+    segunda = _executar(cache, etapas, ['GO'], ['Noturno'])
+    assert segunda.valor == primeira.valor
+    assert segunda.marca != primeira.marca
+    assert [etapa.chamadas for etapa in etapas] == [2, 2, 2]
+
+
+def test_descarte_por_entradas_recalcula_a_cascata():
+    # o cache só guarda uma execução: a segunda combinação descarta a primeira
+    cache, etapas = CacheLRU(max_entradas=3), _etapas()
+    _executar(cache, etapas, ['GO'], ['Noturno'])
+    _executar(cache, etapas, ['DF'], ['Noturno'])
+    _executar(cache, etapas, ['GO'], ['Noturno'])
+    assert [etapa.chamadas for etapa in etapas] == [3, 3, 3]
@@ -0,0 +1,97 @@
+"""`painel.cruzamentos.Cruzamento` comparado ao groupby do pandas."""
+
+import pandas as pd
+import pytest
+
+from painel import config
+from painel.armazenamento import ler_tabela
+from painel.cruzamentos import Cruzamento, celulas
+from painel.cubos import COLUNA_QTD, carregar_cubo
+from painel.filtros import IndiceInvertido
+from painel.registro import RegistroDados
+from painel.tabelas import cruzamentos
+
+
+@pytest.fixture(scope='module')
+def dim_ies():
+    return ler_tabela('data/dim_ies.csv', config.RAIZ_DADOS)
+
+
+@pytest.fixture(scope='module')
+def docentes(dim_ies):
+    # o cubo com os atributos da IES, para o groupby esperado
+    cubo = carregar_cubo('docentes')
+    return cubo, cubo.merge(dim_ies.drop_duplicates('ID_IES')[['ID_IES', 'UF', 'NO_IES']], on='ID_IES', how='left')
+
+
+@pytest.fixture(scope='module')
+def concluintes():
+    return carregar_cubo('concluintes')
+
+
+def _agrupar(df, selecoes, por):
+    """Soma de QTD por `por` das linhas que atendem às `selecoes`, pelo pandas."""
+    for coluna, valores in selecoes.items():
+        if valores is not None:
+            df = df[df[coluna].isin(valores)]
+    resultado = df.groupby(por, observed=True)[COLUNA_QTD].sum().reset_index()
+    resultado = resultado[resultado[COLUNA_QTD] > 0].reset_index(drop=True)
+    return resultado.astype({coluna: object for coluna in por})
+
+
+SELECOES_DOCENTES = [
+    {},
+    {'UF': ['GO']},
+    {'UF': ['DF', 'MG'], 'SEXO': ['FEM']},
+    {'ESCOLARIDADE': ['DOUTORADO', 'MESTRADO'], 'COR_RACA': None},
+    {'UF': []},
+]
+
+CORTES_DOCENTES = [
+    ['ESCOLARIDADE'],
+    ['ESCOLARIDADE', 'COR_RACA'],
+    ['ESCOLARIDADE', 'UF'],
+    ['UF', 'SEXO', 'COR_RACA'],
+    ['UF'],
+]
+
+
+@pytest.mark.parametrize('selecoes', SELECOES_DOCENTES)
+@pytest.mark.parametrize('por', CORTES_DOCENTES)
+def test_docentes_igual_a_groupby(docentes, dim_ies, selecoes, por):
+    cubo, com_atributos = docentes
+    cruzamento = Cruzamento(cubo, ['ID_IES'], ['ESCOLARIDADE', 'COR_RACA', 'SEXO'], dim_ies)
+    obtido = cruzamento.filtrar(selecoes).contar(por)
+    pd.testing.assert_frame_equal(obtido, _agrupar(com_atributos, selecoes, por))
+
+
+@pytest.mark.parametrize('selecoes', [
+    {},
+    {'UF': ['DF']},
+    {'RAÇA': ['BRANCA', 'PARDA']},
+    {'NO_IES': None, 'CURSO': ['Direito', 'Pedagogia', 'Administração']},
+])
+@pytest.mark.parametrize('por', [['UF', 'RAÇA'], ['CURSO'], ['NO_IES', 'RAÇA'], ['UF', 'NO_IES']])
+def test_concluintes_igual_a_groupby(concluintes, selecoes, por):
+    cruzamento = Cruzamento(concluintes, ['UF', 'NO_IES'], ['CURSO', 'RAÇA'])
+    obtido = cruzamento.filtrar(selecoes).contar(por)
+    pd.testing.assert_frame_equal(obtido, _agrupar(concluintes, selecoes, por))
+
+
+def test_filtros_encadeados_igual_a_um_filtro(concluintes):
+    cruzamento = Cruzamento(concluintes, ['UF', 'NO_IES'], ['CURSO', 'RAÇA'])
+    encadeado = cruzamento.filtrar({'UF': ['DF', 'GO']}).filtrar({'UF': ['GO'], 'RAÇA': ['PARDA']})
+    pd.testing.assert_frame_equal(
+        encadeado.contar(['CURSO']), _agrupar(concluintes, {'UF': ['GO'], 'RAÇA': ['PARDA']}, ['CURSO'])
+    )
+
+
+def test_celulas_igual_ao_array(concluintes):
+    cruzamento = Cruzamento(concluintes, ['UF', 'NO_IES'], ['CURSO', 'RAÇA'])
+    assert celulas(concluintes, ['UF', 'NO_IES'], ['CURSO', 'RAÇA']) == cruzamento.contagens.size
+
+
+def test_sem_cruzamento_acima_do_limite(monkeypatch, concluintes):
+    monkeypatch.setattr(config, 'CRUZAMENTO_MAX_CELULAS', 10)
+    indices = {'df_concluintes': IndiceInvertido(concluintes)}
+    assert cruzamentos(RegistroDados(config.RAIZ_DADOS), indices, {}) == {}
@@ -0,0 +1,107 @@
+"""Índices de `painel.filtros` comparados a máscaras do pandas."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from painel.cubos import COLUNA_QTD, carregar_cubo
+from painel.filtros import IndiceContagem, IndiceInvertido
+
+
+@pytest.fixture(scope='module')
+def concluintes():
+    return carregar_cubo('concluintes')
+
+
+@pytest.fixture(scope='module')
+def indice(concluintes):
+    return IndiceInvertido(concluintes)
+
+
+def _mascara(df, selecoes):
+    """Linhas de `df` que atendem às `selecoes`, filtradas pelo pandas."""
+    mascara = pd.Series(True, index=df.index)
+    for coluna, valores in selecoes.items():
+        if valores is not None and coluna in df.columns:
+            mascara &= df[coluna].isin(valores)
+    return df[mascara]
+
+
+def _ordenar(df):
+    df = df.astype({coluna: object for coluna in df.columns if coluna != COLUNA_QTD})
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+def _mesmas_linhas(obtido, esperado):
+    """As mesmas linhas, em qualquer ordem."""
+    pd.testing.assert_frame_equal(_ordenar(obtido[list(esperado.columns)]), _ordenar(esperado))
+
+
+def _selecoes(df):
+    ufs = sorted(df['UF'].unique())
+    ies = sorted(df['NO_IES'].unique())
+    cursos = sorted(df['CURSO'].unique())
+    return [
+        {},
+        {'UF': ufs[:1]},
+        {'UF': ufs},
+        {'NO_IES': ies[:3]},
+        {'UF': ufs[:1], 'NO_IES': ies[::2]},
+        {'UF': ufs[1:], 'CURSO': cursos[:5], 'RAÇA': ['BRANCA', 'PARDA']},
+        {'UF': []},
+        {'UF': ['XX']},
+        {'UF': None, 'CURSO': cursos[-2:]},
+        {'COLUNA_INEXISTENTE': ['A']},
+    ]
+
+
+def test_selecionar_igual_a_mascara(concluintes, indice):
+    for selecoes in _selecoes(concluintes):
+        _mesmas_linhas(indice.selecionar(selecoes), _mascara(concluintes, selecoes))
+
+
+def test_linhas_ordenadas_e_sem_repeticao(concluintes, indice):
+    for selecoes in _selecoes(concluintes):
+        linhas = indice.linhas(selecoes)
+        if linhas is not None:
+            assert np.all(np.diff(linhas) > 0)
+
+
+def test_bloco_continuo_vira_fatia(indice):
+    uf = next(iter(indice.linhas_por_valor['UF']))
+    tabela = indice.selecionar({'UF': [uf]})
+    assert np.shares_memory(tabela[COLUNA_QTD].to_numpy(), indice.df[COLUNA_QTD].to_numpy())
+
+
+def test_tabela_vazia():
+    df = pd.DataFrame({'UF': pd.Series([], dtype='category'), COLUNA_QTD: pd.Series([], dtype='int64')})
+    indice = IndiceInvertido(df)
+    assert len(indice.selecionar({'UF': ['DF']})) == 0
+    assert len(indice.selecionar({})) == 0
+
+
+@pytest.mark.parametrize('uf', [None, 'DF'])
+def test_indice_contagem_igual_a_groupby(concluintes, indice, uf):
+    linhas = indice.linhas({'UF': [uf]} if uf else {})
+    contagem = IndiceContagem(indice, linhas)
+    tabela = indice.tabela(linhas)
+    esperado = tabela.groupby('CURSO', observed=True)[COLUNA_QTD].sum()
+
+    pd.testing.assert_series_equal(contagem.contagens, esperado)
+    assert (contagem.minimo, contagem.maximo) == (esperado.min(), esperado.max())
+
+    meio = int(esperado.median())
+    for minimo, maximo in [(contagem.minimo, contagem.maximo), (contagem.minimo, meio), (meio, contagem.maximo),
+                           (meio, meio), (contagem.maximo + 1, contagem.maximo + 2)]:
+        cursos = esperado[(esperado >= minimo) & (esperado <= maximo)]
+        pd.testing.assert_series_equal(contagem.totais(minimo, maximo), cursos)
+        _mesmas_linhas(
+            indice.tabela(contagem.linhas(minimo, maximo)),
+            _mascara(tabela, {'CURSO': list(cursos.index)})
+        )
+
+
+def test_indice_contagem_sem_linhas(indice):
+    contagem = IndiceContagem(indice, np.empty(0, dtype=np.int64))
+    assert contagem.vazio
+    assert len(contagem.linhas(0, 10)) == 0
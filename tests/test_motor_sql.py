@@ -0,0 +1,72 @@
+"""Tabelas derivadas do motor SQL (DuckDB) comparadas às do pandas."""
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('duckdb')
+
+from painel import config
+from painel.cubos import CUBOS, caminho_cubo
+from painel.derivados import DERIVADOS_POR_ABA, calcular_derivados
+from painel.motor_sql import MotorDuckDB
+from painel.registro import RegistroDados
+from painel.tabelas import CUBOS_TABELAS, NOMES_TABELAS, cruzamentos, filtrar, pedidos, versoes_tabelas
+
+# cubos que as abas Concluintes e Vagas filtram nos fragmentos
+CUBOS_DOS_FRAGMENTOS = ['df_concluintes', 'df_turnos']
+
+
+def _cubo_disponivel(nome):
+    cubo = CUBOS_TABELAS[nome]
+    return (config.RAIZ_DADOS / caminho_cubo(cubo)).exists() or (config.RAIZ_DADOS / CUBOS[cubo][0]).exists()
+
+
+@pytest.fixture(scope='module')
+def tabelas_pandas():
+    registro = RegistroDados(config.RAIZ_DADOS)
+    versoes = versoes_tabelas(config.RAIZ_DADOS)
+    nomes = [nome for nome in NOMES_TABELAS if nome not in CUBOS_TABELAS or _cubo_disponivel(nome)]
+    indices = registro.carregar(pedidos(nomes, versoes))
+    return indices, cruzamentos(registro, indices, versoes)
+
+
+@pytest.fixture(scope='module')
+def motor():
+    motor = MotorDuckDB(config.RAIZ_DADOS)
+    yield motor
+    motor.fechar()
+
+
+def _filtros(indices):
+    dim_ies = indices['df_dim_ies'].df
+    uma_ies = str(dim_ies.loc[dim_ies['UF'] == 'DF', 'NO_IES'].iloc[0])
+    return [([], []), (['GO'], []), (['DF', 'MG'], []), ([], [uma_ies])]
+
+
+@pytest.mark.parametrize('aba', list(DERIVADOS_POR_ABA))
+def test_derivados_iguais_ao_pandas(tabelas_pandas, motor, aba):
+    indices, cruzamentos_tabelas = tabelas_pandas
+    if aba == 'Vagas' and 'df_turnos' not in indices:
+        pytest.skip('data/qtd_total_vaga.csv não está em data/')
+
+    for ufs, ies in _filtros(indices):
+        linhas, filtrados = filtrar(indices, ufs, ies, cruzamentos_tabelas)
+        tabelas = {
+            **filtrados,
+            **{nome: indices[nome].tabela(linhas[nome]) for nome in CUBOS_DOS_FRAGMENTOS if nome in indices},
+        }
+        esperado = calcular_derivados(tabelas, aba)
+
+        cubos = {nome: motor.tabela(nome, ufs, ies) for nome in CUBOS_DOS_FRAGMENTOS if nome in indices}
+        obtido = motor.derivados(aba, ufs, ies, cubos)
+
+        assert obtido.keys() == esperado.keys(), (ufs, ies)
+        for nome in esperado:
+            pd.testing.assert_frame_equal(obtido[nome], esperado[nome], obj=f'{aba} {nome} {ufs} {ies}')
+
+
+def test_contar_igual_ao_pandas(tabelas_pandas, motor):
+    indices, _ = tabelas_pandas
+    for ufs, ies in _filtros(indices):
+        linhas, _ = filtrar(indices, ufs, ies)
+        assert motor.contar('df_docentes', ufs, ies) == indices['df_docentes'].contar(linhas['df_docentes'])
@@ -0,0 +1,43 @@
+"""Partições por ano e UF de `painel.particoes`, regravadas a partir de outra origem."""
+
+import pandas as pd
+
+from painel import config
+from painel.armazenamento import ler_tabela
+from painel.docentes import ARQUIVO_DIM_IES
+from painel.particoes import ARQUIVO_RESUMO, PASTA_ANOS, arquivos_particoes, particionar, tendencias, ufs_do_ano
+
+DIM_IES = str(ARQUIVO_DIM_IES)
+
+
+def _origem(pasta, ufs):
+    """Pasta com um `data/dim_ies.csv` só das IES das `ufs`."""
+    dim_ies = ler_tabela(ARQUIVO_DIM_IES, config.RAIZ_DADOS)
+    destino = pasta / ARQUIVO_DIM_IES
+    destino.parent.mkdir(parents=True)
+    dim_ies[dim_ies['UF'].isin(ufs)].to_csv(destino, index=False)
+    return pasta
+
+
+def test_regravar_sem_uma_uf_apaga_a_particao_antiga(tmp_path):
+    raiz = tmp_path / 'raiz'
+    particionar([DIM_IES], 2019, _origem(tmp_path / 'antes', ['DF', 'GO']), raiz)
+    assert ufs_do_ano(2019, raiz) == ['DF', 'GO']
+
+    particionar([DIM_IES], 2019, _origem(tmp_path / 'depois', ['DF']), raiz)
+    assert ufs_do_ano(2019, raiz) == ['DF']
+    assert not (raiz / PASTA_ANOS / '2019' / 'GO').exists()
+    assert arquivos_particoes(DIM_IES, 2019, ['GO'], raiz) == []
+    assert (raiz / PASTA_ANOS / '2019' / 'DF' / ARQUIVO_RESUMO).exists()
+
+    esperado = ler_tabela(ARQUIVO_DIM_IES, config.RAIZ_DADOS)['UF'].eq('DF').sum()
+    ies = tendencias([], [], raiz)
+    assert ies.loc[ies['INDICADOR'] == 'IES', 'QTD'].tolist() == [esperado]
+
+
+def test_arquivos_so_das_ufs_pedidas(tmp_path):
+    raiz = tmp_path / 'raiz'
+    particionar([DIM_IES], 2019, _origem(tmp_path / 'origem', ['DF', 'GO', 'MG']), raiz)
+    arquivos = arquivos_particoes(DIM_IES, 2019, ['GO', 'SP'], raiz)
+    assert [arquivo.parent.name for arquivo in arquivos] == ['GO']
+    assert pd.read_parquet(arquivos[0])['UF'].astype(str).unique().tolist() == ['GO']